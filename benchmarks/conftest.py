@@ -0,0 +1,72 @@
+import os
+import tempfile
+from contextlib import ExitStack
+
+import pytest
+
+from benchmarks.page_load import get_secrets, use_secrets
+from src.api import memory_cache
+from tests.stand_ins.hive_db import create_database, patch_hive_sql
+from tests.stand_ins.http_server import ReplayServer, patch_endpoints
+
+# Input sizes (rows), limit them with e.g. BENCHMARK_SCALES=10,1000 for a quick run
+ROW_SCALES = [int(scale) for scale in os.environ.get("BENCHMARK_SCALES", "10,1000,100000").split(",")]
+# Account list sizes of the pipeline stages, every account is a (local) API request
+ACCOUNT_SCALES = [scale for scale in ROW_SCALES if scale <= 1000]
+
+
+def pytest_configure(config):
+    """
+    Use the stub secrets of the page load harness for the whole run, before the benchmark modules are collected:
+    src modules read st.secrets when they are imported, so a checkout without .streamlit/secrets.toml fails
+    to collect otherwise. The stand-ins replace the services, real secrets are never needed.
+    """
+    config.benchmark_secrets = ExitStack()
+    directory = config.benchmark_secrets.enter_context(tempfile.TemporaryDirectory())
+    config.benchmark_secrets.enter_context(use_secrets(get_secrets(directory)))
+
+
+def pytest_sessionstart(session):
+    """
+    Baselines are stored per machine (benchmarks/baselines/<machine id>, not committed). pytest-benchmark only
+    warns when --benchmark-compare finds no baseline or one of another machine, so nothing could fail:
+    stop before running instead.
+    """
+    benchmarks = getattr(session.config, "_benchmarksession", None)
+    if benchmarks is None or not benchmarks.compare:
+        return
+    if not any(path.parts[0] == benchmarks.machine_id for path in benchmarks.compared_mapping):
+        raise pytest.UsageError(f"No baseline of this machine ({benchmarks.machine_id}) in "
+                                f"{benchmarks.storage} to compare with, save one first with: "
+                                f"pytest benchmarks --benchmark-save=baseline")
+
+
+def pytest_unconfigure(config):
+    config.benchmark_secrets.close()
+
+
+def pytest_generate_tests(metafunc):
+    if "rows" in metafunc.fixturenames:
+        metafunc.parametrize("rows", ROW_SCALES)
+    if "accounts" in metafunc.fixturenames:
+        metafunc.parametrize("accounts", ACCOUNT_SCALES)
+
+
+@pytest.fixture(scope="session")
+def hive_db(tmp_path_factory):
+    directory = create_database(tmp_path_factory.mktemp("hive"), accounts=max(ACCOUNT_SCALES), comments_per_account=5)
+    with patch_hive_sql(directory):
+        yield directory
+
+
+@pytest.fixture(scope="session")
+def replay_server():
+    with ReplayServer() as server, patch_endpoints(server):
+        yield server
+
+
+@pytest.fixture
+def clear_caches():
+    memory_cache.clear_all()
+    yield memory_cache.clear_all
+    memory_cache.clear_all()
@@ -0,0 +1,237 @@
+"""
+End-to-end page load harness: drives main.py with Streamlit's AppTest against the local HiveSQL, HAFSQL and
+HTTP stand-ins, for a fixed set of accounts. Every step of a page (open, enter accounts, click a button) records
+its wall time, the number of script runs (1 + st.rerun calls), the peak Python memory and the pipeline stage
+timings, so the report of one commit can be compared with another. Run from the repository root:
+
+    python -m benchmarks.page_load                           writes benchmarks/page_loads/<commit>.json
+    python -m benchmarks.page_load --compare <commit>.json   also prints the differences with an earlier report
+"""
+import argparse
+import datetime
+import functools
+import json
+import os
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager, ExitStack
+from unittest.mock import patch
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest
+
+from src.api import activity_store, hive_sql, memory_cache
+from tests.stand_ins import hive_db
+from tests.stand_ins.http_server import ReplayServer, patch_endpoints
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_SCRIPT = os.path.join(ROOT, "main.py")
+REPORT_DIRECTORY = os.path.join(ROOT, "benchmarks", "page_loads")
+
+DATABASE_ACCOUNTS = 1000
+MAIN_PAGE_ACCOUNTS = hive_db.account_names(5)
+RUN_TIMEOUT = 600
+PASSWORD = "benchmark"
+
+
+def get_secrets(directory):
+    return {
+        "general": {"password": PASSWORD, "spl_gray_list": []},
+        "database": {"username": "benchmark", "password": "benchmark"},
+        "prefetch": {"enabled": False},
+        "activity": {"path": os.path.join(directory, "activity.sqlite")},
+    }
+
+
+def click(label):
+    def action(at):
+        buttons = [button for button in at.button if button.label.startswith(label)]
+        if not buttons:
+            raise LookupError(f"No button {label!r} on the page, exceptions: {[e.value for e in at.exception]}")
+        return buttons[0].click()
+    return action
+
+
+def enter_accounts(accounts):
+    return lambda at: at.text_input(key="account_input").input(" ".join(accounts))
+
+
+# Page title -> (page script, steps), a step is (name, function(AppTest) -> AppTest with the next input)
+scenarios = {
+    "Bee Balanced": ("src/pages/main_page.py", [
+        ("enter accounts", enter_accounts(MAIN_PAGE_ACCOUNTS)),
+        ("attach spl data", click("Attach SPL Data")),
+    ]),
+    "Top Holders": ("src/pages/top_holders_page.py", [
+        ("top authors", click("TOP ")),
+    ]),
+    "Custom Queries": ("src/pages/custom_queries_page.py", [
+        ("retrieve hive data", click("Retrieve HIVE data")),
+        ("attach spl data", click("Attach SPL data")),
+    ]),
+}
+
+
+@contextmanager
+def use_secrets(secrets):
+    """st.secrets for the whole run, modules read them when they are imported (outside AppTest runs as well)."""
+    saved = st.secrets
+    st.secrets = Secrets()
+    st.secrets._secrets = secrets
+    try:
+        yield
+    finally:
+        st.secrets = saved
+
+
+@contextmanager
+def stand_ins(directory, accounts, latency):
+    """
+    Patch the API clients to the stand-ins. main.py reloads the src modules on every run (development
+    workaround), which would undo the patches, so reloading is skipped: the timings exclude the reload.
+
+    :return: list counting the script runs (main.py calls market_prefetcher.start once per run).
+    """
+    runs = []
+    hive_db.create_database(directory, accounts=accounts, comments_per_account=40)
+    with ExitStack() as stack:
+        stack.enter_context(use_secrets(get_secrets(directory)))
+        server = stack.enter_context(ReplayServer(latency=latency))
+        stack.enter_context(patch_endpoints(server))
+        stack.enter_context(hive_db.patch_hive_sql(directory))
+        stack.enter_context(hive_db.patch_hafsql(directory))
+        # The stand-in comments end at hive_db.NOW, the activity store is evaluated at that moment
+        stack.enter_context(patch.object(activity_store, "refresh",
+                                         functools.partial(activity_store.refresh, now=hive_db.NOW)))
+        stack.enter_context(patch.object(activity_store, "get_active_accounts",
+                                         functools.partial(activity_store.get_active_accounts, now=hive_db.NOW)))
+        stack.enter_context(patch.object(activity_store, "is_ready",
+                                         functools.partial(activity_store.is_ready, now=hive_db.NOW)))
+        # The store is built by the prefetcher (not running here) before users query it
+        hive_sql.refresh_activity()
+        stack.enter_context(patch("importlib.reload", side_effect=lambda module: module))
+        stack.enter_context(patch("src.api.market_prefetcher.start", side_effect=lambda: runs.append(1)))
+        yield runs
+
+
+def get_stage_reports(at):
+    """Pipeline timing reports of the session (see main_page), one DataFrame per pipeline run."""
+    return at.session_state["pipeline_reports"] if "pipeline_reports" in at.session_state else []
+
+
+def measure(runs, at, page, step, action):
+    """Run action (returning the AppTest run) and return the measurements of the step."""
+    start_runs = len(runs)
+    start_reports = len(get_stage_reports(at))
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    at = action()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+
+    stages = []
+    for report in get_stage_reports(at)[start_reports:]:
+        stages += report.to_dict("records")
+    return at, {
+        "page": page,
+        "step": step,
+        "seconds": round(seconds, 3),
+        "script_runs": len(runs) - start_runs,
+        "peak_memory_mb": round(peak / 2 ** 20, 1),
+        "exceptions": [exception.value for exception in at.exception],
+        "stages": stages,
+    }
+
+
+def run_page(runs, page):
+    """Open the page in a new session and run its steps."""
+    memory_cache.clear_all()
+    st.cache_data.clear()
+    path, steps = scenarios[page]
+    at = AppTest.from_file(MAIN_SCRIPT, default_timeout=RUN_TIMEOUT)
+    at, result = measure(runs, at, page, "open", lambda: at.switch_page(path).run())
+    results = [result]
+    for step, action in steps:
+        at, result = measure(runs, at, page, step, lambda: action(at).run())
+        results.append(result)
+    return results
+
+
+def run(pages=None, accounts=DATABASE_ACCOUNTS, latency=0.0):
+    """
+    :param pages: page titles to load, all scenarios by default.
+    :param accounts: number of accounts in the stand-in database.
+    :param latency: seconds the HTTP stand-in waits before every response.
+    :return: list of step results.
+    """
+    results = []
+    tracemalloc.start()
+    try:
+        with tempfile.TemporaryDirectory() as directory, stand_ins(directory, accounts, latency) as runs:
+            for page in pages or scenarios:
+                results += run_page(runs, page)
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def get_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_report(results, directory=REPORT_DIRECTORY, **settings):
+    os.makedirs(directory, exist_ok=True)
+    commit = get_commit()
+    path = os.path.join(directory, f"{commit}.json")
+    with open(path, "w") as file:
+        json.dump({"commit": commit, "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                   "settings": settings, "results": results}, file, indent=2, default=str)
+    return path
+
+
+def to_frame(results):
+    return pd.DataFrame(results, columns=["page", "step", "seconds", "script_runs", "peak_memory_mb"])
+
+
+def compare(old_report, new_report):
+    """Step results of both reports side by side (_old and _new), with the relative change of the wall time."""
+    df = to_frame(old_report["results"]).merge(to_frame(new_report["results"]), on=["page", "step"], how="outer",
+                                               suffixes=("_old", "_new"))
+    df["seconds_change_%"] = ((df["seconds_new"] - df["seconds_old"]) / df["seconds_old"] * 100).round(1)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", nargs="+", choices=list(scenarios), help="pages to load (default all)")
+    parser.add_argument("--accounts", type=int, default=DATABASE_ACCOUNTS, help="accounts in the stand-in database")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per HTTP stand-in response")
+    parser.add_argument("--output", default=REPORT_DIRECTORY, help="report directory")
+    parser.add_argument("--compare", help="earlier report to compare with")
+    args = parser.parse_args()
+
+    results = run(args.pages, args.accounts, args.latency)
+    path = write_report(results, args.output, accounts=args.accounts, latency=args.latency)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(to_frame(results).to_string(index=False))
+        for result in results:
+            for exception in result["exceptions"]:
+                print(f"{result['page']} / {result['step']}: {exception}")
+        print(f"Report written to {path}")
+        if args.compare:
+            with open(args.compare) as old, open(path) as new:
+                old_report, new_report = json.load(old), json.load(new)
+            print(f"Compared with {old_report['commit']} (old) -> {new_report['commit']} (new)")
+            print(compare(old_report, new_report).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Synthetic inputs for the benchmarks: card collections, markets, deeds, token balances, metrics and SQL results.
+All generators are seeded, the same scale always gives the same data.
+"""
+import datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from src.static.static_values_enum import Edition
+
+CARD_IDS = 500
+# Editions that are always sellable, so every card of the collection is valued
+UNSELLABLE = (Edition.gladius, Edition.soulbound, Edition.soulboundrb)
+EDITIONS = [edition.value for edition in Edition if edition not in UNSELLABLE]
+TOKENS = ["SPS", "SPSP", "DEC", "DEC-B", "LICENSE", "ACTIVATED_LICENSE", "PLOT", "TRACT", "REGION", "VOUCHER",
+          "CREDITS"]
+DEED_FILTERS = {
+    "rarity": ["common", "rare", "epic", "legendary"],
+    "plot_status": ["natural", "magical", "occupied"],
+    "magic_type": ["", "fire", "water", "life"],
+    "deed_type": ["bog", "lake", "plains", "river", "mountain", "tundra", "jungle", "swamp"],
+}
+
+
+def grouped_collection(rows, seed=0):
+    """Collection grouped per bcx (see collection_util.group_bcx) with rows rows."""
+    rng = np.random.default_rng(seed)
+    bcx = rng.integers(1, 50, rows)
+    return pd.DataFrame({
+        "player": "account0",
+        "card_detail_id": rng.integers(1, CARD_IDS + 1, rows),
+        "xp": bcx,
+        "gold": rng.random(rows) < 0.1,
+        "edition": rng.choice(EDITIONS, rows),
+        "level": rng.integers(1, 10, rows),
+        "bcx": bcx,
+        "bcx_unbound": bcx,
+        "count": rng.integers(1, 5, rows),
+    })
+
+
+def card_markets(seed=0):
+    """List prices and market prices for every card, edition and foil, so every card has a price."""
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_product([range(1, CARD_IDS + 1), [False, True], EDITIONS],
+                                       names=["card_detail_id", "gold", "edition"])
+    cards = index.to_frame(index=False)
+    list_prices = cards.assign(low_price_bcx=rng.uniform(0.01, 50, len(cards)))
+    market_prices = cards.assign(last_bcx_price=rng.uniform(0.01, 50, len(cards)))
+    return list_prices, market_prices
+
+
+def deeds(rows, seed=0, listed=False):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({column: rng.choice(values, rows) for column, values in DEED_FILTERS.items()})
+    if listed:
+        df["listing_price"] = rng.uniform(10, 5000, rows).astype(str)
+    return df
+
+
+def token_balances(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"token": rng.choice(TOKENS, rows), "balance": rng.lognormal(5, 3, rows)})
+
+
+def metrics(rows, seed=0, metric_count=10):
+    """transactions/metrics response: one row per metric with a list of daily values, rows values in total."""
+    rng = np.random.default_rng(seed)
+    per_metric = max(rows // metric_count, 1)
+    end = datetime.datetime(2025, 6, 1)
+    dates = [(end - datetime.timedelta(days=i)).strftime("%Y-%m-%dT00:00:00.000Z") for i in range(per_metric)]
+    return pd.DataFrame({
+        "metric": [f"metric{i}" for i in range(metric_count)],
+        "values": [[{"date": date, "value": value} for date, value in zip(dates, rng.uniform(0, 1e6, per_metric))]
+                   for _ in range(metric_count)],
+    })
+
+
+def sql_result(rows, seed=0):
+    """A HiveSQL result as returned by the cursor (Decimal, date and plain Python values) and its description."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "name": [f"account{i}" for i in range(rows)],
+        "balance": [Decimal(f"{value:.3f}") for value in rng.uniform(0, 1e5, rows)],
+        "reputation": rng.integers(0, 10 ** 14, rows).tolist(),
+        "vesting_shares": rng.uniform(0, 1e9, rows).tolist(),
+        "created": [datetime.datetime(2020, 1, 1) + datetime.timedelta(seconds=int(s))
+                    for s in rng.integers(0, 10 ** 8, rows)],
+        "active": (rng.random(rows) < 0.5).tolist(),
+    })
+    description = [(column, None) for column in df.columns]
+    return df, description
+
+
+def reputations(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(rng.lognormal(25, 3, rows))
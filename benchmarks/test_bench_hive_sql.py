@@ -0,0 +1,20 @@
+from benchmarks import synthetic
+from src.api import hive_sql
+
+
+def test_convert_dataframe_types(benchmark, rows):
+    df, description = synthetic.sql_result(rows)
+
+    # The conversion changes the DataFrame in place, every round converts a fresh copy
+    result = benchmark.pedantic(hive_sql.convert_dataframe_types, setup=lambda: ((df.copy(), description), {}),
+                                rounds=5)
+
+    assert str(result["created"].dtype) == "datetime64[ns]"
+
+
+def test_reputation_to_score(benchmark, rows):
+    reputation = synthetic.reputations(rows)
+
+    result = benchmark(hive_sql.reputation_to_score, reputation)
+
+    assert len(result) == rows
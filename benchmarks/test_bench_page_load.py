@@ -0,0 +1,27 @@
+"""
+Page loads of main.py with AppTest (see benchmarks/page_load.py), the steps of every page are stored in extra_info.
+"""
+import tempfile
+import tracemalloc
+
+import pytest
+
+from benchmarks import page_load
+from benchmarks.conftest import ACCOUNT_SCALES
+
+
+@pytest.fixture(scope="module")
+def runs():
+    tracemalloc.start()
+    with tempfile.TemporaryDirectory() as directory, \
+            page_load.stand_ins(directory, max(ACCOUNT_SCALES), latency=0.0) as runs:
+        yield runs
+    tracemalloc.stop()
+
+
+@pytest.mark.parametrize("page", list(page_load.scenarios))
+def test_page_load(benchmark, runs, page):
+    results = benchmark.pedantic(page_load.run_page, args=(runs, page), rounds=1)
+
+    benchmark.extra_info["steps"] = page_load.to_frame(results).to_dict("records")
+    assert [result["exceptions"] for result in results] == [[]] * len(results)
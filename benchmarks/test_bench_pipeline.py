@@ -0,0 +1,41 @@
+"""
+The account pipeline stages (the former prepare_data steps) against the local HiveSQL and HTTP stand-ins.
+Caches are cleared before every round, so every round fetches all accounts.
+"""
+import pandas as pd
+import pytest
+
+from src.pages.main_subpages import hivesql_balances, hive_engine_balances, spl_balances, spl_assets, \
+    spl_balances_estimates
+from src.util import pipeline
+from tests.stand_ins.hive_db import account_names
+
+ROUNDS = 3
+
+record_stages = {
+    "hive_engine_balances": hive_engine_balances.pipeline_stage,
+    "spl_balances": spl_balances.pipeline_stage,
+    "spl_assets": spl_assets.pipeline_stage,
+    "spl_balances_estimates": spl_balances_estimates.pipeline_stage,
+}
+
+
+def test_hivesql_balances_stage(benchmark, accounts, hive_db, clear_caches):
+    df = pd.DataFrame({"account": account_names(accounts)})
+
+    result, _ = benchmark.pedantic(pipeline.run, args=([hivesql_balances.pipeline_stage], df), setup=clear_caches,
+                                   rounds=ROUNDS)
+
+    assert len(result) == accounts
+
+
+@pytest.mark.parametrize("stage", list(record_stages))
+def test_record_stage(benchmark, accounts, stage, replay_server, clear_caches):
+    if stage == "spl_balances_estimates" and accounts > 10:
+        pytest.skip("The main page only estimates up to a few accounts")
+    df = pd.DataFrame({"name": account_names(accounts)})
+
+    result, _ = benchmark.pedantic(pipeline.run, args=([record_stages[stage]], df), setup=clear_caches,
+                                   rounds=ROUNDS)
+
+    assert len(result) == accounts
@@ -0,0 +1,52 @@
+import pytest
+
+from benchmarks import synthetic
+from src.api import spl, hive_engine
+from src.pages import spl_metrics_page
+from src.util import collection_util, land_util, token_util
+
+# Row wise implementations take minutes at the largest scale, they are measured with a single round there
+SINGLE_ROUND_ROWS = 100_000
+
+
+def measure(benchmark, rows, func, *args):
+    if rows >= SINGLE_ROUND_ROWS:
+        return benchmark.pedantic(func, args=args, rounds=1, iterations=1)
+    return benchmark(func, *args)
+
+
+def test_get_collection_value(benchmark, rows):
+    collection = synthetic.grouped_collection(rows)
+    list_prices, market_prices = synthetic.card_markets()
+
+    result = measure(benchmark, rows, collection_util.get_collection_value, collection, list_prices, market_prices)
+
+    assert result["list_value"] > 0
+
+
+def test_get_deeds_value(benchmark, rows, monkeypatch):
+    monkeypatch.setattr(spl, "get_deeds_collection", lambda account: synthetic.deeds(rows))
+    monkeypatch.setattr(spl, "get_deeds_market", lambda: synthetic.deeds(1000, seed=1, listed=True))
+
+    result = measure(benchmark, rows, land_util.get_deeds_value, "account0")
+
+    assert result["deeds_qty"].iloc[0] == rows
+
+
+def test_calculate_prices(benchmark, rows, monkeypatch):
+    monkeypatch.setattr(hive_engine, "get_market_with_retry", lambda token: {"highestBid": "0.01"})
+    balances = synthetic.token_balances(rows)
+
+    result = measure(benchmark, rows, lambda: token_util.calculate_prices(
+        token_util.pd.DataFrame({"account_name": ["account0"]}), balances, 0.25))
+
+    assert "sps_value" in result.columns
+
+
+@pytest.mark.parametrize("number_of_days", [None, 30])
+def test_create_one_dataframe(benchmark, rows, number_of_days):
+    metrics = synthetic.metrics(rows)
+
+    result = measure(benchmark, rows, spl_metrics_page.create_one_dataframe, metrics, number_of_days)
+
+    assert set(result.columns) == {"date", "metric", "value"}
@@ -6,8 +6,9 @@ import streamlit as st
 from st_pages import get_nav_from_toml, add_page_title
 
 from src.pages import main_page, comments_list_page, top_holders_page, custom_queries_page, spl_metrics_page, \
-    balance_history_page
-from src.util import authentication
+    balance_history_page, admin_page
+from src.api import market_prefetcher, retry_events, circuit_breaker
+from src.util import authentication, profiling
 
 
 def reload_all():
@@ -36,29 +37,49 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S",  # Date format
 )
 
+# Show API retries made on the script thread as toasts (retries on worker threads are counted only)
+retry_events.subscribe("toast", retry_events.show_toast)
+
+# Keep market wide data warm in the shared cache (started once per server process)
+market_prefetcher.start()
+
 # Set up session state to remember authentication
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
 
+# Admin only: profile the page runs of this session
+profiling.add_toggle()
+
 # Dynamically call the page-specific function based on the selected page
-if pg.title == "Bee Balanced":
-    with placeholder.container():
-        main_page.get_page()
-if pg.title == "Comments List":
-    with placeholder.container():
-        comments_list_page.get_page()
-if pg.title == "Top Holders":
-    with placeholder.container():
-        authentication.get_page()
-        top_holders_page.get_page()
-if pg.title == "Balance History":
-    with placeholder.container():
-        balance_history_page.get_page()
-
-if pg.title == "Custom Queries":
-    with placeholder.container():
-        authentication.get_page()
-        custom_queries_page.get_page()
-if pg.title == "SPL Metrics":
-    with placeholder.container():
-        spl_metrics_page.get_page()
+with profiling.profile_run(pg.title):
+    try:
+        if pg.title == "Bee Balanced":
+            with placeholder.container():
+                main_page.get_page()
+        if pg.title == "Comments List":
+            with placeholder.container():
+                comments_list_page.get_page()
+        if pg.title == "Top Holders":
+            with placeholder.container():
+                authentication.get_page()
+                top_holders_page.get_page()
+        if pg.title == "Balance History":
+            with placeholder.container():
+                balance_history_page.get_page()
+
+        if pg.title == "Custom Queries":
+            with placeholder.container():
+                authentication.get_page()
+                custom_queries_page.get_page()
+        if pg.title == "SPL Metrics":
+            with placeholder.container():
+                spl_metrics_page.get_page()
+        if pg.title == "Admin":
+            with placeholder.container():
+                authentication.get_page()
+                admin_page.get_page()
+    except circuit_breaker.CircuitOpenError as e:
+        # An upstream API is down (see circuit_breaker), fail fast instead of waiting for it
+        st.error(f"Data source unavailable: {e}. Please try again later.")
+
+profiling.add_report()
@@ -0,0 +1,197 @@
+import datetime
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing
+
+import pandas as pd
+import streamlit as st
+
+log = logging.getLogger("Activity Store")
+
+# Local per account, per month comment/post/reply counts (aggregated from HiveSQL Comments).
+# Location and history can be configured in secrets.toml:
+# [activity]
+# path = "/data/activity.sqlite"
+# history_months = 12
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), "beebalanced_activity.sqlite")
+DEFAULT_HISTORY_MONTHS = 12
+MIN_REFRESH_INTERVAL = datetime.timedelta(minutes=15)
+# HiveSQL ingests comments with a delay, only comments older than this are considered complete
+INGEST_LAG = datetime.timedelta(hours=1)
+# The store is ready for queries when it is complete up to this long ago (not while it is being built)
+READY_AGE = datetime.timedelta(days=1)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS account_activity (
+    author TEXT NOT NULL,
+    month TEXT NOT NULL,  -- YYYY-MM
+    comments INTEGER NOT NULL DEFAULT 0,
+    posts INTEGER NOT NULL DEFAULT 0,
+    replies INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (author, month)
+);
+CREATE INDEX IF NOT EXISTS account_activity_month ON account_activity (month);
+CREATE TABLE IF NOT EXISTS refresh_state (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+WATERMARK = "created_until"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def get_settings():
+    try:
+        settings = dict(st.secrets.get("activity", {}))
+    except FileNotFoundError:
+        settings = {}
+    return {
+        "path": settings.get("path", DEFAULT_PATH),
+        "history_months": settings.get("history_months", DEFAULT_HISTORY_MONTHS),
+    }
+
+
+@st.cache_resource
+def get_refresh_lock():
+    """
+    Only one session refreshes the store at a time, the others read the current data.
+    """
+    return threading.Lock()
+
+
+def is_refreshing():
+    return get_refresh_lock().locked()
+
+
+def connect(path=None):
+    connection = sqlite3.connect(path or get_settings()["path"], timeout=30)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def month_start(moment, months_back=0):
+    """
+    First day of the month, months_back months before the month of moment.
+    """
+    month_index = moment.year * 12 + moment.month - 1 - months_back
+    return datetime.datetime(month_index // 12, month_index % 12 + 1, 1)
+
+
+def get_watermark(path=None):
+    """
+    Comments created before this moment are in the store, None when the store is empty.
+    """
+    with closing(connect(path)) as connection:
+        row = connection.execute("SELECT value FROM refresh_state WHERE name = ?", (WATERMARK,)).fetchone()
+    return datetime.datetime.strptime(row[0], TIMESTAMP_FORMAT) if row else None
+
+
+def add_activity(activity, created_until, path=None):
+    """
+    Add aggregated activity and move the watermark in one transaction.
+
+    :param activity: DataFrame with author, month (YYYY-MM), comments, posts and replies of new comments.
+    :param created_until: all comments created before this moment are included now.
+    """
+    records = activity[["author", "month", "comments", "posts", "replies"]].itertuples(index=False, name=None)
+    with closing(connect(path)) as connection, connection:
+        connection.executemany("""
+            INSERT INTO account_activity (author, month, comments, posts, replies) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (author, month) DO UPDATE SET
+                comments = comments + excluded.comments,
+                posts = posts + excluded.posts,
+                replies = replies + excluded.replies
+        """, [(author, month, int(comments), int(posts), int(replies))
+              for author, month, comments, posts, replies in records])
+        connection.execute("INSERT OR REPLACE INTO refresh_state (name, value) VALUES (?, ?)",
+                           (WATERMARK, created_until.strftime(TIMESTAMP_FORMAT)))
+
+
+def prune(oldest_month, path=None):
+    """Remove months before oldest_month (YYYY-MM)."""
+    with closing(connect(path)) as connection, connection:
+        connection.execute("DELETE FROM account_activity WHERE month < ?", (oldest_month,))
+
+
+def refresh(fetch_activity, now=None, path=None, history_months=None, max_window_days=31,
+            min_interval=MIN_REFRESH_INTERVAL, lag=INGEST_LAG):
+    """
+    Bring the store up to date by fetching the activity of comments created after the watermark.
+    The missing period is fetched in windows of at most max_window_days, the watermark is stored after every
+    window so an interrupted refresh continues where it stopped.
+
+    :param fetch_activity: function(start, end) -> DataFrame with author, month, comments, posts and replies
+                           of the comments created in [start, end).
+    :param min_interval: skip the refresh when the store is more recent than this.
+    :param lag: comments are fetched up to now - lag, so comments that HiveSQL ingests late are not skipped.
+    :return: number of windows fetched, 0 when the store was up to date or another session is refreshing.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    history_months = history_months or get_settings()["history_months"]
+    oldest = month_start(now, history_months)
+    until = now - lag
+
+    lock = get_refresh_lock()
+    if not lock.acquire(blocking=False):
+        return 0
+    try:
+        start = max(get_watermark(path) or oldest, oldest)
+        if until - start < min_interval:
+            return 0
+        windows = 0
+        while start < until:
+            end = min(start + datetime.timedelta(days=max_window_days), until)
+            activity = fetch_activity(start, end)
+            if activity is None:
+                log.warning(f"Fetching activity from {start} failed, refresh stopped")
+                break
+            add_activity(activity, end, path)
+            windows += 1
+            start = end
+        prune(oldest.strftime("%Y-%m"), path)
+        if windows:
+            log.info(f"Activity store refreshed up to {start} in {windows} window(s)")
+        return windows
+    finally:
+        lock.release()
+
+
+def refresh_in_background(fetch_activity):
+    """
+    Start a refresh on a background thread (e.g. the first build of the store), unless one is running.
+    """
+    if is_refreshing():
+        return False
+    threading.Thread(target=refresh, args=(fetch_activity,), daemon=True, name="activity-refresh").start()
+    return True
+
+
+def is_ready(now=None, path=None):
+    """
+    The store is complete up to less than READY_AGE ago, False while it is (being) built.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    watermark = get_watermark(path)
+    return watermark is not None and now - watermark <= READY_AGE
+
+
+def get_active_accounts(months, min_comments, min_posts, now=None, path=None):
+    """
+    Activity of the accounts with more than min_comments comments and more than min_posts posts
+    since the start of the month, months months ago.
+
+    :return: DataFrame with name, comment_count, post_count and replies.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    with closing(connect(path)) as connection:
+        return pd.read_sql_query("""
+            SELECT author AS name, SUM(comments) AS comment_count, SUM(posts) AS post_count, SUM(replies) AS replies
+            FROM account_activity
+            WHERE month >= ?
+            GROUP BY author
+            HAVING SUM(comments) > ? AND SUM(posts) > ?
+        """, connection, params=(month_start(now, months).strftime("%Y-%m"), min_comments, min_posts))
@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+import pandas as pd
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger("Circuit Breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# Defaults, can be overridden in secrets.toml:
+# [circuit_breaker]
+# failure_threshold = 5  # consecutive failed attempts (incl. retries) that open the circuit of a host
+# open_seconds = 60      # wait before a single probe request is let through (half-open)
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_OPEN_SECONDS = 60
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request to a host that is considered down."""
+
+    def __init__(self, host, retry_in):
+        super().__init__(f"{host} is unavailable, next attempt in {retry_in:.0f}s")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class Breaker:
+    """
+    State of one host (updated under the registry lock).
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+
+    def stats(self, open_seconds):
+        retry_in = max(self.opened_at + open_seconds - time.time(), 0) if self.state == OPEN else None
+        return {
+            "host": self.host,
+            "state": self.state,
+            "consecutive failures": self.failures,
+            "rejected requests": self.rejected,
+            "next probe in (s)": round(retry_in) if retry_in is not None else None,
+        }
+
+
+def get_settings():
+    try:
+        settings = dict(st.secrets.get("circuit_breaker", {}))
+    except FileNotFoundError:
+        settings = {}
+    return {
+        "failure_threshold": settings.get("failure_threshold", DEFAULT_FAILURE_THRESHOLD),
+        "open_seconds": settings.get("open_seconds", DEFAULT_OPEN_SECONDS),
+    }
+
+
+@st.cache_resource
+def get_registry():
+    """
+    Breakers of all hosts, shared by all sessions and worker threads.
+    Stored as a cached resource so the state survives the module reloads done on every rerun.
+    """
+    return {"lock": threading.Lock(), "hosts": {}}
+
+
+def get_host(url):
+    return urlsplit(url).netloc or url
+
+
+def get_breaker(registry, host):
+    breaker = registry["hosts"].get(host)
+    if breaker is None:
+        breaker = registry["hosts"][host] = Breaker(host)
+    return breaker
+
+
+def check(url):
+    """
+    Raise CircuitOpenError when the circuit of the host is open. After open_seconds one request is let through
+    as a probe (half-open), other requests keep failing fast until the probe succeeded.
+    """
+    open_seconds = get_settings()["open_seconds"]
+    registry = get_registry()
+    with registry["lock"]:
+        breaker = get_breaker(registry, get_host(url))
+        if breaker.state == CLOSED:
+            return
+        retry_in = breaker.opened_at + open_seconds - time.time()
+        if breaker.state == OPEN and retry_in <= 0:
+            log.info(f"{breaker.host}: half-open, probing")
+            breaker.state = HALF_OPEN
+            return
+        breaker.rejected += 1
+        raise CircuitOpenError(breaker.host, max(retry_in, 0))
+
+
+def record_success(url):
+    registry = get_registry()
+    with registry["lock"]:
+        breaker = get_breaker(registry, get_host(url))
+        if breaker.state != CLOSED:
+            log.info(f"{breaker.host}: circuit closed")
+        breaker.state = CLOSED
+        breaker.failures = 0
+
+
+def record_failure(url):
+    """
+    Count a failed attempt, the circuit opens after failure_threshold consecutive failures or a failed probe.
+    """
+    threshold = get_settings()["failure_threshold"]
+    registry = get_registry()
+    with registry["lock"]:
+        breaker = get_breaker(registry, get_host(url))
+        breaker.failures += 1
+        if breaker.state == HALF_OPEN or (breaker.state == CLOSED and breaker.failures >= threshold):
+            log.warning(f"{breaker.host}: circuit open after {breaker.failures} consecutive failures")
+            breaker.state = OPEN
+            breaker.opened_at = time.time()
+
+
+def end_probe(url):
+    """A request failed without a recorded failure (e.g. an invalid request), a running probe reopens the circuit."""
+    registry = get_registry()
+    with registry["lock"]:
+        breaker = get_breaker(registry, get_host(url))
+        if breaker.state == HALF_OPEN:
+            breaker.state = OPEN
+            breaker.opened_at = time.time()
+
+
+def get_stats():
+    """
+    Return a DataFrame with the circuit state of all hosts.
+    """
+    open_seconds = get_settings()["open_seconds"]
+    registry = get_registry()
+    with registry["lock"]:
+        return pd.DataFrame([breaker.stats(open_seconds) for breaker in registry["hosts"].values()])
+
+
+def reset():
+    registry = get_registry()
+    with registry["lock"]:
+        registry["hosts"].clear()
+
+
+class CircuitBreakerAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that fails fast while the circuit of the host is open. Every response that comes back
+    (after the retries) closes the circuit, failed attempts are recorded by LogRetry, which also stops
+    retrying as soon as the circuit opens. This bounds the time threads spend waiting on a host that is down.
+    """
+
+    def send(self, request, **kwargs):
+        check(request.url)
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            end_probe(request.url)
+            raise
+        record_success(request.url)
+        return response
@@ -3,6 +3,8 @@ import logging
 from psycopg2 import pool
 import pandas as pd
 
+from src.api import metrics
+
 # Database configuration
 DB_CONFIG = {
     'host': 'hafsql-sql.mahdiyari.info',
@@ -37,11 +39,12 @@ def fetch_balance_history(account_names):
         return pd.DataFrame()
     log.info(f"Fetching balance history for accounts: {account_names}")
 
-    db_pool = get_pool()
-    conn = db_pool.getconn()
-    try:
-        placeholders = ', '.join(['%s'] * len(account_names))
-        query = f"""
+    with metrics.track("hafsql/balances_history") as call:
+        db_pool = get_pool()
+        conn = db_pool.getconn()
+        try:
+            placeholders = ', '.join(['%s'] * len(account_names))
+            query = f"""
 WITH bh AS (
   SELECT
     bh.*,
@@ -71,22 +74,23 @@ WHERE rn_first = 1
    OR rn_last  = 1
    OR rn_month = 1
 ORDER BY account_name, block_num DESC;
-        """
+            """
 
-        with conn.cursor() as cur:
-            cur.execute(query, account_names)
-            rows = cur.fetchall()
-            if not rows:
-                print("⚠️ No results found.")
-                return pd.DataFrame()
-            columns = [desc[0] for desc in cur.description]
-            df = pd.DataFrame(rows, columns=columns)
-            return df
-    except Exception as e:
-        log.error(f"❌ Database query error: {e}")
-        return pd.DataFrame()
-    finally:
-        db_pool.putconn(conn)
+            with conn.cursor() as cur:
+                cur.execute(query, account_names)
+                rows = cur.fetchall()
+                if not rows:
+                    print("⚠️ No results found.")
+                    return pd.DataFrame()
+                columns = [desc[0] for desc in cur.description]
+                df = pd.DataFrame(rows, columns=columns)
+                return df
+        except Exception as e:
+            log.error(f"❌ Database query error: {e}")
+            call.error = True
+            return pd.DataFrame()
+        finally:
+            db_pool.putconn(conn)
 
 
 def close_database_connection():
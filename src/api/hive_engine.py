@@ -5,6 +5,10 @@ import pandas as pd
 import streamlit as st
 from hiveengine.api import Api
 
+from src.api import singleflight, metrics, retry_events
+from src.api.memory_cache import memory_cache
+from src.util import tracing
+
 
 # Hive Engine nodes (see https://beacon.peakd.com/)
 hive_engine_nodes = [
@@ -21,6 +25,12 @@ hive_engine_nodes = [
     "https://he.ausbit.dev/",
 ]
 
+# Cache budgets, per-user endpoints are bounded so the memory usage stays predictable under heavy traffic
+PER_USER_MAX_ENTRIES = 1000
+PER_USER_MAX_BYTES = 32 * 1024 * 1024
+
+RETRY_SLEEP = 0.1  # seconds between attempts on the same node
+
 
 @st.cache_resource
 def get_cached_preferred_node():
@@ -47,30 +57,49 @@ def retry_api_call(call_func, contract_name, table_name, query, attempts=3):
         node for node in hive_engine_nodes if node != preferred_node
     ]
 
-    for node in nodes_to_try:
-        for attempt in range(attempts):
-            try:
-                api = Api(url=node)
-                result = call_func(api, contract_name, table_name, query)
-
-                if node != preferred_node:
-                    set_preferred_node(node)  # Store new successful node as preferred
-
-                return result
+    endpoint = f"hive-engine/{contract_name}/{table_name}"
+    with metrics.track(endpoint):
+        for node in nodes_to_try:
+            if node != preferred_node:
+                metrics.record_failover(endpoint)
+            for attempt in range(attempts):
+                try:
+                    api = Api(url=node)
+                    result = call_func(api, contract_name, table_name, query)
+
+                    if node != preferred_node:
+                        set_preferred_node(node)  # Store new successful node as preferred
+
+                    return result
+
+                except Exception as e:
+                    logging.warning(
+                        f"[Attempt {attempt + 1}] {type(e).__name__} on node {node}. Retrying..."
+                    )
+                    retry_events.publish(retry_events.RetryEvent(retry_events.RETRY, node, attempt + 1, error=e,
+                                                                 backoff=RETRY_SLEEP, endpoint=endpoint))
+                    with tracing.span("retry sleep", kind=tracing.RETRY_SLEEP):
+                        sleep(RETRY_SLEEP)
+                    retry_events.publish(retry_events.RetryEvent(retry_events.BACKOFF, node, attempt + 1,
+                                                                 backoff=RETRY_SLEEP, endpoint=endpoint))
+
+        raise RuntimeError(
+            f"Failed after {attempts} retries for contract: {contract_name}, table: {table_name}, query: {query}"
+        )
 
-            except Exception as e:
-                logging.warning(
-                    f"[Attempt {attempt + 1}] {type(e).__name__} on node {node}. Retrying..."
-                )
-                sleep(0.1)
 
-    raise RuntimeError(
-        f"Failed after {attempts} retries for contract: {contract_name}, table: {table_name}, query: {query}"
+def coalesced_api_call(method, contract_name, table_name, query):
+    """Share one in-flight request between concurrent callers asking for the same contract/table/query."""
+    key = singleflight.make_key(method, contract_name, table_name, query)
+    result, _ = singleflight.do(
+        key,
+        lambda: retry_api_call(lambda api, c, t, q: getattr(api, method)(c, t, q), contract_name, table_name, query)
     )
+    return result
 
 
 def find_one_with_retry(contract_name, table_name, query):
-    result = retry_api_call(lambda api, c, t, q: api.find_one(c, t, q), contract_name, table_name, query)
+    result = coalesced_api_call("find_one", contract_name, table_name, query)
     if result:
         return result[0]
     else:
@@ -78,10 +107,10 @@ def find_one_with_retry(contract_name, table_name, query):
 
 
 def find_with_retry(contract_name, table_name, query):
-    return retry_api_call(lambda api, c, t, q: api.find(c, t, q), contract_name, table_name, query)
+    return coalesced_api_call("find", contract_name, table_name, query)
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=PER_USER_MAX_ENTRIES)
 def get_liquidity_positions(account, token_pair):
     query = {"account": account, "tokenPair": token_pair}
     result = find_one_with_retry("marketpools", "liquidityPositions", query)
@@ -91,7 +120,7 @@ def get_liquidity_positions(account, token_pair):
     return None
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=16)
 def get_quantity(token_pair):
     query = {"tokenPair": token_pair}
     result = find_one_with_retry("marketpools", "pools", query)
@@ -105,13 +134,13 @@ def get_quantity(token_pair):
     return 0, 0, 0
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=64)
 def get_market_with_retry(token):
     market = find_one_with_retry("market", "metrics", {"symbol": token})
     return market if market else None
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=PER_USER_MAX_ENTRIES, max_bytes=PER_USER_MAX_BYTES)
 def get_account_balances(account_name, filter_symbols=None):
     balances = find_with_retry("tokens", "balances", {"account": account_name})
     df = pd.DataFrame(balances)
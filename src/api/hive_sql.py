@@ -8,6 +8,8 @@ import pandas as pd
 import pypyodbc
 import streamlit as st
 
+from src.api import activity_store, metrics
+
 log = logging.getLogger("Hive SQL")
 
 SERVER = "vip.hivesql.io"
@@ -96,26 +98,28 @@ def execute_query_df(query, params=None):
         log.error("No valid database connection string found.")
         return pd.DataFrame()
 
-    try:
-        with closing(pypyodbc.connect(conn_string)) as connection, closing(connection.cursor()) as cursor:
-            cursor.execute(query, params or ())
-            columns = [column[0] for column in cursor.description] if cursor.description else []
-            rows = cursor.fetchall()
+    with metrics.track("hivesql") as call:
+        try:
+            with closing(pypyodbc.connect(conn_string)) as connection, closing(connection.cursor()) as cursor:
+                cursor.execute(query, params or ())
+                columns = [column[0] for column in cursor.description] if cursor.description else []
+                rows = cursor.fetchall()
 
-            if not rows:
-                return pd.DataFrame(columns=columns)
+                if not rows:
+                    return pd.DataFrame(columns=columns)
 
-            # Convert rows to dict with proper types
-            # Create DataFrame first, before type conversion
-            df = pd.DataFrame(rows, columns=columns)
+                # Convert rows to dict with proper types
+                # Create DataFrame first, before type conversion
+                df = pd.DataFrame(rows, columns=columns)
 
-            # Convert DataFrame columns to correct types
-            df = convert_dataframe_types(df, cursor.description)
+                # Convert DataFrame columns to correct types
+                df = convert_dataframe_types(df, cursor.description)
 
-            return df
-    except pypyodbc.Error as e:
-        log.error(f"Database error: {e}")
-        return pd.DataFrame()
+                return df
+        except pypyodbc.Error as e:
+            log.error(f"Database error: {e}")
+            call.error = True
+            return pd.DataFrame()
 
 
 @st.cache_data(ttl="24h")
@@ -143,7 +147,7 @@ def get_hive_balances(account_names):
         raise ValueError("account_names must be a list")
 
     hive_per_mvest = get_hive_per_mvest()
-    df = pd.DataFrame()
+    batches = []
 
     for batch in batch_list(account_names, batch_size=500):
         placeholders = ', '.join(['?'] * len(batch))
@@ -165,7 +169,11 @@ def get_hive_balances(account_names):
         """
 
         batch_result = execute_query_df(query, batch)
-        df = pd.concat([df, batch_result]) if not batch_result.empty else df
+        if not batch_result.empty:
+            batches.append(batch_result)
+
+    # Concatenate once instead of copying the growing result for every batch
+    df = pd.concat(batches) if batches else pd.DataFrame()
 
     if not df.empty:
         df["reputation_score"] = reputation_to_score(df["reputation"])
@@ -223,64 +231,102 @@ def score_to_reputation(reputation_score):
         )
 
 
+def get_activity(start, end):
+    """
+    Comment, post and reply counts per author and month of the comments created in [start, end).
+
+    Returns:
+    - DataFrame with author, month (YYYY-MM), comments, posts and replies, None when the query failed.
+    """
+    query = """
+        SELECT
+            author,
+            YEAR(created) AS year,
+            MONTH(created) AS month,
+            COUNT(permlink) AS comments,
+            COUNT(CASE WHEN parent_author = '' THEN 1 END) AS posts,
+            COUNT(CASE WHEN parent_author != '' AND parent_author != author THEN 1 END) AS replies
+        FROM Comments
+        WHERE created >= ? AND created < ?
+        GROUP BY author, YEAR(created), MONTH(created)
+    """
+    df = execute_query_df(query, (start, end))
+    if "author" not in df.columns:
+        return None  # database error, execute_query_df returns a DataFrame without columns
+
+    df["month"] = [f"{int(year):04d}-{int(month):02d}" for year, month in zip(df["year"], df["month"])]
+    return df.drop(columns="year")
+
+
+def refresh_activity():
+    """Incrementally add the comments created since the last refresh to the local activity store."""
+    return activity_store.refresh(get_activity)
+
+
+def refresh_activity_in_background():
+    """Build or update the local activity store on a background thread."""
+    return activity_store.refresh_in_background(get_activity)
+
+
+@st.cache_data(ttl="1h")
+def get_accounts_in_range(posting_rewards_min, posting_rewards_max, vesting_shares_min, vesting_shares_max,
+                          reputation_min, reputation_max):
+    """
+    Accounts within the ranges, one query; the activity filter is applied locally by joining the result
+    with the active authors of the activity store.
+    """
+    query = """
+    SELECT
+        name,
+        balance AS hive,
+        savings_balance AS hive_savings,
+        hbd_balance AS hbd,
+        savings_hbd_balance AS hbd_savings,
+        reputation AS reputation,
+        vesting_shares AS vesting_shares,
+        delegated_vesting_shares AS delegated_vesting_shares,
+        received_vesting_shares AS received_vesting_shares,
+        curation_rewards / 1000.0 AS curation_rewards,
+        posting_rewards / 1000.0 AS posting_rewards
+    FROM Accounts
+    WHERE
+        posting_rewards > ?
+        AND posting_rewards < ?
+        AND vesting_shares > ?
+        AND vesting_shares < ?
+        AND reputation > ?
+        AND reputation < ?
+    """
+    return execute_query_df(query, (posting_rewards_min, posting_rewards_max, vesting_shares_min, vesting_shares_max,
+                                    reputation_min, reputation_max))
+
+
 def get_hive_balances_params(params):
+    """
+    Accounts within the balance ranges of params with enough activity in the last params['months'] months.
+    The activity filter runs on the local activity store (whole calendar months), only the Accounts table
+    is queried remotely, so changing the activity parameters does not re-scan Comments.
+    The store is updated in the background (and by the prefetcher), the request uses the store as it is.
+    """
     hive_per_mvest = get_hive_per_mvest()
     conversion_factor = hive_per_mvest / 1e6
 
     vesting_shares_min = params['hp_min'] / conversion_factor
     vesting_shares_max = params['hp_max'] / conversion_factor
-    reputation_min = score_to_reputation(params['reputation_min'])
-    reputation_max = score_to_reputation(params['reputation_max'])
+    reputation_min = float(score_to_reputation(params['reputation_min']))
+    reputation_max = float(score_to_reputation(params['reputation_max']))
 
-    query = f"""
-    SELECT
-    a.name,
-    a.balance AS hive,
-    a.savings_balance AS hive_savings,
-    a.hbd_balance AS hbd,
-    a.savings_hbd_balance AS hbd_savings,
-    a.reputation AS reputation,
-    a.vesting_shares AS vesting_shares,
-    a.delegated_vesting_shares AS delegated_vesting_shares,
-    a.received_vesting_shares AS received_vesting_shares,
-    a.curation_rewards / 1000.0 AS curation_rewards,
-    a.posting_rewards / 1000.0 AS posting_rewards,
-    COUNT(c.permlink) AS comment_count,
-    COUNT(CASE WHEN c.parent_author = '' THEN 1 END) AS post_count,
-    COUNT(CASE WHEN c.parent_author != '' AND c.parent_author != c.author THEN 1 END) AS replies
-FROM
-    Accounts a
-JOIN
-    Comments c
-ON
-    a.name = c.author
-WHERE
-    a.posting_rewards > {params['posting_rewards_min']}
-    AND a.posting_rewards < {params['posting_rewards_max']}
-    AND a.vesting_shares > {vesting_shares_min}
-    AND a.vesting_shares < {vesting_shares_max}
-    AND a.reputation > {reputation_min}
-    AND a.reputation < {reputation_max}
-    AND c.created >= DATEADD(MONTH, -{params['months']}, GETDATE())
-GROUP BY
-    a.name,
-    a.balance,
-    a.savings_balance,
-    a.hbd_balance,
-    a.savings_hbd_balance,
-    a.reputation,
-    a.vesting_shares,
-    a.delegated_vesting_shares,
-    a.received_vesting_shares,
-    a.curation_rewards,
-    a.posting_rewards
-HAVING
-    COUNT(c.permlink) > {params['comments']}
-    AND COUNT(CASE WHEN c.parent_author = '' THEN 1 END) > {params['posts']}
-    """
+    refresh_activity_in_background()
+    activity = activity_store.get_active_accounts(params['months'], params['comments'], params['posts'])
+    if activity.empty:
+        return pd.DataFrame()
 
-    df = execute_query_df(query)
+    accounts = get_accounts_in_range(params['posting_rewards_min'], params['posting_rewards_max'],
+                                     vesting_shares_min, vesting_shares_max, reputation_min, reputation_max)
+    if accounts.empty:
+        return pd.DataFrame()
 
+    df = accounts.merge(activity, on="name", how="inner")
     if not df.empty:
         df["reputation_score"] = reputation_to_score(df['reputation'])
 
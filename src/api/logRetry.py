@@ -1,43 +1,82 @@
 import logging
-import streamlit as st
+import time
+
 from urllib3 import Retry
 
+from src.api import circuit_breaker, retry_events
+from src.util import tracing
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def get_request_url(url, pool):
+    """urllib3 passes the request path, the connection pool knows the host."""
+    if pool is None or not url or not url.startswith("/"):
+        return url or ""
+    port = f":{pool.port}" if pool.port and pool.port != DEFAULT_PORTS.get(pool.scheme) else ""
+    return f"{pool.scheme}://{pool.host}{port}{url}"
+
 
 class LogRetry(Retry):
     """
-    Adding extra logs before making a retry request, including backoff details in the sequence.
+    Logs retries and publishes them as retry events (see retry_events), with the backoff urllib3 really uses.
+    No UI calls are made here, the retry may run on a worker thread or outside Streamlit.
+    Every failed attempt counts for the circuit breaker of the host, retrying stops when the circuit opens.
     """
 
     def __init__(self, *args, logger_name="LogRetry", **kwargs):
         self.logger = logging.getLogger(logger_name)
+        self.request_url = None
         super().__init__(*args, **kwargs)
 
-    def calculate_backoff(self, retry_count):
-        """
-        Calculate the backoff time for the current retry attempt based on exponential backoff logic.
-        """
-        # Formula: backoff_factor * (2 ** (retry_count - 1)), where retry_count starts at 1
-        return self.backoff_factor * (2 ** (retry_count - 1))
+    def new(self, **kw):
+        # urllib3 creates a new Retry object per attempt, keep the logger of the session
+        retry = super().new(**kw)
+        retry.logger = self.logger
+        return retry
+
+    def get_expected_backoff(self, response):
+        """The wait of sleep(response): the Retry-After header when respected and present, else the backoff."""
+        if self.respect_retry_after_header and response:
+            retry_after = self.get_retry_after(response)
+            if retry_after:
+                return retry_after
+        return self.get_backoff_time()
 
     def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
-        # Determine the current retry count
-        retry_count = len(self.history) + 1
+        request_url = get_request_url(url, _pool)
 
-        # Calculate backoff time and the sequence position
-        current_backoff = self.calculate_backoff(retry_count)
+        # Stop retrying as soon as the host is considered down, instead of sleeping through the whole backoff
+        circuit_breaker.record_failure(request_url)
+        try:
+            circuit_breaker.check(request_url)
+        except circuit_breaker.CircuitOpenError:
+            if response:
+                response.drain_conn()
+            raise
 
-        # Log the retry information
+        # Raises MaxRetryError when the retries are exhausted, that is not a retry
+        new_retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        new_retry.request_url = request_url
+
+        retry_count = len(new_retry.history)
+        backoff = new_retry.get_expected_backoff(response)
+        status = response.status if response else None
         if response:
-            st.toast(f"Backoff retrying API request... waiting {current_backoff}s", icon="⚠️")
-            self.logger.warning(
-                f"Retry triggered for {url}. Status: {response.status}. "
-                f"Retry {retry_count}: Backoff {current_backoff}s in the sequence."
-            )
+            self.logger.warning(f"Retry triggered for {url}. Status: {status}. "
+                                f"Retry {retry_count}: Backoff {backoff}s.")
         elif error:
-            self.logger.warning(
-                f"Retry triggered for {url}. Error: {error}. "
-                f"Retry {retry_count}: Backoff {current_backoff}s in the sequence."
-            )
+            self.logger.warning(f"Retry triggered for {url}. Error: {error}. "
+                                f"Retry {retry_count}: Backoff {backoff}s.")
+
+        retry_events.publish(retry_events.RetryEvent(retry_events.RETRY, new_retry.request_url, retry_count,
+                                                     status=status, error=error, backoff=backoff))
+        return new_retry
 
-        # Call the parent class's increment method to proceed with the retry logic
-        return super().increment(method, url, response, error, _pool, _stacktrace)
+    def sleep(self, response=None):
+        start = time.perf_counter()
+        with tracing.span("retry sleep", kind=tracing.RETRY_SLEEP):
+            super().sleep(response)
+        if self.request_url:
+            retry_events.publish(retry_events.RetryEvent(retry_events.BACKOFF, self.request_url, len(self.history),
+                                                         backoff=time.perf_counter() - start))
@@ -0,0 +1,118 @@
+import logging
+import random
+import threading
+import time
+
+import streamlit as st
+
+from src.api import spl, peakmonsters, hive_sql
+
+log = logging.getLogger("Market Prefetcher")
+
+# Default refresh cadence per dataset in seconds, can be overridden in secrets.toml:
+# [prefetch]
+# enabled = true
+# jitter_seconds = 60
+# [prefetch.intervals]
+# cards_for_sale = 600
+DEFAULT_INTERVALS = {
+    "card_details": 6 * 3600,
+    "cards_for_sale": 15 * 60,
+    "market_prices": 15 * 60,
+    "deeds_market": 15 * 60,
+    "liquidity_pools": 15 * 60,
+    "prices": 5 * 60,
+    "activity_store": 15 * 60,
+}
+DEFAULT_JITTER_SECONDS = 60
+
+
+def get_market_datasets():
+    """
+    Market wide inputs of the estimates, all cached stale-while-revalidate in the shared memory cache.
+    """
+    return {
+        "card_details": spl.get_card_details,  # cards/get_details
+        "cards_for_sale": spl.get_all_cards_for_sale_df,  # market/for_sale_grouped
+        "market_prices": peakmonsters.get_market_prices_df,  # Peakmonsters prices
+        "deeds_market": spl.get_deeds_market,  # land/deeds?status=market
+        "liquidity_pools": spl.spl_get_pools,  # land/liquidity/pools
+        "prices": spl.get_prices,  # prices
+    }
+
+
+def get_datasets():
+    """
+    The market datasets and the local stores that are kept up to date in the background:
+    the activity store (HiveSQL Comments) is built here, so no user request waits for the first scan.
+    """
+    return {**get_market_datasets(), "activity_store": hive_sql.refresh_activity}
+
+
+def get_prefetch_settings():
+    try:
+        settings = dict(st.secrets.get("prefetch", {}))
+    except FileNotFoundError:
+        settings = {}
+    intervals = {**DEFAULT_INTERVALS, **dict(settings.get("intervals", {}))}
+    return {
+        "enabled": settings.get("enabled", True),
+        "jitter_seconds": settings.get("jitter_seconds", DEFAULT_JITTER_SECONDS),
+        "intervals": intervals,
+    }
+
+
+def next_due(interval, jitter):
+    """Next refresh time, jittered so datasets and server processes do not refresh in lockstep."""
+    return time.time() + max(interval + random.uniform(-jitter, jitter), 1)
+
+
+def refresh_dataset(name, func, status):
+    start = time.perf_counter()
+    # Memory cached datasets are refreshed in place, local stores have a plain refresh function
+    getattr(func, "refresh", func)()
+    status[name]["last_refresh"] = time.time()
+    status[name]["duration"] = round(time.perf_counter() - start, 2)
+    status[name]["snapshot_age"] = func.get_snapshot_age() if hasattr(func, "get_snapshot_age") else None
+    log.info(f"Prefetched {name} in {status[name]['duration']}s")
+
+
+def run(settings, status, stop_event):
+    datasets = get_datasets()
+    due = {name: time.time() for name in datasets}  # Refresh everything directly after start
+
+    while not stop_event.is_set():
+        for name, func in datasets.items():
+            if time.time() >= due[name]:
+                try:
+                    refresh_dataset(name, func, status)
+                except Exception as e:
+                    log.error(f"Prefetching {name} failed: {e}")
+                due[name] = next_due(settings["intervals"][name], settings["jitter_seconds"])
+                status[name]["next_refresh"] = due[name]
+        stop_event.wait(max(min(due.values()) - time.time(), 1))
+
+
+@st.cache_resource
+def start():
+    """
+    Start the market data prefetcher once per server process.
+    Returns the shared state with the thread, stop event and refresh status per dataset.
+    """
+    settings = get_prefetch_settings()
+    state = {
+        "thread": None,
+        "stop": threading.Event(),
+        "status": {name: {"last_refresh": None, "next_refresh": None, "duration": None, "snapshot_age": None}
+                   for name in DEFAULT_INTERVALS},
+        "settings": settings,
+    }
+    if not settings["enabled"]:
+        log.info("Market prefetcher disabled")
+        return state
+
+    state["thread"] = threading.Thread(target=run, args=(settings, state["status"], state["stop"]),
+                                       daemon=True, name="market-prefetcher")
+    state["thread"].start()
+    log.info("Market prefetcher started")
+    return state
@@ -0,0 +1,384 @@
+import copy
+import functools
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+from src.api import circuit_breaker
+
+log = logging.getLogger("Memory Cache")
+
+LRU = "lru"  # evict the least recently used entry
+LFU = "lfu"  # evict the least frequently used entry
+
+# Lookup states used for stale-while-revalidate
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+
+def parse_ttl(ttl):
+    """
+    Convert a ttl as used by st.cache_data ("1h", "24h", "1d" or seconds) into seconds.
+    Returns None when no ttl is given.
+    """
+    if ttl is None:
+        return None
+    if isinstance(ttl, (int, float)):
+        return float(ttl)
+    return pd.Timedelta(ttl).total_seconds()
+
+
+def estimate_size(value):
+    """
+    Estimate the memory footprint of a cached value in bytes.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        size = value.memory_usage(deep=True)
+        return int(size.sum()) if isinstance(size, pd.Series) else int(size)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return 0
+
+
+def make_key(args, kwargs):
+    """
+    Build a hashable cache key from function arguments (lists and dicts are converted to tuples).
+    """
+    def freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple, set)):
+            return tuple(freeze(v) for v in value)
+        return value
+
+    return freeze(args), freeze(kwargs)
+
+
+def is_empty_result(value):
+    """
+    True for results that indicate a failed request (fetch functions return an empty DataFrame on failure).
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.empty
+    return value is None or value == {}
+
+
+def copy_value(value):
+    """
+    Return a copy so callers cannot modify the cached data shared by all sessions (same behaviour as
+    st.cache_data). Other values than pandas objects (e.g. the dicts and lists of prices) are deep copied.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+class BudgetCache:
+    """
+    Thread safe cache that evicts entries when the number of entries exceeds max_entries
+    or the total size exceeds max_bytes. Keeps hit/miss/eviction counters for monitoring.
+    """
+
+    def __init__(self, name, ttl=None, max_entries=None, max_bytes=None, policy=LRU):
+        self.name = name
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+        self._entries = OrderedDict()  # key -> [value, size, stored_at, use_count]
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.configure(ttl, max_entries, max_bytes, policy)
+
+    def configure(self, ttl=None, max_entries=None, max_bytes=None, policy=LRU):
+        if policy not in (LRU, LFU):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        with self._lock:
+            self.ttl = parse_ttl(ttl)
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self.policy = policy
+            self._evict()
+
+    def get(self, key):
+        """
+        Return (True, value) for a valid entry, (False, None) when missing or expired.
+        An expired entry is kept (within the budget) until it is replaced, as fallback for get_stale.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            if self.ttl is not None and time.time() - entry[2] > self.ttl:
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+            entry[3] += 1
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def lookup(self, key):
+        """
+        Lookup for stale-while-revalidate, expired entries are not removed but returned as STALE.
+        Returns (state, value) with state FRESH, STALE or MISS.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS, None
+            entry[3] += 1
+            self._entries.move_to_end(key)
+            if self.ttl is not None and time.time() - entry[2] > self.ttl:
+                self.stale_hits += 1
+                return STALE, entry[0]
+            self.hits += 1
+            return FRESH, entry[0]
+
+    def get_stale(self, key):
+        """
+        Return (True, value) for any stored entry, also when expired, (False, None) when missing.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            self.stale_hits += 1
+            return True, entry[0]
+
+    def age(self, key):
+        """
+        Seconds since the entry was stored, None when there is no entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return time.time() - entry[2] if entry is not None else None
+
+    def start_refresh(self, key):
+        """
+        Mark the key as being refreshed, returns False when a refresh is already running.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+            self.refreshes += 1
+
+    def set(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            # A replaced entry keeps its use count, a refreshed hot entry is not the next LFU victim
+            use_count = 1
+            if key in self._entries:
+                use_count = self._entries[key][3]
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                log.warning(f"{self.name}: value of {size} bytes exceeds budget of {self.max_bytes} bytes, not cached")
+                return
+            self._entries[key] = [value, size, time.time(), use_count]
+            self.total_bytes += size
+            self._evict(keep=key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "function": self.name,
+            "policy": self.policy,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry[1]
+
+    def _over_budget(self):
+        too_many = self.max_entries is not None and len(self._entries) > self.max_entries
+        too_big = self.max_bytes is not None and self.total_bytes > self.max_bytes
+        return too_many or too_big
+
+    def _select_victim(self, keep=None):
+        candidates = [key for key in self._entries if key != keep] or list(self._entries)
+        if self.policy == LFU:
+            # Lowest use count, ties resolved by least recently used (first in order)
+            return min(candidates, key=lambda k: self._entries[k][3])
+        return candidates[0]
+
+    def _evict(self, keep=None):
+        """
+        Evict until the cache is within budget. The entry that was just stored (keep) is never the victim,
+        under LFU it has the lowest use count and would otherwise be evicted as soon as all others were read.
+        """
+        while self._entries and self._over_budget():
+            self._remove(self._select_victim(keep))
+            self.evictions += 1
+
+
+@st.cache_resource
+def get_cache_registry():
+    """
+    Registry of all caches created with the memory_cache decorator, keyed by module and function name.
+    Stored as a cached resource so the caches survive the module reloads done on every rerun.
+    """
+    return {}
+
+
+def get_cache(name, ttl=None, max_entries=None, max_bytes=None, policy=LRU):
+    """
+    Return the registered cache with this name, create it when missing and apply the (possibly changed) budgets.
+    """
+    registry = get_cache_registry()
+    cache = registry.get(name)
+    if cache is None:
+        cache = registry.setdefault(name, BudgetCache(name, ttl, max_entries, max_bytes, policy))
+    elif (cache.ttl, cache.max_entries, cache.max_bytes, cache.policy) != (parse_ttl(ttl), max_entries, max_bytes,
+                                                                           policy):
+        cache.configure(ttl, max_entries, max_bytes, policy)
+    return cache
+
+
+def refresh_entry(cache, key, func, args, kwargs):
+    """
+    Recompute an entry and store it. A failed (empty) result does not replace an existing snapshot.
+    """
+    try:
+        value = func(*args, **kwargs)
+        if is_empty_result(value) and cache.age(key) is not None:
+            log.warning(f"{cache.name}: refresh returned no data, keeping the previous snapshot")
+            return
+        cache.set(key, value)
+    except Exception as e:
+        log.error(f"{cache.name}: background refresh failed: {e}")
+    finally:
+        cache.end_refresh(key)
+
+
+def refresh_in_background(cache, key, func, args, kwargs):
+    """
+    Start a background refresh of the entry, unless one is already running for this key.
+    """
+    if cache.start_refresh(key):
+        log.info(f"{cache.name}: serving stale snapshot, refreshing in background")
+        threading.Thread(target=refresh_entry, args=(cache, key, func, args, kwargs), daemon=True,
+                         name=f"refresh-{cache.name}").start()
+
+
+def compute_entry(cache, key, func, args, kwargs):
+    """
+    Compute and store an entry. While the circuit of the source is open, the last (expired) result is returned
+    instead, that is better than an error.
+    """
+    try:
+        value = func(*args, **kwargs)
+    except circuit_breaker.CircuitOpenError as e:
+        found, value = cache.get_stale(key)
+        if not found:
+            raise
+        log.warning(f"{cache.name}: {e}, serving stale snapshot")
+        return value
+    cache.set(key, value)
+    return value
+
+
+def memory_cache(ttl=None, max_entries=None, max_bytes=None, policy=LRU, stale_while_revalidate=False):
+    """
+    Decorator that caches function results in a process wide BudgetCache.
+    Use this instead of st.cache_data when the memory usage of the cache needs to be bounded.
+
+    :param ttl: time to live of an entry, same notation as st.cache_data (e.g. "1h") or seconds.
+    :param max_entries: maximum number of cached results of this function.
+    :param max_bytes: memory budget of all entries of this function together.
+    :param policy: eviction policy, LRU or LFU.
+    :param stale_while_revalidate: when an entry expired, return the last snapshot immediately and
+                                   refresh it on a background thread. Only the very first call blocks.
+
+    While the circuit of the source is open (CircuitOpenError) an expired result is returned when there is one.
+    """
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        def current_cache():
+            return get_cache(name, ttl, max_entries, max_bytes, policy)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = current_cache()
+            key = make_key(args, kwargs)
+            if stale_while_revalidate:
+                state, value = cache.lookup(key)
+                if state == STALE:
+                    refresh_in_background(cache, key, func, args, kwargs)
+                found = state != MISS
+            else:
+                found, value = cache.get(key)
+            if not found:
+                value = compute_entry(cache, key, func, args, kwargs)
+            return copy_value(value)
+
+        def get_snapshot_age(*args, **kwargs):
+            """Seconds since the cached result for these arguments was fetched, None when not cached."""
+            return current_cache().age(make_key(args, kwargs))
+
+        def refresh(*args, **kwargs):
+            """Recompute and store the result for these arguments now, returns False when already refreshing."""
+            cache = current_cache()
+            key = make_key(args, kwargs)
+            if not cache.start_refresh(key):
+                return False
+            refresh_entry(cache, key, func, args, kwargs)
+            return True
+
+        wrapper.get_cache = current_cache
+        wrapper.get_snapshot_age = get_snapshot_age
+        wrapper.refresh = refresh
+        wrapper.clear = lambda: current_cache().clear()
+        return wrapper
+
+    return decorator
+
+
+def get_cache_stats():
+    """
+    Return a DataFrame with the counters and budget usage of all registered caches.
+    """
+    return pd.DataFrame([cache.stats() for cache in get_cache_registry().values()])
+
+
+def clear_all():
+    """Clear all caches created with the memory_cache decorator."""
+    for cache in get_cache_registry().values():
+        cache.clear()
@@ -0,0 +1,198 @@
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import pandas as pd
+import streamlit as st
+
+from src.api import memory_cache
+from src.util import tracing
+
+# Upper bounds (seconds) of the latency histogram buckets, the last bucket (+Inf) catches the rest
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_PREFIX = "beebalance"
+
+
+class EndpointMetrics:
+    """
+    Counters and latency histogram of one endpoint (updated under the registry lock).
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.failovers = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds, error, received):
+        self.calls += 1
+        self.errors += int(error)
+        self.bytes += received
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.buckets[next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound),
+                          len(LATENCY_BUCKETS))] += 1
+
+    def stats(self):
+        return {
+            "endpoint": self.endpoint,
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "failovers": self.failovers,
+            "bytes": self.bytes,
+            "total (s)": round(self.seconds, 3),
+            "mean (s)": round(self.seconds / self.calls, 3) if self.calls else None,
+            "max (s)": round(self.max_seconds, 3),
+        }
+
+
+@st.cache_resource
+def get_registry():
+    """
+    Metrics of all endpoints, shared by all sessions and worker threads.
+    Stored as a cached resource so the counters survive the module reloads done on every rerun.
+    """
+    return {"lock": threading.Lock(), "endpoints": {}}
+
+
+def update(endpoint, func):
+    """Apply func(EndpointMetrics) to the metrics of endpoint under the registry lock."""
+    registry = get_registry()
+    with registry["lock"]:
+        metrics = registry["endpoints"].get(endpoint)
+        if metrics is None:
+            metrics = registry["endpoints"][endpoint] = EndpointMetrics(endpoint)
+        func(metrics)
+
+
+def endpoint_from_url(url):
+    """
+    Endpoint name of a request url: host and the first two path segments, so account names in the path
+    (e.g. cards/collection/<player>) and query parameters do not create an endpoint per account.
+    """
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.split("/") if segment][:2]
+    return "/".join([parts.netloc] + segments)
+
+
+class Call:
+    """A tracked call, the caller can flag an error that was handled (no exception) and add received bytes."""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.error = False
+        self.bytes = 0
+
+
+@contextmanager
+def track(endpoint):
+    """
+    Record the latency, outcome and received bytes of a call:
+
+        with metrics.track(metrics.endpoint_from_url(address)) as call:
+            response = http.get(address)
+            call.bytes = len(response.content)
+
+    An exception raised in the block counts as an error. Within a trace the call is a network span.
+    """
+    call = Call(endpoint)
+    start = time.perf_counter()
+    try:
+        with tracing.span(endpoint, kind=tracing.NETWORK):
+            yield call
+    except Exception:
+        call.error = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        update(endpoint, lambda metrics: metrics.observe(seconds, call.error, call.bytes))
+
+
+def record_retry(endpoint):
+    update(endpoint, lambda metrics: setattr(metrics, "retries", metrics.retries + 1))
+
+
+def record_failover(endpoint):
+    update(endpoint, lambda metrics: setattr(metrics, "failovers", metrics.failovers + 1))
+
+
+def get_stats():
+    """
+    Return a DataFrame with the counters and latency of all endpoints.
+    """
+    registry = get_registry()
+    with registry["lock"]:
+        return pd.DataFrame([metrics.stats() for metrics in registry["endpoints"].values()])
+
+
+def reset():
+    registry = get_registry()
+    with registry["lock"]:
+        registry["endpoints"].clear()
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(**labels):
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def add_family(lines, name, kind, help_text, samples):
+    """Add a metric family, samples is a list of (suffix, labels dict, value)."""
+    lines.append(f"# HELP {PROMETHEUS_PREFIX}_{name} {help_text}")
+    lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name} {kind}")
+    for suffix, labels, value in samples:
+        lines.append(f"{PROMETHEUS_PREFIX}_{name}{suffix}{format_labels(**labels)} {value}")
+
+
+def to_prometheus():
+    """
+    All endpoint metrics and memory cache counters in the Prometheus text exposition format.
+    """
+    registry = get_registry()
+    with registry["lock"]:
+        endpoints = [(metrics.endpoint, dict(vars(metrics)), list(metrics.buckets))
+                     for metrics in registry["endpoints"].values()]
+
+    lines = []
+    counters = [
+        ("api_calls_total", "calls", "API calls per endpoint."),
+        ("api_errors_total", "errors", "Failed API calls per endpoint."),
+        ("api_retries_total", "retries", "Retried requests per endpoint."),
+        ("api_failovers_total", "failovers", "Switches to another node per endpoint."),
+        ("api_received_bytes_total", "bytes", "Response bytes received per endpoint."),
+    ]
+    for name, attribute, help_text in counters:
+        add_family(lines, name, "counter", help_text,
+                   [("", {"endpoint": endpoint}, values[attribute]) for endpoint, values, _ in endpoints])
+
+    histogram = []
+    for endpoint, values, buckets in endpoints:
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+            cumulative += count
+            histogram.append(("_bucket", {"endpoint": endpoint, "le": bound}, cumulative))
+        histogram.append(("_sum", {"endpoint": endpoint}, round(values["seconds"], 6)))
+        histogram.append(("_count", {"endpoint": endpoint}, values["calls"]))
+    add_family(lines, "api_latency_seconds", "histogram", "API call latency per endpoint.", histogram)
+
+    caches = memory_cache.get_cache_stats()
+    cache_counters = [
+        ("cache_hits_total", "hits", "Memory cache hits per cached function."),
+        ("cache_stale_hits_total", "stale_hits", "Stale snapshots served per cached function."),
+        ("cache_misses_total", "misses", "Memory cache misses per cached function."),
+    ]
+    for name, column, help_text in cache_counters:
+        add_family(lines, name, "counter", help_text,
+                   [("", {"function": row["function"]}, row[column]) for row in caches.to_dict("records")])
+    return "\n".join(lines) + "\n"
@@ -2,9 +2,11 @@ import logging
 
 import pandas as pd
 import requests
-from requests.adapters import HTTPAdapter
 
+from src.api import metrics
+from src.api.circuit_breaker import CircuitBreakerAdapter
 from src.api.logRetry import LogRetry
+from src.api.memory_cache import memory_cache
 
 # Configure retry strategy
 retry_strategy = LogRetry(
@@ -14,24 +16,29 @@ retry_strategy = LogRetry(
     allowed_methods=["HEAD", "GET", "OPTIONS"],
     logger_name="Peakmonster Retry"
 )
-adapter = HTTPAdapter(max_retries=retry_strategy)
+adapter = CircuitBreakerAdapter(max_retries=retry_strategy)
 http = requests.Session()
 http.mount("https://", adapter)
+http.mount("http://", adapter)
 
 peak_monsters_url = "https://peakmonsters.com/api/market/cards/prices"
 
 log = logging.getLogger("Peakmonsters API")
 
 
+@memory_cache(ttl="1h", max_entries=1, stale_while_revalidate=True)
 def get_market_prices_df():
-    try:
-        response = http.get(peak_monsters_url)
-        result = response.json()  # Validate JSON response
+    with metrics.track(metrics.endpoint_from_url(peak_monsters_url)) as call:
+        try:
+            response = http.get(peak_monsters_url)
+            call.bytes = len(response.content)
+            result = response.json()  # Validate JSON response
 
-        if isinstance(result, dict) and 'prices' in result:
-            return pd.DataFrame(result["prices"])
+            if isinstance(result, dict) and 'prices' in result:
+                return pd.DataFrame(result["prices"])
 
-    except (ValueError, requests.exceptions.RequestException) as e:
-        log.error(f"Error fetching market prices: {e}")
+        except (ValueError, requests.exceptions.RequestException) as e:
+            log.error(f"Error fetching market prices: {e}")
 
-    return pd.DataFrame()  # Return empty DataFrame on failure
+        call.error = True
+        return pd.DataFrame()  # Return empty DataFrame on failure
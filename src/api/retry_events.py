@@ -0,0 +1,139 @@
+import logging
+import threading
+from urllib.parse import urlsplit
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from src.api import metrics
+
+log = logging.getLogger("Retry events")
+
+# Event kinds: a failed attempt that is retried, and the (measured) wait before the next attempt
+RETRY = "retry"
+BACKOFF = "backoff"
+
+
+class RetryEvent:
+    """
+    A retry of a request, published from the thread that makes the request (often a worker thread).
+
+    :param kind: RETRY or BACKOFF.
+    :param url: full request url, the host is taken from it.
+    :param attempt: number of the retry (1 for the first retry of a request).
+    :param status: HTTP status of the failed attempt, None for connection errors.
+    :param error: error of the failed attempt, None when the server responded.
+    :param backoff: RETRY: expected wait before the next attempt, BACKOFF: seconds actually waited.
+    :param endpoint: metrics endpoint of the request, derived from url when not given.
+    """
+
+    def __init__(self, kind, url, attempt, status=None, error=None, backoff=0.0, endpoint=None):
+        self.kind = kind
+        self.url = url
+        self.host = urlsplit(url).netloc or url
+        self.attempt = attempt
+        self.status = status
+        self.error = error
+        self.backoff = backoff
+        self.endpoint = endpoint or metrics.endpoint_from_url(url)
+
+
+class HostCounters:
+    def __init__(self, host):
+        self.host = host
+        self.attempts = 0
+        self.errors = 0
+        self.backoff_seconds = 0.0
+        self.statuses = {}
+
+    def add(self, event):
+        if event.kind == BACKOFF:
+            self.backoff_seconds += event.backoff
+            return
+        self.attempts += 1
+        if event.status is None:
+            self.errors += 1
+        else:
+            self.statuses[event.status] = self.statuses.get(event.status, 0) + 1
+
+    def stats(self):
+        return {
+            "host": self.host,
+            "retries": self.attempts,
+            "connection errors": self.errors,
+            "backoff (s)": round(self.backoff_seconds, 3),
+            "status codes": ", ".join(f"{status}: {count}" for status, count in sorted(self.statuses.items())),
+        }
+
+
+@st.cache_resource
+def get_bus():
+    """
+    Retry counters per host and the subscribers, shared by all sessions and worker threads.
+    Stored as a cached resource so they survive the module reloads done on every rerun.
+    """
+    return {"lock": threading.Lock(), "hosts": {}, "subscribers": {}}
+
+
+def subscribe(name, callback):
+    """
+    Call callback(event) for every published event. Subscribing again with the same name replaces the callback,
+    so subscribing on every script run is safe.
+    """
+    bus = get_bus()
+    with bus["lock"]:
+        bus["subscribers"][name] = callback
+
+
+def unsubscribe(name):
+    bus = get_bus()
+    with bus["lock"]:
+        bus["subscribers"].pop(name, None)
+
+
+def publish(event):
+    """
+    Count the event and pass it to the subscribers. Subscribers are called on the publishing thread,
+    outside the lock; a failing subscriber is logged and does not affect the request or other subscribers.
+    """
+    bus = get_bus()
+    with bus["lock"]:
+        counters = bus["hosts"].get(event.host)
+        if counters is None:
+            counters = bus["hosts"][event.host] = HostCounters(event.host)
+        counters.add(event)
+        subscribers = list(bus["subscribers"].items())
+
+    if event.kind == RETRY:
+        metrics.record_retry(event.endpoint)
+
+    for name, callback in subscribers:
+        try:
+            callback(event)
+        except Exception as e:
+            log.warning(f"Retry event subscriber {name} failed: {e}")
+
+
+def get_stats():
+    """
+    Return a DataFrame with the retries, backoff seconds and status codes per host.
+    """
+    bus = get_bus()
+    with bus["lock"]:
+        return pd.DataFrame([counters.stats() for counters in bus["hosts"].values()])
+
+
+def reset():
+    bus = get_bus()
+    with bus["lock"]:
+        bus["hosts"].clear()
+
+
+def show_toast(event):
+    """
+    Subscriber that shows retries as a toast. Only retries made on a script thread are shown (in the session of
+    that thread), retries on worker threads or outside Streamlit are counted only.
+    """
+    if event.kind == RETRY and get_script_run_ctx(suppress_warning=True) is not None:
+        st.toast(f"Retrying API request to {event.host}... waiting {event.backoff:.1f}s", icon="⚠️")
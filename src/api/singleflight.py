@@ -0,0 +1,76 @@
+import json
+import logging
+import threading
+
+import streamlit as st
+
+log = logging.getLogger("Singleflight")
+
+
+class Call:
+    """
+    A single in-flight call, followers wait on the event and share the result (or error) of the leader.
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+@st.cache_resource
+def get_in_flight_calls():
+    """
+    Shared table of in-flight calls for all sessions.
+    Stored as a cached resource so it survives the module reloads done on every rerun.
+    """
+    return {"lock": threading.Lock(), "calls": {}}
+
+
+def make_key(*parts):
+    """
+    Build a key from the request parts, e.g. url + params or contract + table + query.
+    """
+    return json.dumps(parts, sort_keys=True, default=str)
+
+
+def do(key, func):
+    """
+    Execute func once for all concurrent callers with the same key.
+    The first caller (leader) executes func, callers arriving while it runs wait and share its result.
+
+    :param key: identifies identical requests, see make_key.
+    :param func: function without arguments that performs the request.
+    :return: tuple (result, shared) where shared is True when the result came from another caller's request.
+    """
+    in_flight = get_in_flight_calls()
+    with in_flight["lock"]:
+        call = in_flight["calls"].get(key)
+        if call is not None:
+            call.followers += 1
+            leader = False
+        else:
+            call = Call()
+            in_flight["calls"][key] = call
+            leader = True
+
+    if not leader:
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    try:
+        call.result = func()
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with in_flight["lock"]:
+            in_flight["calls"].pop(key, None)
+        if call.followers:
+            log.debug(f"Shared result of {key} with {call.followers} waiting caller(s)")
+        call.event.set()
+
+    return call.result, False
@@ -3,10 +3,11 @@ from typing import Dict, Any, Optional, List
 
 import pandas as pd
 import requests
-import streamlit as st
-from requests.adapters import HTTPAdapter
 
+from src.api import singleflight, metrics
+from src.api.circuit_breaker import CircuitBreakerAdapter
 from src.api.logRetry import LogRetry
+from src.api.memory_cache import memory_cache, LFU
 
 # API URLs
 API_URLS = {
@@ -15,6 +16,25 @@ API_URLS = {
     "prices": "https://prices.splinterlands.com/",
 }
 
+# Compact dtypes for the player card collection, uid is unique per card so a category would not save memory
+COLLECTION_DTYPES = {
+    "player": "category",
+    "card_detail_id": "int16",
+    "collection_power": "int32",
+    "xp": "int32",
+    "gold": "bool",
+    "edition": "int8",
+    "level": "int8",
+    "bcx": "int32",
+    "bcx_unbound": "int32",
+}
+
+# Cache budgets, per-user endpoints are bounded so the memory usage stays predictable under heavy traffic
+MB = 1024 * 1024
+COLLECTION_CACHE_MAX_BYTES = 128 * MB
+PER_USER_MAX_ENTRIES = 1000
+PER_USER_MAX_BYTES = 32 * MB
+
 # Configure Logging
 log = logging.getLogger("SPL API")
 log.setLevel(logging.INFO)
@@ -29,9 +49,10 @@ def configure_http_session() -> requests.Session:
         allowed_methods=["HEAD", "GET", "OPTIONS"],
         logger_name="SPL Retry"
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = CircuitBreakerAdapter(max_retries=retry_strategy)
     session = requests.Session()
     session.mount("https://", adapter)
+    session.mount("http://", adapter)
     session.headers.update({
         "Accept-Encoding": "gzip, deflate",
         "User-Agent": "BeeBalanced/1.0"
@@ -52,41 +73,64 @@ def fetch_api_data(address: str, params: Optional[Dict[str, Any]] = None,
     :param data_key: Key to extract data from JSON response (optional).
     :return: DataFrame with requested data or empty DataFrame on failure.
     """
-    try:
-        response = http.get(address, params=params, timeout=10)
-        response.raise_for_status()
+    # Concurrent identical requests (e.g. several sessions opening the same account) hit the API only once
+    key = singleflight.make_key(address, params, data_key)
+    df, shared = singleflight.do(key, lambda: request_api_data(address, params, data_key))
+    return df.copy() if shared else df
 
-        response_json = response.json()
 
-        # Handle API errors
-        if isinstance(response_json, dict) and "error" in response_json:
-            log.error(f"API error from {address}: {response_json['error']}")
-            return pd.DataFrame()
+def request_api_data(address: str, params: Optional[Dict[str, Any]] = None,
+                     data_key: Optional[str] = None) -> pd.DataFrame:
+    """
+    Perform the actual request for fetch_api_data.
+    """
+    with metrics.track(metrics.endpoint_from_url(address)) as call:
+        try:
+            response = http.get(address, params=params, timeout=10)
+            call.bytes = len(response.content)
+            response.raise_for_status()
 
-        if data_key and isinstance(response_json, dict):
-            response_json = get_nested_value(response_json, data_key)
+            response_json = response.json()
 
-        if isinstance(response_json, list):
-            return pd.DataFrame(response_json)
-        else:
-            return pd.DataFrame(response_json, index=[0])
+            # Handle API errors
+            if isinstance(response_json, dict) and "error" in response_json:
+                log.error(f"API error from {address}: {response_json['error']}")
+                call.error = True
+                return pd.DataFrame()
 
-    except requests.exceptions.RequestException as e:
-        log.error(f"Error fetching {address}: {e}")
-        return pd.DataFrame()
+            if data_key and isinstance(response_json, dict):
+                response_json = get_nested_value(response_json, data_key)
+
+            if isinstance(response_json, list):
+                return pd.DataFrame(response_json)
+            else:
+                return pd.DataFrame(response_json, index=[0])
+
+        except requests.exceptions.RequestException as e:
+            log.error(f"Error fetching {address}: {e}")
+            call.error = True
+            return pd.DataFrame()
+
+
+def compact_collection_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce the memory footprint of a player collection by using small integer, bool and category dtypes.
+    """
+    df = df[["player", "uid", "card_detail_id", "collection_power", "xp", "gold", "edition", "level", "bcx",
+             "bcx_unbound"]]
+    return df.astype(COLLECTION_DTYPES)
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=PER_USER_MAX_ENTRIES, max_bytes=COLLECTION_CACHE_MAX_BYTES, policy=LFU)
 def get_player_collection_df(username: str) -> pd.DataFrame:
     """
-    Fetch player card collection and return filtered DataFrame.
+    Fetch player card collection and return filtered DataFrame with compact dtypes.
     """
     df = fetch_api_data(f"{API_URLS['base']}cards/collection/{username}", data_key="cards")
-    return df[["player", "uid", "card_detail_id", "collection_power", "xp", "gold", "edition", "level", "bcx",
-               "bcx_unbound"]] if not df.empty else df
+    return compact_collection_df(df) if not df.empty else df
 
 
-@st.cache_data(ttl="24h")
+@memory_cache(ttl="24h", max_entries=1, stale_while_revalidate=True)
 def get_card_details() -> pd.DataFrame:
     """
     Fetch and index all card details.
@@ -96,7 +140,7 @@ def get_card_details() -> pd.DataFrame:
     return df.set_index("id") if not df.empty else df
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=PER_USER_MAX_ENTRIES, max_bytes=PER_USER_MAX_BYTES)
 def get_balances(username: str, filter_tokens: Optional[List[str]] = None) -> pd.DataFrame:
     """
     Fetch player balances and optionally filter by tokens.
@@ -114,15 +158,17 @@ def get_balances(username: str, filter_tokens: Optional[List[str]] = None) -> pd
     return df
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=1, stale_while_revalidate=True)
 def get_prices() -> Dict:
     """
     Fetch current asset prices.
     """
-    return http.get(f"{API_URLS['prices']}prices").json()
+    address = f"{API_URLS['prices']}prices"
+    prices, _ = singleflight.do(singleflight.make_key(address), lambda: http.get(address).json())
+    return prices
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=1, stale_while_revalidate=True)
 def get_all_cards_for_sale_df() -> pd.DataFrame:
     """
     Fetch all cards currently for sale.
@@ -131,7 +177,7 @@ def get_all_cards_for_sale_df() -> pd.DataFrame:
     return df.sort_values(by="card_detail_id") if not df.empty else df
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=PER_USER_MAX_ENTRIES, max_bytes=PER_USER_MAX_BYTES)
 def get_staked_dec_df(account_name: str) -> pd.DataFrame:
     """
     Fetch staked DEC for land.
@@ -139,7 +185,7 @@ def get_staked_dec_df(account_name: str) -> pd.DataFrame:
     return fetch_api_data(f"{API_URLS['land']}land/stake/decstaked", params={"player": account_name}, data_key="data")
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=PER_USER_MAX_ENTRIES, max_bytes=PER_USER_MAX_BYTES, policy=LFU)
 def get_deeds_collection(username):
     """
     Fetch land deeds from a player.
@@ -151,7 +197,7 @@ def get_deeds_collection(username):
     return fetch_api_data(f'{API_URLS['land']}land/deeds', params=params, data_key='data.deeds')
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=1, stale_while_revalidate=True)
 def get_deeds_market():
     """
     Fetch land deeds currently on the market.
@@ -159,7 +205,7 @@ def get_deeds_market():
     return fetch_api_data(f'{API_URLS['land']}land/deeds', params={'status': 'market'}, data_key='data.deeds')
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=1, stale_while_revalidate=True)
 def spl_get_pools():
     """
     Fetch liquidity pools data.
@@ -167,7 +213,7 @@ def spl_get_pools():
     return fetch_api_data(f'{API_URLS['land']}land/liquidity/pools', data_key='data')
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=PER_USER_MAX_ENTRIES * 10)
 def get_owned_resource_sum(account, resource):
     """
     Fetch the total owned amount of a specific resource for a player.
@@ -178,7 +224,7 @@ def get_owned_resource_sum(account, resource):
     return df['amount'].sum() if 'amount' in df.columns else 0  # Return 0 instead of None if missing
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=PER_USER_MAX_ENTRIES * 10)
 def player_exist(account_name: str) -> bool:
     """
     Check if a player exists in the Splinterlands API.
@@ -187,7 +233,7 @@ def player_exist(account_name: str) -> bool:
     return not player_data.empty
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=PER_USER_MAX_ENTRIES, max_bytes=PER_USER_MAX_BYTES)
 def get_player_details(account_name: str) -> pd.DataFrame:
     """
     Fetch player details.
@@ -195,7 +241,7 @@ def get_player_details(account_name: str) -> pd.DataFrame:
     return fetch_api_data(f"{API_URLS['base']}players/details", params={"name": account_name})
 
 
-@st.cache_data(ttl="1d")
+@memory_cache(ttl="1d", max_entries=16, max_bytes=PER_USER_MAX_BYTES)
 def get_metrics(metrics=None, from_date=None) -> pd.DataFrame:
     """
     Fetch specific metrics.
@@ -215,7 +261,7 @@ def get_metrics(metrics=None, from_date=None) -> pd.DataFrame:
         return pd.DataFrame(df[df.metric == metrics]['values'].iloc[0])
 
 
-@st.cache_data(ttl="1h")
+@memory_cache(ttl="1h", max_entries=1)
 def get_spsp_richlist() -> pd.DataFrame:
     """
     Fetch the SPSP rich list.
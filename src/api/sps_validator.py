@@ -2,8 +2,9 @@ import logging
 
 import pandas as pd
 import requests
-from requests.adapters import HTTPAdapter
 
+from src.api import metrics
+from src.api.circuit_breaker import CircuitBreakerAdapter
 from src.api.logRetry import LogRetry
 
 # API URLs
@@ -26,9 +27,10 @@ def configure_http_session() -> requests.Session:
         allowed_methods=["HEAD", "GET", "OPTIONS"],
         logger_name="SPL Retry"
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
+    adapter = CircuitBreakerAdapter(max_retries=retry_strategy)
     session = requests.Session()
     session.mount("https://", adapter)
+    session.mount("http://", adapter)
     session.headers.update({
         "Accept": "application/json",
         "User-Agent": "BeeBalanced/1.0"
@@ -52,19 +54,23 @@ def get_rich_list_spsp(number_of_accounts: int) -> pd.DataFrame:
         'systemAccounts': False,
     }
 
-    try:
-        response = http.get(address, params=params, timeout=DEFAULT_TIMEOUT)
-        response.raise_for_status()
+    with metrics.track(metrics.endpoint_from_url(address)) as call:
+        try:
+            response = http.get(address, params=params, timeout=DEFAULT_TIMEOUT)
+            call.bytes = len(response.content)
+            response.raise_for_status()
 
-        response_json = response.json()
+            response_json = response.json()
 
-        # Validate API response structure
-        if not isinstance(response_json, dict) or 'balances' not in response_json:
-            log.error(f"Unexpected API response from {address}: {response_json}")
-            return pd.DataFrame()
+            # Validate API response structure
+            if not isinstance(response_json, dict) or 'balances' not in response_json:
+                log.error(f"Unexpected API response from {address}: {response_json}")
+                call.error = True
+                return pd.DataFrame()
 
-        return pd.DataFrame(response_json['balances'])
+            return pd.DataFrame(response_json['balances'])
 
-    except requests.exceptions.RequestException as e:
-        log.error(f"Error fetching {address} (Status Code: {getattr(e.response, 'status_code', 'N/A')}): {e}")
-        return pd.DataFrame()
+        except requests.exceptions.RequestException as e:
+            log.error(f"Error fetching {address} (Status Code: {getattr(e.response, 'status_code', 'N/A')}): {e}")
+            call.error = True
+            return pd.DataFrame()
@@ -4,6 +4,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+from src.graphs import graph_util, decimation
+
 MAX_STREAMLIT_SLIDER_VALUE = (1 << 53) - 1  # Max allowed by Streamlit
 
 
@@ -80,18 +82,13 @@ def get_page(df,
 
     df = update_x_axis_to_category(df, x_axis)
 
-    # **Hover Info: Now enabled by default with X and selected Y columns**
-    default_hover_columns = [x_axis] + y_axes
-    enable_hover = st.sidebar.checkbox("Enable Hover Info", value=True)  # Default to True
-    hover_columns = st.sidebar.multiselect("Select Hover Columns", df.columns,
-                                           default=default_hover_columns) if enable_hover else []
+    show_hover_text = determine_hover_text(df, x_axis, y_axes)
 
-    # Function to format hover text properly
-    def format_hover_text(row):
-        return "<br>".join([f"{col}: {row[col]}" for col in hover_columns])
+    render_mode = "webgl" if graph_util.get_webgl_setting(len(df), widget_suffix="custom", sidebar=True) else "svg"
 
-    # Create hover text column
-    df["hover_text"] = df.apply(format_hover_text, axis=1) if enable_hover and hover_columns else None
+    point_budget = st.sidebar.number_input("Point budget per trace", min_value=100,
+                                           value=decimation.DEFAULT_POINT_BUDGET, step=500,
+                                           help="Larger data sets are reduced before plotting to keep the graph fast")
 
     # Get optimized tick values for log scale
     x_ticks = limit_tick_values(df[x_axis].unique()) if x_log and pd.api.types.is_numeric_dtype(df[x_axis]) else None
@@ -99,41 +96,15 @@ def get_page(df,
 
     fig = go.Figure()
 
+    reduction_notes = []
     for y in y_axes:
-        color_args = {"color": color_mode_columns} if enable_color_mode else {
-            "color_discrete_sequence": [plot_colors[y]]}
-        hover_args = {"hover_data": hover_columns} if enable_hover else {"hover_data": None}
-
-        if plot_types[y] == "Line":
-            traces = px.line(df, x=x_axis, y=y, **color_args, **hover_args)
-        elif plot_types[y] == "Scatter":
-            traces = px.scatter(df,
-                                x=x_axis,
-                                y=y,
-                                size="bubble_size" if enable_bubble_size else None,
-                                size_max=30 if enable_bubble_size else None,  # Increase max bubble size (default is 20)
-                                **color_args,
-                                **hover_args)
-
-            # Set fixed size bubbles
-            if not enable_bubble_size:
-                traces.update_traces(
-                    marker=dict(
-                        opacity=0.7,
-                        size=10,
-                        line=dict(width=1, color='white')
-                    )
-                )
+        plot_df, method = decimation.reduce_points(df, x_axis, y, plot_types[y], point_budget, x_log, y_log,
+                                                   color_mode_columns)
+        if method:
+            reduction_notes.append(decimation.describe_reduction(y, plot_df, df, method))
 
-            traces.update_traces(
-                marker=dict(
-                    opacity=0.7,
-                    line=dict(width=1, color='white')
-                )
-            )
-
-        elif plot_types[y] == "Bar":
-            traces = px.bar(df, x=x_axis, y=y, **color_args, **hover_args)
+        traces = create_traces(plot_df, x_axis, y, plot_types[y], render_mode, enable_bubble_size,
+                               color_mode_columns if enable_color_mode else None, plot_colors.get(y), show_hover_text)
 
         # Add each trace from the generated px figure to the main figure
         for trace in traces.data:
@@ -165,6 +136,64 @@ def get_page(df,
 
     st.plotly_chart(fig)
 
+    graph_util.add_reduction_caption(reduction_notes)
+
+
+def create_traces(plot_df, x_axis, y, plot_type, render_mode, enable_bubble_size, color_column, plot_color,
+                  show_hover_text):
+    color_args = {"color": color_column} if color_column else {"color_discrete_sequence": [plot_color]}
+    hover_args = {"custom_data": ["hover_text"]} if show_hover_text else {"hover_data": None}
+
+    if plot_type == "Line":
+        traces = px.line(plot_df, x=x_axis, y=y, render_mode=render_mode, **color_args, **hover_args)
+    elif plot_type == "Scatter":
+        traces = px.scatter(plot_df,
+                            x=x_axis,
+                            y=y,
+                            size="bubble_size" if enable_bubble_size else None,
+                            size_max=30 if enable_bubble_size else None,  # Increase max bubble size (default is 20)
+                            render_mode=render_mode,
+                            **color_args,
+                            **hover_args)
+
+        # Set fixed size bubbles
+        if not enable_bubble_size:
+            traces.update_traces(
+                marker=dict(
+                    opacity=0.7,
+                    size=10,
+                    line=dict(width=1, color='white')
+                )
+            )
+
+        traces.update_traces(
+            marker=dict(
+                opacity=0.7,
+                line=dict(width=1, color='white')
+            )
+        )
+
+    elif plot_type == "Bar":
+        traces = px.bar(plot_df, x=x_axis, y=y, **color_args, **hover_args)
+
+    if show_hover_text:
+        traces.update_traces(hovertemplate="%{customdata[0]}<extra></extra>")
+    return traces
+
+
+def determine_hover_text(df, x_axis, y_axes):
+    # **Hover Info: Now enabled by default with X and selected Y columns**
+    default_hover_columns = [x_axis] + y_axes
+    enable_hover = st.sidebar.checkbox("Enable Hover Info", value=True)  # Default to True
+    hover_columns = st.sidebar.multiselect("Select Hover Columns", df.columns,
+                                           default=default_hover_columns) if enable_hover else []
+
+    # Hover text is built once for all traces and passed to Plotly as customdata
+    if enable_hover and hover_columns:
+        df["hover_text"] = graph_util.build_hover_text(df, [(col, col, None) for col in hover_columns])
+        return True
+    return False
+
 
 def update_x_axis_to_category(df, x_axis):
     if pd.api.types.is_object_dtype(df[x_axis]):
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_POINT_BUDGET = 5000
+OTHERS_LABEL = "others"
+
+LTTB = "LTTB"
+GRID = "grid thinning"
+TOP_N = "top-N + others"
+
+
+def to_numeric_positions(series, log=False):
+    """
+    Numeric representation of a column for the reduction algorithms.
+    Non-numeric columns (e.g. account names) are represented by their category code.
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        values = series.to_numpy(dtype=float)
+        if log:
+            values = np.log10(np.clip(values, 1e-12, None))
+        return np.nan_to_num(values)
+    return pd.factorize(series)[0].astype(float)
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling, keeps the visual shape of a line with `threshold` points.
+
+    :return: sorted positional indices of the points to keep.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start = int(np.floor(i * every)) + 1
+        end = int(np.floor((i + 1) * every)) + 1
+        next_end = min(int(np.floor((i + 2) * every)) + 1, n)
+
+        # Average of the next bucket (the last point for the final bucket)
+        if end < next_end:
+            avg_x = x[end:next_end].mean()
+            avg_y = y[end:next_end].mean()
+        else:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+def grid_thin_indices(x, y, budget):
+    """
+    Density based thinning for scatter plots: keep one point per occupied grid cell.
+    Sparse regions (outliers) are kept completely, dense regions are thinned.
+    The finest grid that stays within the budget is used.
+
+    :return: sorted positional indices of the points to keep.
+    """
+    n = len(x)
+    if n <= budget:
+        return np.arange(n)
+
+    def normalize(values):
+        span = values.max() - values.min()
+        return (values - values.min()) / span if span else np.zeros_like(values)
+
+    x_norm, y_norm = normalize(x), normalize(y)
+    base = max(int(np.sqrt(budget)), 1)
+
+    keep = None
+    for factor in (1, 2, 4, 8):
+        cells = base * factor
+        cell_id = np.minimum((x_norm * cells).astype(np.int64), cells - 1) * cells \
+            + np.minimum((y_norm * cells).astype(np.int64), cells - 1)
+        _, first = np.unique(cell_id, return_index=True)
+        if len(first) > budget:
+            break
+        keep = first
+
+    if keep is None:
+        # Even the coarsest grid has too many occupied cells, sample those evenly
+        keep = first[np.linspace(0, len(first) - 1, budget).astype(int)]
+    return np.sort(keep)
+
+
+def top_n_with_others(df, x, y, n, color_column=None):
+    """
+    Keep the n - 1 largest bars and sum the remaining rows into a single "others" bar.
+    """
+    if len(df) <= n:
+        return df
+
+    # Positions of the largest values, the kept bars stay in the order of the caller (e.g. sorted descending)
+    keep = np.zeros(len(df), dtype=bool)
+    keep[df[y].reset_index(drop=True).nlargest(n - 1).index] = True
+    top, rest = df[keep], df[~keep]
+
+    others = {x: f"{OTHERS_LABEL} ({len(rest)})", y: rest[y].sum()}
+    if color_column and color_column not in (x, y):
+        others[color_column] = OTHERS_LABEL
+    if "hover_text" in df.columns:
+        others["hover_text"] = f"{x}: {others[x]}<br>{y}: {others[y]}"
+
+    top = top.astype({x: str}) if not pd.api.types.is_string_dtype(top[x]) else top
+    return pd.concat([top, pd.DataFrame([others])], ignore_index=True)
+
+
+def describe_reduction(column, reduced, total, method):
+    """Note for the graph caption, e.g. "SPSP: 5,000 of 12,000 points (top-N + others)"."""
+    return f"{column}: {len(reduced):,} of {len(total):,} points ({method})"
+
+
+def reduce_points(df, x, y, plot_type, budget, log_x=False, log_y=False, color_column=None):
+    """
+    Reduce the number of points of one trace to the point budget.
+
+    :param plot_type: "Line", "Scatter" or "Bar" (as used by custom_graph).
+    :return: tuple (reduced DataFrame, method name or None when no reduction was needed).
+    """
+    if len(df) <= budget:
+        return df, None
+
+    if plot_type == "Bar":
+        return top_n_with_others(df, x, y, budget, color_column), TOP_N
+
+    x_values = to_numeric_positions(df[x], log_x)
+    y_values = to_numeric_positions(df[y], log_y)
+
+    if plot_type == "Line":
+        # A line is drawn in row order, use the position when x is not monotonic
+        if not np.all(np.diff(x_values) >= 0):
+            x_values = np.arange(len(df), dtype=float)
+        indices = lttb_indices(x_values, y_values, budget)
+        method = LTTB
+    else:
+        indices = grid_thin_indices(x_values, y_values, budget)
+        method = GRID
+
+    return df.iloc[indices], method
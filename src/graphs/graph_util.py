@@ -1,5 +1,38 @@
+import hashlib
+import pickle
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
 import streamlit as st
 
+from src.api import memory_cache
+
+# Above this number of points scatter plots are rendered with WebGL instead of SVG by default
+WEBGL_POINT_THRESHOLD = 5000
+
+# Budget of the figure cache, a figure of 2000 accounts is roughly 0.5MB of JSON
+FIGURE_CACHE_MAX_ENTRIES = 64
+FIGURE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+def set_reduction_notes(fig, notes):
+    """Keep the data reduction notes with the figure, so they are also available for cached figures."""
+    fig.update_layout(meta={"reduction_notes": notes})
+
+
+def get_reduction_notes(fig):
+    meta = fig.layout.meta
+    return list(meta.get("reduction_notes", [])) if isinstance(meta, dict) else []
+
+
+def add_reduction_caption(notes):
+    """Tell the user the graph does not show every point (see decimation)."""
+    if notes:
+        st.caption("Data reduced to keep the graph responsive (raise the point budget to show more): "
+                   + "; ".join(notes))
+
 
 def get_chart_settings(x=False, y=False, default_value_x=False, default_value_y=True, widget_suffix=""):
     log_x = x
@@ -21,3 +54,78 @@ def get_chart_settings(x=False, y=False, default_value_x=False, default_value_y=
             )
 
     return log_x, log_y
+
+
+def get_webgl_setting(number_of_points, widget_suffix="", sidebar=False):
+    """
+    Toggle for WebGL rendering, enabled by default when the number of points exceeds WEBGL_POINT_THRESHOLD.
+    """
+    container = st.sidebar if sidebar else st
+    return container.checkbox(
+        "WebGL rendering (faster for large data sets)",
+        value=number_of_points >= WEBGL_POINT_THRESHOLD,
+        key=f"webgl_{widget_suffix}"
+    )
+
+
+def scatter_trace(webgl):
+    """Return the Plotly scatter trace class, Scattergl (WebGL) or Scatter (SVG)."""
+    return go.Scattergl if webgl else go.Scatter
+
+
+def build_hover_text(df, fields, separator="<br>"):
+    """
+    Build the hover text of all points at once with vectorized string concatenation (no per row Python loop).
+
+    :param df: DataFrame with the plotted data.
+    :param fields: list of (label, column, fmt) tuples. column is a column name or a Series aligned with df,
+                   fmt a printf style number format (e.g. "%.2f") or None to use the plain string value.
+    :param separator: separator between the fields.
+    :return: Series with one hover text per row.
+    """
+    text = pd.Series("", index=df.index)
+    for i, (label, column, fmt) in enumerate(fields):
+        values = df[column] if isinstance(column, str) else column
+        if fmt:
+            formatted = pd.Series(np.char.mod(fmt, values.to_numpy(dtype=float)), index=df.index)
+        else:
+            formatted = values.astype(str)
+        text = text + (separator if i else "") + f"{label}: " + formatted
+    return text
+
+
+def fingerprint(df):
+    """
+    Hash of the content of a DataFrame (values, index and column names), identical data gives the same hash.
+    """
+    digest = hashlib.sha1(str(list(df.columns)).encode())
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:
+        # Columns with unhashable values (lists, dicts)
+        digest.update(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+def get_figure_cache():
+    return memory_cache.get_cache("src.graphs.graph_util.figures",
+                                  max_entries=FIGURE_CACHE_MAX_ENTRIES,
+                                  max_bytes=FIGURE_CACHE_MAX_BYTES)
+
+
+def get_figure(name, df, settings, create_figure):
+    """
+    Return the figure created by create_figure(df, **settings).
+    The serialized figure is cached by graph name, data fingerprint and settings,
+    so reruns that do not change the data or the settings of this graph skip building it.
+
+    :param name: unique name of the graph.
+    :param settings: dict with the graph settings (e.g. log scales), passed as keyword arguments to create_figure.
+    """
+    cache = get_figure_cache()
+    key = (name, fingerprint(df), tuple(sorted(settings.items())))
+    found, figure_json = cache.get(key)
+    if not found:
+        figure_json = create_figure(df, **settings).to_json()
+        cache.set(key, figure_json)
+    return pio.from_json(figure_json)
@@ -1,7 +1,7 @@
 import plotly.graph_objects as go
 import streamlit as st
 
-from src.graphs import graph_util
+from src.graphs import graph_util, decimation
 
 
 def add(df):
@@ -9,12 +9,32 @@ def add(df):
     df["SPSP"] = df["SPSP"].fillna(0).infer_objects(copy=False)
 
     log_x, log_y = graph_util.get_chart_settings(True, True, widget_suffix="hp_spsp")
+    webgl = graph_util.get_webgl_setting(len(df), widget_suffix="hp_spsp")
+
+    settings = {"log_x": log_x, "log_y": log_y, "webgl": webgl}
+    fig = graph_util.get_figure("hp_spsp", df, settings, create_figure)
+    st.plotly_chart(fig, theme="streamlit")
+    graph_util.add_reduction_caption(graph_util.get_reduction_notes(fig))
+
+
+def create_figure(df, log_x, log_y, webgl):
+    scatter = graph_util.scatter_trace(webgl)
+
+    all_df = df
+    df, method = decimation.reduce_points(df, "hp", "SPSP", "Scatter", decimation.DEFAULT_POINT_BUDGET, log_x, log_y)
+
+    hover_text = graph_util.build_hover_text(df, [
+        ("Name", "name", None),
+        ("SPSP", "SPSP", "%.2f"),
+        ("HP", "hp", "%.2f"),
+        ("Posting rewards", df["posting_rewards"] + df["curation_rewards"], "%.2f"),
+    ])
 
     fig = go.Figure()
 
     # Add scatter plot for SPS vs HP
     fig.add_trace(
-        go.Scatter(
+        scatter(
             x=df['hp'],
             y=df['SPSP'],
             mode='markers',
@@ -30,10 +50,7 @@ def add(df):
                     width=2  # Bubble border width
                 )
             ),
-            text=[f"Name: {row['name']}<br>SPSP: {round(row['SPSP'], 2)}<br>"
-                  f"HP: {round(row['hp'], 2)}<br>"
-                  f"Posting rewards: {round(row['posting_rewards'] + row['curation_rewards'], 2)}"
-                  for _, row in df.iterrows()],
+            text=hover_text,
             hoverinfo='text',
             name='SPS vs HP with posting rewards bubble size)'
         )
@@ -52,6 +69,7 @@ def add(df):
         yaxis=dict(type=y_axis_type, tickformat=".0f"),
         height=800,
     )
+    if method:
+        graph_util.set_reduction_notes(fig, [decimation.describe_reduction("SPSP", df, all_df, method)])
 
-    # Display the plot in Streamlit
-    st.plotly_chart(fig, theme="streamlit")
+    return fig
@@ -1,11 +1,21 @@
 import plotly.graph_objects as go
 import streamlit as st
 
-from src.graphs import graph_util
+from src.graphs import graph_util, decimation
 
 
 def add(df):
     log_x, log_y = graph_util.get_chart_settings(True, True,  widget_suffix="ke_hp")
+    webgl = graph_util.get_webgl_setting(len(df), widget_suffix="ke_hp")
+
+    settings = {"log_x": log_x, "log_y": log_y, "webgl": webgl}
+    fig = graph_util.get_figure("ke_hp", df, settings, create_figure)
+    st.plotly_chart(fig, theme="streamlit")
+    graph_util.add_reduction_caption(graph_util.get_reduction_notes(fig))
+
+
+def create_figure(df, log_x, log_y, webgl):
+    scatter = graph_util.scatter_trace(webgl)
 
     df = df.sort_values(by="hp", ascending=False).reset_index(drop=True)
 
@@ -15,13 +25,32 @@ def add(df):
     # Compute total rewards
     df["total_rewards"] = df["curation_rewards"] + df["posting_rewards"]
 
+    # Same hover text for all traces, computed once
+    df["hover_text"] = graph_util.build_hover_text(df, [
+        ("Name", "name", None),
+        ("KE Ratio", "ke_ratio", "%.2f"),
+        ("HP", "hp", "%.2f"),
+        ("HP Rank", "hp_rank", None),
+        ("Total Rewards", "total_rewards", "%.2f"),
+    ])
+
+    # Every trace is reduced to the point budget on its own, the HP line keeps its shape
+    budget = decimation.DEFAULT_POINT_BUDGET
+    reduced = {}
+    notes = []
+    for column, plot_type in (("ke_ratio", "Scatter"), ("total_rewards", "Scatter"), ("hp", "Line")):
+        reduced[column], method = decimation.reduce_points(df, "hp_rank", column, plot_type, budget, log_x, log_y)
+        if method:
+            notes.append(decimation.describe_reduction(column, reduced[column], df, method))
+    ke_df, rewards_df, hp_df = reduced["ke_ratio"], reduced["total_rewards"], reduced["hp"]
+
     fig = go.Figure()
 
     # Scatter plot for KE Ratio
     fig.add_trace(
-        go.Scatter(
-            x=df["hp_rank"],
-            y=df["ke_ratio"],
+        scatter(
+            x=ke_df["hp_rank"],
+            y=ke_df["ke_ratio"],
             mode="markers",
             marker=dict(
                 size=8,
@@ -30,19 +59,15 @@ def add(df):
             ),
             name="KE Ratio",
             hoverinfo="text",
-            text=[
-                f"Name: {row['name']}<br>KE Ratio: {row['ke_ratio']:.2f}<br>HP: {row['hp']}<br>"
-                f"HP Rank: {row['hp_rank']}<br>Total Rewards: {row['total_rewards']:.2f}"
-                for _, row in df.iterrows()
-            ]
+            text=ke_df["hover_text"]
         )
     )
 
     # Scatter plot for Total Rewards (on secondary y-axis)
     fig.add_trace(
-        go.Scatter(
-            x=df["hp_rank"],  # Set HP as X-axis labels
-            y=df["total_rewards"],
+        scatter(
+            x=rewards_df["hp_rank"],  # Set HP as X-axis labels
+            y=rewards_df["total_rewards"],
             mode="markers",
             marker=dict(
                 size=8,
@@ -51,29 +76,21 @@ def add(df):
             ),
             name="Total Rewards",
             hoverinfo="text",
-            text=[
-                f"Name: {row['name']}<br>KE Ratio: {row['ke_ratio']:.2f}<br>HP: {row['hp']:.2f}<br>"
-                f"HP Rank: {row['hp_rank']}<br>Total Rewards: {row['total_rewards']:.2f}"
-                for _, row in df.iterrows()
-            ],
+            text=rewards_df["hover_text"],
         )
     )
 
     fig.add_trace(
-        go.Scatter(
-            x=df["hp_rank"],
-            y=df["hp"],
+        scatter(
+            x=hp_df["hp_rank"],
+            y=hp_df["hp"],
             mode="lines",
             line=dict(
                 color="red",
             ),
             name="HP",
             hoverinfo="text",
-            text=[
-                f"Name: {row['name']}<br>KE Ratio: {row['ke_ratio']:.2f}<br>HP: {row['hp']:.2f}<br>"
-                f"HP Rank: {row['hp_rank']}<br>Total Rewards: {row['total_rewards']:.2f}"
-                for _, row in df.iterrows()
-            ],
+            text=hp_df["hover_text"],
         )
     )
 
@@ -97,5 +114,7 @@ def add(df):
         ),
         height=800,
     )
+    if notes:
+        graph_util.set_reduction_notes(fig, notes)
 
-    st.plotly_chart(fig, theme="streamlit")
+    return fig
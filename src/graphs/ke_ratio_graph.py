@@ -1,15 +1,7 @@
 import plotly.graph_objects as go
 import streamlit as st
 
-from src.graphs import graph_util
-
-
-def determine_label(row):
-    name = row['name']
-    spsp = round(row['SPSP'], 2)
-    hp = round(row['hp'], 2)
-    ke_ratio = round(row['ke_ratio'], 2)
-    return f"Name: {name}<br>SPSP: {spsp}<br>HP: {hp}<br>KE Ratio: {ke_ratio}"
+from src.graphs import graph_util, decimation
 
 
 def add(df):
@@ -17,18 +9,36 @@ def add(df):
     df["SPSP"] = df["SPSP"].astype(float).fillna(0.0)
 
     log_x, log_y = graph_util.get_chart_settings(True, True, widget_suffix="ke_ratio")
+    webgl = graph_util.get_webgl_setting(len(df), widget_suffix="ke_ratio")
+
+    settings = {"log_x": log_x, "log_y": log_y, "webgl": webgl}
+    fig = graph_util.get_figure("ke_ratio", df, settings, create_figure)
+    st.plotly_chart(fig, theme="streamlit")
+    graph_util.add_reduction_caption(graph_util.get_reduction_notes(fig))
 
-    # Helper function for the labels
-    def determine_label(row):
-        # Provide your custom label logic here, e.g., return f"HP: {row['hp']}, KE Ratio: {row['ke_ratio']}"
-        return f"HP: {round(row['hp'], 2)}, KE Ratio: {round(row['ke_ratio'], 2)}, SPSP: {round(row['SPSP'], 2)}"
+
+def create_figure(df, log_x, log_y, webgl):
+    scatter = graph_util.scatter_trace(webgl)
+
+    # Reference lines span all accounts, large account sets are thinned for drawing
+    hp_min, hp_max = min(df['hp']), max(df['hp'])
+    all_df = df
+    df, method = decimation.reduce_points(df, "hp", "ke_ratio", "Scatter", decimation.DEFAULT_POINT_BUDGET,
+                                          log_x, log_y)
+
+    hover_text = graph_util.build_hover_text(df, [
+        ("Name", "name", None),
+        ("HP", "hp", "%.2f"),
+        ("KE Ratio", "ke_ratio", "%.2f"),
+        ("SPSP", "SPSP", "%.2f"),
+    ])
 
     # Create a Plotly figure
     fig = go.Figure()
 
     # Add a scatter trace for the bubbles
     fig.add_trace(
-        go.Scatter(
+        scatter(
             x=df['hp'],
             y=df['ke_ratio'],
             mode='markers',
@@ -44,7 +54,7 @@ def add(df):
                     width=2  # Border width
                 )
             ),
-            text=[determine_label(row) for _, row in df.iterrows()],  # Hover text
+            text=hover_text,
             hoverinfo='text',
             name='Bubbles'
         )
@@ -53,7 +63,7 @@ def add(df):
     # Add a horizontal line for ke_ratio = 1 (blue)
     fig.add_shape(
         type="line",
-        x0=min(df['hp']), x1=max(df['hp']),
+        x0=hp_min, x1=hp_max,
         y0=1, y1=1,
         line=dict(color="blue", width=2, dash="dash"),
         name="ke_ratio = 1"
@@ -62,7 +72,7 @@ def add(df):
     # Add a horizontal line for ke_ratio = 3 (red)
     fig.add_shape(
         type="line",
-        x0=min(df['hp']), x1=max(df['hp']),
+        x0=hp_min, x1=hp_max,
         y0=3, y1=3,
         line=dict(color="red", width=2, dash="dash"),
         name="ke_ratio = 3"
@@ -81,6 +91,7 @@ def add(df):
         yaxis=dict(type=y_axis_type, tickformat=".0f"),
         height=800,
     )
+    if method:
+        graph_util.set_reduction_notes(fig, [decimation.describe_reduction("ke_ratio", df, all_df, method)])
 
-    # Display the plot in Streamlit
-    st.plotly_chart(fig, theme="streamlit")
+    return fig
@@ -1,16 +1,25 @@
 import plotly.graph_objects as go
 import streamlit as st
 
-from src.graphs import graph_util
+from src.graphs import graph_util, decimation
 
 
 def add(df):
     # SPSP can be None / NaN so make them 0
     df["SPSP"] = df["SPSP"].astype(float).fillna(0.0)
 
-    log_x, log_y = graph_util.get_chart_settings(False, True, widget_suffix="spsp")
+    _, log_y = graph_util.get_chart_settings(False, True, widget_suffix="spsp")
 
+    # Display the plot in Streamlit
+    fig = graph_util.get_figure("spsp", df, {"log_y": log_y}, create_figure)
+    st.plotly_chart(fig, theme="streamlit")
+    graph_util.add_reduction_caption(graph_util.get_reduction_notes(fig))
+
+
+def create_figure(df, log_y):
     df = df.sort_values(by="SPSP", ascending=False)
+    all_df = df
+    df, method = decimation.reduce_points(df, "name", "SPSP", "Bar", decimation.DEFAULT_POINT_BUDGET)
 
     fig = go.Figure()
 
@@ -34,6 +43,7 @@ def add(df):
         height=800,
         # yaxis=dict(type="log"),
     )
+    if method:
+        graph_util.set_reduction_notes(fig, [decimation.describe_reduction("SPSP", df, all_df, method)])
 
-    # Display the plot in Streamlit
-    st.plotly_chart(fig, theme="streamlit")
+    return fig
@@ -0,0 +1,124 @@
+import logging
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from src.api import memory_cache, market_prefetcher, metrics, retry_events, circuit_breaker
+
+log = logging.getLogger("Admin Page")
+
+
+def get_page():
+    if not st.session_state.get("authenticated"):
+        st.warning("Admin page is only available after authorization")
+        return
+
+    add_metrics_section()
+    add_retry_section()
+    add_circuit_breaker_section()
+    add_cache_section()
+    add_prefetcher_section()
+
+
+def add_metrics_section():
+    st.subheader("API metrics")
+    stats = metrics.get_stats()
+    if stats.empty:
+        st.write("No API calls recorded yet")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Calls", int(stats["calls"].sum()))
+    col2.metric("Errors", int(stats["errors"].sum()))
+    col3.metric("Retries / Failovers", f"{stats['retries'].sum()} / {stats['failovers'].sum()}")
+    col4.metric("Received (MB)", round(stats["bytes"].sum() / (1024 * 1024), 2))
+
+    st.dataframe(stats.sort_values(by="total (s)", ascending=False), hide_index=True)
+
+    prometheus_text = metrics.to_prometheus()
+    with st.expander("Prometheus export", expanded=False):
+        st.download_button("Download metrics", prometheus_text, file_name="metrics.prom", mime="text/plain")
+        st.code(prometheus_text, language="text")
+
+    if st.button("Reset API metrics"):
+        log.info("Resetting API metrics")
+        metrics.reset()
+        st.rerun()
+
+
+def add_retry_section():
+    st.subheader("Retries per host")
+    stats = retry_events.get_stats()
+    if stats.empty:
+        st.write("No retries recorded yet")
+        return
+
+    col1, col2 = st.columns(2)
+    col1.metric("Retries", int(stats["retries"].sum()))
+    col2.metric("Backoff (s)", round(stats["backoff (s)"].sum(), 1))
+
+    st.dataframe(stats.sort_values(by="retries", ascending=False), hide_index=True)
+
+    if st.button("Reset retry counters"):
+        log.info("Resetting retry counters")
+        retry_events.reset()
+        st.rerun()
+
+
+def add_circuit_breaker_section():
+    st.subheader("Circuit breakers")
+    stats = circuit_breaker.get_stats()
+    if stats.empty:
+        st.write("No hosts contacted yet")
+        return
+
+    st.dataframe(stats, hide_index=True)
+
+    if st.button("Close all circuits"):
+        log.info("Resetting circuit breakers")
+        circuit_breaker.reset()
+        st.rerun()
+
+
+def add_cache_section():
+    st.subheader("Cache statistics")
+    stats = memory_cache.get_cache_stats()
+    if stats.empty:
+        st.write("No caches in use yet")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Cached entries", int(stats["entries"].sum()))
+    col2.metric("Cache memory (MB)", round(stats["bytes"].sum() / (1024 * 1024), 2))
+    col3.metric("Hits / Misses", f"{stats['hits'].sum()} / {stats['misses'].sum()}")
+    col4.metric("Evictions", int(stats["evictions"].sum()))
+
+    st.dataframe(stats.sort_values(by="bytes", ascending=False), hide_index=True)
+
+    if st.button("Clear all caches"):
+        log.info("Clearing all memory caches")
+        memory_cache.clear_all()
+        st.rerun()
+
+
+def format_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S') if timestamp else None
+
+
+def add_prefetcher_section():
+    st.subheader("Market data prefetcher")
+    state = market_prefetcher.start()
+    running = state["thread"] is not None and state["thread"].is_alive()
+    st.write(f"Status: {'🟢 running' if running else '🔴 not running'}")
+
+    rows = []
+    for name, status in state["status"].items():
+        rows.append({
+            "dataset": name,
+            "interval (s)": state["settings"]["intervals"].get(name),
+            "last refresh": format_timestamp(status["last_refresh"]),
+            "duration (s)": status["duration"],
+            "next refresh": format_timestamp(status["next_refresh"]),
+        })
+    st.dataframe(pd.DataFrame(rows), hide_index=True)
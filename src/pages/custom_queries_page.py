@@ -1,11 +1,18 @@
 import streamlit as st
 
-from src.api import hive_sql
+from src.api import hive_sql, activity_store
 from src.graphs import custom_graph
-from src.pages.custom_queries_subpages import presets_section, upload_section, query_remark
+from src.pages.custom_queries_subpages import presets_section, upload_section, query_remark, query_cache
 from src.pages.main_subpages import spl_balances, hive_engine_balances
+from src.util import streaming
 
 unauthorized_limit = 100
+
+ATTACH_STREAM_KEY = "attach_query_stream"
+attach_stages = {
+    "spl": spl_balances.add_balances,
+    "he": hive_engine_balances.add_balances,
+}
 query_options = {
     "hp": ("hp_min", "hp_max", 0, 1000000000000),
     "reputation": ("reputation_min", "reputation_max", 0, 100),
@@ -21,10 +28,15 @@ def get_page():
 
     initialize_session_state()
 
-    if st.button("Retrieve HIVE data"):
-        df = hive_sql.get_hive_balances_params(params)
+    # Narrower parameters are answered from the cached superset result without pressing the button again
+    refilter = (st.session_state.params is not None and params != st.session_state.params
+                and query_cache.is_covered(params))
+    if (st.button("Retrieve HIVE data") or refilter) and is_activity_store_ready():
+        df = query_cache.get_result(params, hive_sql.get_hive_balances_params)
         st.session_state.query_results = df
         st.session_state.params = params
+        st.session_state.attached_query_results = None
+        st.session_state.pop(ATTACH_STREAM_KEY, None)
         st.rerun()
 
     if st.session_state.query_results is not None:
@@ -37,14 +49,18 @@ def get_page():
                     f"You are not authorized to perform such large query, "
                     f"continuing with top {unauthorized_limit} rows")
                 df = df.head(unauthorized_limit)
-            df_spl = spl_balances.prepare_data(df)
-            st.session_state.attached_query_results = df_spl
-            st.rerun()
+            start_attach(df, "spl")
 
         if st.button("Attach HE data") and not df.empty:
-            df_spl = hive_engine_balances.prepare_data(df)
-            st.session_state.attached_query_results = df_spl
+            start_attach(df, "he")
+
+        if streaming.is_running(ATTACH_STREAM_KEY):
+            attach_stage = attach_stages[st.session_state.attach_stage]
+            st.session_state.attached_query_results = streaming.consume(
+                ATTACH_STREAM_KEY, attach_stage, render=lambda partial: st.dataframe(partial),
+                label="Attaching data")
             st.rerun()
+        streaming.add_cancelled_note(ATTACH_STREAM_KEY)
 
     if st.session_state.query_results is not None:
         df = st.session_state.query_results
@@ -63,6 +79,29 @@ def get_page():
         custom_graph.get_page(df, **preset_params)
 
 
+def is_activity_store_ready():
+    """
+    Accounts are selected on the local activity store. On a cold start it is built in the background
+    (also by the market prefetcher), a partly built store would give incomplete results.
+    """
+    if activity_store.is_ready():
+        return True
+    hive_sql.refresh_activity_in_background()
+    watermark = activity_store.get_watermark()
+    progress = f", complete up to {watermark:%Y-%m-%d}" if watermark else ""
+    st.info(f"The account activity store is being built{progress}. "
+            f"Retrieving HIVE data is possible when it is ready, please try again in a few minutes.")
+    return False
+
+
+def start_attach(df, stage):
+    """
+    Attach data to the query results in chunks, the rows appear while fetching and the run can be cancelled.
+    """
+    st.session_state.attach_stage = stage
+    streaming.start(ATTACH_STREAM_KEY, df)
+
+
 def get_preset_buttons(df):
     preset_params = presets_section.get_preset_section(df)
     selected_preset = st.session_state.selected_preset
@@ -96,6 +135,12 @@ def get_parameter_section():
                     params[key[0]] = st.number_input(f"{label} (Min)", value=key[2], step=1)
                 with col_b:
                     params[key[1]] = st.number_input(f"{label} (Max)", value=key[3], step=1)
+            elif key[0] == "months":
+                # Activity is only kept for the history of the activity store
+                history_months = activity_store.get_settings()["history_months"]
+                params[key[0]] = st.number_input(label, value=min(key[1], history_months), step=1,
+                                                 max_value=history_months,
+                                                 help=f"Activity is kept for the last {history_months} months")
             elif isinstance(key, tuple) and len(key) == 2:
                 params[key[0]] = st.number_input(label, value=key[1], step=1)
             else:
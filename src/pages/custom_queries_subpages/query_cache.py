@@ -0,0 +1,94 @@
+import logging
+
+import streamlit as st
+
+log = logging.getLogger("Query Cache")
+
+SUPERSET_KEY = "query_superset"
+
+# Range parameters: (min key, max key) and the result column they filter, rows must be strictly between them
+range_filters = {
+    "hp": ("hp_min", "hp_max"),
+    "reputation_score": ("reputation_min", "reputation_max"),
+    "posting_rewards": ("posting_rewards_min", "posting_rewards_max"),
+}
+# Activity thresholds: parameter and the result column that must be larger
+threshold_filters = {
+    "posts": "post_count",
+    "comments": "comment_count",
+}
+
+
+def covers(cached_params, params):
+    """
+    True when every account matching params is in the result of cached_params.
+    Activity counts depend on the number of months, so the months must be the same.
+    """
+    if cached_params is None or cached_params["months"] != params["months"]:
+        return False
+    for min_key, max_key in range_filters.values():
+        if params[min_key] < cached_params[min_key] or params[max_key] > cached_params[max_key]:
+            return False
+    return all(params[key] >= cached_params[key] for key in threshold_filters)
+
+
+def widen(cached_params, params):
+    """
+    Parameters covering both cached_params and params, the superset of the next remote query.
+    """
+    if cached_params is None or cached_params["months"] != params["months"]:
+        return dict(params)
+    widened = dict(params)
+    for min_key, max_key in range_filters.values():
+        widened[min_key] = min(cached_params[min_key], params[min_key])
+        widened[max_key] = max(cached_params[max_key], params[max_key])
+    for key in threshold_filters:
+        widened[key] = min(cached_params[key], params[key])
+    return widened
+
+
+def get_filter_values(df, column):
+    """Values of column on the scale the remote query filters on."""
+    if column == "posting_rewards":
+        return df[column] * 1000  # the Accounts table stores milli units
+    if column == "reputation_score":
+        # The remote query filters raw reputation > score_to_reputation(min), which is 0 for scores <= 0:
+        # every positive raw reputation passes a lower bound of 0, even when its score is negative.
+        return df[column].clip(lower=1e-9).where(df["reputation"] > 0, float("-inf"))
+    return df[column]
+
+
+def filter_result(df, params):
+    """
+    Vectorized selection of the rows of a superset result that match params.
+    """
+    if df.empty:
+        return df
+    mask = True
+    for column, (min_key, max_key) in range_filters.items():
+        values = get_filter_values(df, column)
+        mask &= (values > params[min_key]) & (values < params[max_key])
+    for key, column in threshold_filters.items():
+        mask &= df[column] > params[key]
+    return df[mask].reset_index(drop=True)
+
+
+def is_covered(params):
+    superset = st.session_state.get(SUPERSET_KEY)
+    return superset is not None and covers(superset[0], params)
+
+
+def get_result(params, fetch):
+    """
+    Result of params, filtered locally from the cached superset when it covers them.
+    Otherwise fetch(params) runs with bounds widened to include the previous superset as well.
+
+    :param fetch: function(params) -> DataFrame, the remote query.
+    """
+    cached_params, cached_df = st.session_state.get(SUPERSET_KEY) or (None, None)
+    if not covers(cached_params, params):
+        superset_params = widen(cached_params, params)
+        log.info(f"Query bounds not covered by the cache, fetching {superset_params}")
+        cached_df = fetch(superset_params)
+        st.session_state[SUPERSET_KEY] = (superset_params, cached_df)
+    return filter_result(cached_df, params)
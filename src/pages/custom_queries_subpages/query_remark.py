@@ -12,4 +12,6 @@ def add_section(num_accounts, params):
             - Posting Rewards - Between  {params["posting_rewards_min"]} and {params["posting_rewards_max"]}
             - Have made more than {params["posts"]} posts in the last {params["months"]} months
             - Have been active in the last {params["months"]} months with minimal {params["comments"]} comments
+
+            Activity is counted per calendar month, the current month plus the {params["months"]} months before it.
         """)
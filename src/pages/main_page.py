@@ -2,16 +2,22 @@ import logging
 import re
 from datetime import datetime
 
+import pandas as pd
 import streamlit as st
 
 from src.pages.main_subpages import hivesql_balances, spl_balances_estimates, spl_assets, spl_balances, \
     hive_engine_balances
+from src.util import pipeline, tracing
 from src.util.card import card_style
 
 log = logging.getLogger("Main Page")
 
 max_number_of_accounts = 5
 
+# Data sources of the account pipeline, stages that only depend on the account name run in parallel
+hive_stages = [hivesql_balances.pipeline_stage, hive_engine_balances.pipeline_stage]
+spl_stages = [spl_balances.pipeline_stage, spl_assets.pipeline_stage]
+
 
 def get_page():
     # Get the input from the user
@@ -33,31 +39,39 @@ def get_page():
                 st.session_state.last_input = account_names  # Store new input
                 st.session_state.hive_data = None  # Reset Hive data
                 st.session_state.spl_data = None  # Reset SPL data
+                st.session_state.pipeline_reports = []  # Reset stage timings
 
             title = ''
+            # Set when this run follows a load (st.rerun), the rendering is then part of the trace of that load
+            render_trace = st.session_state.pop('render_trace', None)
             # **Fetch Hive and Hive Engine Data (if not already loaded)**
             st.markdown(card_style, unsafe_allow_html=True)
             if st.session_state.hive_data is None:
                 log.info(f'Analyzing account(s): {account_names}')
-                df = hivesql_balances.prepare_data(account_names)
+                with tracing.trace("Load HIVE data", accounts=len(account_names)) as load:
+                    df, report = pipeline.run_with_status(hive_stages, pd.DataFrame({'account': account_names}),
+                                                          'Loading Hive balances...')
 
                 if not df.empty:
                     # Add date column
                     current_datetime = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                     df.insert(0, 'date', current_datetime)
 
-                    df = hive_engine_balances.prepare_data(df)
-
-                    # Store the fetched data
+                    # Store the fetched data, the rendering after the rerun continues the trace of the load
+                    st.session_state.setdefault('pipeline_reports', []).append(report)
                     st.session_state.hive_data = df
+                    st.session_state.render_trace = tracing.get_context(load)
                     st.rerun()
                 else:
                     st.write('Enter valid hive account names')
                     return
             else:
                 df = st.session_state.hive_data  # Load existing data
-                hivesql_balances.get_page(df)
-                hive_engine_balances.get_page(df)
+                with tracing.trace("Render HIVE data", kind=tracing.RENDER, parent=render_trace,
+                                   accounts=df.index.size) as render:
+                    hivesql_balances.get_page(df)
+                    hive_engine_balances.get_page(df)
+                add_render_timing(render_trace, render, df.index.size)
                 title += 'HIVE + HE'
 
             if st.session_state.spl_data is None:
@@ -65,22 +79,41 @@ def get_page():
                 if st.button("Attach SPL Data"):
                     log.info(f'Attaching SPL DATA for account(s): {account_names}')
 
-                    df = spl_balances.prepare_data(df)
-                    df = spl_assets.prepare_data(df)
-                    df = spl_balances_estimates.prepare_data(df, max_number_of_accounts)
+                    stages = spl_stages
+                    if df.index.size <= max_number_of_accounts:
+                        stages = stages + [spl_balances_estimates.pipeline_stage]
+                    with tracing.trace("Attach SPL data", accounts=df.index.size) as attach:
+                        df, report = pipeline.run_with_status(stages, df, 'Loading SPL data...')
 
-                    # Store SPL data to prevent reloading
+                    # Store SPL data to prevent reloading, the rendering after the rerun continues the trace
+                    st.session_state.setdefault('pipeline_reports', []).append(report)
                     st.session_state.spl_data = df
+                    st.session_state.render_trace = tracing.get_context(attach)
                     st.rerun()
             else:
                 df = st.session_state.spl_data
-                spl_balances.get_page(df)
-                spl_assets.get_page(df)
-                spl_balances_estimates.get_page(df, max_number_of_accounts)
+                with tracing.trace("Render SPL data", kind=tracing.RENDER, parent=render_trace,
+                                   accounts=df.index.size) as render:
+                    spl_balances.get_page(df)
+                    spl_assets.get_page(df)
+                    spl_balances_estimates.get_page(df, max_number_of_accounts)
+                add_render_timing(render_trace, render, df.index.size)
                 title += " + SPL data"
 
             with st.expander(f'{title}', expanded=False):
                 st.dataframe(df, hide_index=True)
 
+            reports = st.session_state.get('pipeline_reports')
+            pipeline.add_report(pd.concat(reports, ignore_index=True) if reports else None)
+
     else:
         st.write('Enter valid hive account names')
+
+
+def add_render_timing(render_trace, render, accounts):
+    """
+    The first rendering after a load belongs to the same click, add it to the timings of that load.
+    """
+    reports = st.session_state.get('pipeline_reports')
+    if render_trace and reports:
+        reports[-1] = pipeline.add_render_timing(reports[-1], render, accounts)
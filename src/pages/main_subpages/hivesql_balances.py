@@ -3,11 +3,40 @@ import streamlit as st
 from src.api import hive_sql
 from src.pages.main_subpages import ke_ratio_links
 from src.static import icons
-from src.util import account_util
+from src.util import account_util, pipeline
 from src.util.card import create_card
 from src.util.large_number_util import format_large_number
 
 
+balance_columns = [
+    'name',
+    'created',
+    'hive',
+    'hive_savings',
+    'hbd',
+    'hbd_savings',
+    'reputation',
+    'vesting_shares',
+    'delegated_vesting_shares',
+    'received_vesting_shares',
+    'curation_rewards',
+    'posting_rewards',
+    'reputation_score',
+    'hp',
+    'hp delegated',
+    'hp received',
+    'ke_ratio',
+]
+
+# Root of the account pipeline, only existing Hive accounts end up in the result
+pipeline_stage = pipeline.Stage(
+    'Hive balances',
+    inputs=['account'],
+    outputs=balance_columns,
+    fetch_frame=lambda inputs: hive_sql.get_hive_balances(inputs['account'].tolist()),
+)
+
+
 def determine_emoji(ratio):
     if ratio <= 1:
         return ':heart_eyes:'
@@ -23,17 +52,6 @@ def determine_emoji(ratio):
         return ':question:'
 
 
-def prepare_data(account_names):
-
-    empty_space = st.empty()
-    with empty_space.container():
-        with st.status('Loading Hive Balances...', expanded=True):
-            df = hive_sql.get_hive_balances(account_names)
-    empty_space.empty()
-
-    return df
-
-
 def get_page(df):
     st.title('Hive Balances')
     if not df.empty:
@@ -1,8 +1,8 @@
-import pandas as pd
 import streamlit as st
 
 from src.api import spl
 from src.static import icons
+from src.util import pipeline
 from src.util.card import create_card
 from src.util.large_number_util import format_large_number
 
@@ -12,53 +12,30 @@ extra_columns = [
 ]
 
 
-def add_assets(row):
+def get_assets(account_name):
     """
-    Add assets (collection power and deeds) to a player's row.
+    Fetch the assets (collection power and deeds) of an account.
 
-    :param row: A row from a DataFrame.
-    :return: A DataFrame containing the modified row.
+    :return: dict with the extra_columns.
     """
     # Fetch player card collection and calculate collection power
-    player_card_collection = spl.get_player_collection_df(row["name"])
-    row = row.copy()  # Ensure modification does not affect cached data
-
-    row["collection_power"] = player_card_collection[
-        "collection_power"].sum() if not player_card_collection.empty else 0
+    player_card_collection = spl.get_player_collection_df(account_name)
+    collection_power = player_card_collection["collection_power"].sum() if not player_card_collection.empty else 0
 
     # Fetch player deeds collection and count
-    player_deeds = spl.get_deeds_collection(row["name"])
-    row["deeds"] = len(player_deeds) if not player_deeds.empty else 0
-
-    return pd.DataFrame([row])  # Always return as DataFrame for easy concatenation
-
-
-def prepare_data(df):
-    """
-    Process each player's data, adding asset information.
-    Uses a Streamlit status update for user feedback.
-    """
-    empty_space = st.empty()
-    with empty_space.container():
-        with st.status('Loading SPL Assets...', expanded=True) as status:
-            processed_rows = []  # List to store processed rows
-
-            for index, row in df.iterrows():
-                status.update(label=f"Fetching assets for: {row['name']}...", state="running")
-
-                updated_row = add_assets(row)  # Process row
-                processed_rows.append(updated_row)  # Append result
+    player_deeds = spl.get_deeds_collection(account_name)
+    deeds = len(player_deeds) if not player_deeds.empty else 0
 
-                status.update(label=f"Completed {row['name']}", state="complete")
+    return {"collection_power": collection_power, "deeds": deeds}
 
-            # Combine processed rows into a DataFrame
-            if processed_rows:
-                result_df = pd.concat(processed_rows, ignore_index=True)
-            else:
-                result_df = pd.DataFrame(columns=df.columns)
-    empty_space.empty()
 
-    return result_df
+pipeline_stage = pipeline.Stage(
+    "SPL assets",
+    inputs=["name"],
+    outputs=extra_columns,
+    fetch_record=get_assets,
+    caches=[spl.get_player_collection_df, spl.get_deeds_collection],
+)
 
 
 def get_page(df):
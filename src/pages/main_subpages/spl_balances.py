@@ -1,9 +1,9 @@
-import pandas as pd
 import streamlit as st
 
 from src.api import spl
 from src.graphs import ke_ratio_graph
 from src.static import icons
+from src.util import enrichment, pipeline
 from src.util.card import create_card
 from src.util.large_number_util import format_large_number
 
@@ -22,60 +22,36 @@ token_columns = [
 ]
 
 
-def add_token_balances(row):
+def get_token_balances(account_name):
     """
-    Fetch and process SPL balances for a given player row.
-    Returns a DataFrame containing the updated balance information.
-    """
-    spl_balances = spl.get_balances(row["name"], filter_tokens=token_columns)
+    Fetch the SPL balances of an account.
 
+    :return: dict of token -> balance, empty when the account has no balances.
+    """
+    spl_balances = spl.get_balances(account_name, filter_tokens=token_columns)
     if spl_balances.empty:
-        return pd.DataFrame([row])  # Ensure we return a DataFrame, not a Series
-
-    # Pivot balances for each token
-    pivoted_df = spl_balances.pivot(index="player", columns="token", values="balance").reset_index()
-
-    # Convert the row to a DataFrame
-    row_df = pd.DataFrame([row])
-
-    # Merge token balances with the original row
-    merged_row = row_df.merge(pivoted_df, left_on="name", right_on="player", how="left").drop(columns=["player"])
-
-    # Ensure all expected token columns exist
-    for col in token_columns:
-        if col not in merged_row.columns:
-            merged_row[col] = 0  # Default missing tokens to 0
+        return {}
+    balances = dict(zip(spl_balances["token"], spl_balances["balance"]))
+    return {token: balances.get(token, 0) for token in token_columns}
 
-    return merged_row
 
-
-def prepare_data(df):
-    """
-    Process all rows in df by fetching SPL balances and updating token columns.
-    Uses Streamlit's status update for user feedback.
+def add_balances(df, on_row=None, max_workers=1):
     """
+    Fetch the SPL balances of all accounts in df and add the token columns.
 
-    empty_space = st.empty()
-    with empty_space.container():
-        with st.status('Loading SPL Balances...', expanded=True) as status:
-            processed_rows = []  # List to store processed rows
-
-            for index, row in df.iterrows():
-                status.update(label=f"Fetching balances for: {row['name']}...", state="running")
-
-                updated_row = add_token_balances(row)  # Process each row
-                processed_rows.append(updated_row)  # Append processed row
-
-                status.update(label=f"Completed {row['name']}", state="complete")
+    :param on_row: optional callback called with each account name (progress feedback).
+    :param max_workers: number of accounts fetched concurrently.
+    """
+    return enrichment.enrich(df, get_token_balances, on_row=on_row, max_workers=max_workers)
 
-            # Combine processed rows into a DataFrame
-            if processed_rows:
-                result_df = pd.concat(processed_rows, ignore_index=True)
-            else:
-                result_df = pd.DataFrame(columns=df.columns)  # Return an empty DataFrame if no data
-    empty_space.empty()
 
-    return result_df
+pipeline_stage = pipeline.Stage(
+    "SPL balances",
+    inputs=["name"],
+    outputs=token_columns,
+    fetch_record=get_token_balances,
+    caches=[spl.get_balances],
+)
 
 
 def get_page(df):
@@ -1,16 +1,39 @@
 import logging
 
-import pandas as pd
 import streamlit as st
 
 from src.api import spl, peakmonsters
 from src.static import icons
-from src.util import spl_util
+from src.util import spl_util, enrichment, pipeline
 from src.util.card import create_card
 from src.util.large_number_util import format_large_number
 
 log = logging.getLogger('SPL Estimates')
 
+# Market wide datasets served stale-while-revalidate, their snapshot age is shown with the estimates
+market_data_sources = {
+    'Card details': spl.get_card_details,
+    'Cards for sale': spl.get_all_cards_for_sale_df,
+    'Market prices': peakmonsters.get_market_prices_df,
+    'Deeds market': spl.get_deeds_market,
+    'Liquidity pools': spl.spl_get_pools,
+}
+
+
+def format_age(seconds):
+    if seconds is None:
+        return 'not loaded'
+    if seconds < 60:
+        return f'{int(seconds)}s'
+    if seconds < 3600:
+        return f'{int(seconds // 60)}m'
+    return f'{seconds / 3600:.1f}h'
+
+
+def add_market_data_age():
+    ages = [f'{label}: {format_age(func.get_snapshot_age())}' for label, func in market_data_sources.items()]
+    st.caption('Market data snapshot age — ' + ' | '.join(ages))
+
 
 def get_collection_card(df):
     list_value = df.filter(regex='list_value').sum(axis=1, numeric_only=True).sum()
@@ -149,79 +172,42 @@ def get_other_values_card(df):
     )
 
 
-def add_estimations(row, list_prices_df, market_prices_df):
+def get_estimations(account_name, list_prices_df, market_prices_df):
     """
-    Add estimated portfolio value to a player's row based on market data.
-    Returns a DataFrame containing the updated row.
-    """
-    account_name = row['name']
+    Estimate the portfolio value of an account based on market data.
 
+    :return: dict of column -> value, empty for accounts that are not Splinterlands accounts.
+    """
     if not spl.player_exist(account_name):
         log.info(f'Not a Splinterlands account, skipping {account_name}')
-        return pd.DataFrame([row])  # Ensure function always returns a DataFrame
+        return {}
 
     # Fetch portfolio estimates
     estimates = spl_util.get_portfolio_value(account_name, list_prices_df, market_prices_df)
 
     if estimates.empty:
-        return pd.DataFrame([row])
-
-    row = row.copy()  # Ensure modification does not affect cached data
-
-    for col in estimates.columns:
-        if col in row.index:
-            row[col] += estimates[col].iloc[0]  # Add value if column exists
-        else:
-            row[col] = estimates[col].iloc[0]  # Add new column if missing
+        return {}
 
-    return pd.DataFrame([row])  # Return as DataFrame for easy concatenation
+    return estimates.iloc[0].to_dict()
 
 
-def prepare_data(df, max_number_of_accounts):
+def get_current_estimations(account_name):
     """
-    Process all accounts by adding estimated values based on market prices.
-    Uses Streamlit status updates for real-time feedback.
+    Estimations with the current market data (cached, so fetched once for all accounts).
     """
-    if df.index.size > max_number_of_accounts:
-        return df  # Return unchanged if too many accounts
+    return get_estimations(account_name, spl.get_all_cards_for_sale_df(), peakmonsters.get_market_prices_df())
 
-    empty_space = st.empty()
-    with empty_space.container():
-        with st.status('Loading SPL Estimates...', expanded=True) as status:
-            # Store the current column order
-            initial_columns = df.columns.tolist()
 
-            # Fetch market data **before** iterating over accounts
-            status.update(label="Fetching market data...", state="running")
-            list_prices_df = spl.get_all_cards_for_sale_df()
-            market_prices_df = peakmonsters.get_market_prices_df()
-            status.update(label="Market data loaded!", state="complete")
-
-            processed_rows = []  # Store processed data
-
-            # Iterate over each row while updating progress
-            for index, row in df.iterrows():
-                status.update(label=f"Processing estimations for: {row['name']}...", state="running")
-
-                updated_row = add_estimations(row, list_prices_df, market_prices_df)  # Process row
-                processed_rows.append(updated_row)
-
-                status.update(label=f"Completed {row['name']}", state="complete")
-
-            # Combine processed rows into a DataFrame
-            if processed_rows:
-                result_df = pd.concat(processed_rows, ignore_index=True)
-            else:
-                result_df = pd.DataFrame(columns=df.columns)
-
-            # Reorder columns: original columns first, then new ones
-            new_columns = [col for col in result_df.columns if col not in initial_columns]
-            result_df = result_df[initial_columns + new_columns]
-
-            status.update(label="All estimations completed!", state="complete")
-    empty_space.empty()
-
-    return result_df
+# The estimate columns depend on the editions and tokens of the account, they are added at the end
+pipeline_stage = pipeline.Stage(
+    'SPL estimates',
+    inputs=['name'],
+    outputs=[],
+    fetch_record=get_current_estimations,
+    overlap=enrichment.ADD,
+    caches=[spl.player_exist, spl.get_player_collection_df, spl.get_balances, spl.get_deeds_collection,
+            spl.get_staked_dec_df],
+)
 
 
 def get_page(df, max_number_of_accounts):
@@ -252,5 +238,7 @@ def get_page(df, max_number_of_accounts):
         with col4:
             st.markdown(sps_card, unsafe_allow_html=True)
             st.markdown(credits_card, unsafe_allow_html=True)
+
+        add_market_data_age()
     else:
         st.write(f'Skipped SPL estimate more then {max_number_of_accounts} accounts requested')
@@ -5,153 +5,249 @@ import pandas as pd
 import streamlit as st
 
 from src.api import hive_sql, sps_validator
-from src.graphs import ke_ratio_graph, ke_hp_graph, hp_spsp_graph, spsp_graph
-from src.pages.main_subpages import hivesql_balances, spl_balances
+from src.graphs import ke_ratio_graph, ke_hp_graph, hp_spsp_graph, spsp_graph, decimation
+from src.pages.main_subpages import spl_balances
+from src.util import streaming
 
 log = logging.getLogger("Top Holders")
 
+# Widget key prefixes of the graph settings (see graph_util.get_chart_settings and get_webgl_setting)
+GRAPH_WIDGET_KEY_PREFIXES = ("log_x_", "log_y_", "webgl_")
 
-def analyse_accounts(accounts, sps_balances=None):
-    df = hivesql_balances.prepare_data(accounts)
+STREAM_KEY = "top_holders_stream"
+
+# Large account sets (top active authors, several thousands of accounts) are streamed in large chunks
+# with concurrent SPL requests, the time budget is the end-to-end target of such a run
+LARGE_CHUNK_SIZE = 500
+SPL_WORKERS = 8
+TIME_BUDGET_SECONDS = 300
+PREVIEW_POINT_BUDGET = 1000
+
+
+def get_hive_data(accounts):
+    """
+    Fetch the HIVE balances of all accounts at once (hive_sql batches the query).
+    """
+    df = hive_sql.get_hive_balances(accounts)
+    if df.empty:
+        return df
 
     # Add date column
     df.insert(0, "date", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    return df
+
 
+def add_staked_sps(df, sps_balances=None, spl_workers=1):
+    """
+    Add the staked SPS of the accounts in df (from sps_balances or the SPL API).
+    """
     if isinstance(sps_balances, pd.DataFrame):
         sps_balances = sps_balances.rename(columns={"balance": "SPSP"})
         df = df.merge(sps_balances, left_on="name", right_on="player", how="left")
-        df = df.drop(['player'], axis=1)
-    else:
-        df = spl_balances.prepare_data(df)
-    return df
+        return df.drop(['player'], axis=1)
+    return spl_balances.add_balances(df, max_workers=spl_workers)
+
 
+def create_page(account_list, sps_balances=None, chunk_size=streaming.CHUNK_SIZE, spl_workers=1,
+                time_budget=None):
+    """
+    Generate the results page with graphs and a table.
+    The HIVE balances are fetched once, only the staked SPS is added per streamed chunk.
 
-def create_page(account_list, sps_balances=None):
-    """Generate the results page with graphs and a table."""
-    if ("last_input" not in st.session_state) or (set(st.session_state.last_input) != set(account_list)):
-        result = analyse_accounts(account_list, sps_balances)
+    :param time_budget: optional target in seconds for analysing all accounts, the measured time is shown
+                        and a run exceeding the budget is logged.
+    """
+    if (STREAM_KEY not in st.session_state or "last_input" not in st.session_state
+            or set(st.session_state.last_input) != set(account_list)):
         st.session_state.last_input = account_list   # store the *list* itself
-        st.session_state.last_result = result        # store the analysis output
-    else:
-        result = st.session_state.last_result
+        with st.spinner("Fetching HIVE balances..."):
+            hive_data = get_hive_data(account_list)
+        streaming.start(STREAM_KEY, hive_data, chunk_size=chunk_size)
+
+    # SPS is added in chunks, the table and a preview graph update while fetching
+    result = streaming.consume(STREAM_KEY,
+                               lambda chunk: add_staked_sps(chunk, sps_balances, spl_workers),
+                               render=add_partial_result,
+                               label="Analysing accounts")
+    streaming.add_cancelled_note(STREAM_KEY)
+    if time_budget:
+        add_time_budget(len(account_list), time_budget)
 
     if not result.empty:
-        # Create tabs for each graph
-        tab1, tab2, tab3, tab4 = st.tabs(["KE Ratio", "KE vs HP", "SPSP vs HP", "SPSP Distribution"])
-
-        with tab1:
-            with st.expander("KE Ratio Analysis Graph Explanation"):
-                st.markdown("""
-                    ### KE Ratio Analysis
-                    This graph visualizes the relationship between KE Ratio and HP, helping """
-                            """to analyze how efficiently users generate rewards relative to their staked HP.
-
-                    #### Graph Components:
-                    * X-axis → HP (Hive Power) (Staked influence in the ecosystem).
-                    * Y-axis → KE Ratio (Indicator of reward efficiency).
-                    * Bubble Size → Staked SPS (SPSP) (Users’ staked SPS holdings).
-
-                    #### How to Read This Graph
-                    * Larger bubbles indicate users who have staked more SPSP.
-                    * Higher KE Ratio means the user receives more rewards relative to their HP.
-                    * Users with low HP but high KE Ratio are generating higher returns on their staked HP.
-                    * Users with high HP but lower KE Ratio may have lower reward efficiency despite their large stake.
-
-                    #### Key Insights
-                    * Are higher HP holders also have higher KE Ratios, or is it independent of HP?
-                    * Does staking SPSP impact KE efficiency?
-                    * Are there outliers with exceptionally high KE Ratios (extractors)?
-
-                    """, unsafe_allow_html=True)
-            ke_ratio_graph.add(result)
-
-        with tab2:
-            with st.expander("KE vs HP Graph Explanation"):
-                st.markdown(
-                    """
-                    ### KE vs HP
-                    This graph visualizes the relationship between KE Ratio, Total Rewards, """
-                    """and HP, plotted against Ranked HP.
-
-                    #### Graph Components:
-                    * 🟠 Orange Markers → KE Ratio (Efficiency indicator).
-                    * 🔵 Blue Markers → Total Rewards (Sum of Author & Curation Rewards).
-                    * 🔴 Red Line → HP Values (Distribution of Staked HP).
-
-                    #### What is Ranked HP?
-                    * Ranked HP is a way of organizing HP values from highest to lowest.
-                    * The highest HP holder is assigned rank 0, the second highest rank 1, and so on.
-                    * This allows for better visualization of how KE Ratio and """
-                    """rewards are distributed across HP holders.
-
-                    #### How to Read This Graph
-                    * The X-axis represents Ranked HP (lower ranks = more HP).
-                    * The Y-axis (left) shows KE Ratio and Total Rewards.
-                    * The Y-axis (right) shows the actual HP values.
-                    * Comparing the markers helps identify whether higher HP leads to better KE efficiency and rewards.
-
-                    This graph provides insights into how different HP levels impact staking efficiency and """
-                    """rewards earned.
-
-                    """, unsafe_allow_html=True)
-            ke_hp_graph.add(result)
-
-        with tab3:
-            with st.expander("SPSP vs HP Graph Explanation"):
-                st.markdown("""
-                ### SPSP vs HP
-                This graph visualizes how Staked SPS (SPSP) is distributed relative to HP holdings, """
-                            """providing insights into the staking behavior of users.
-
-                #### Graph Components:
-                * X-axis → HP (Hive Power) (Users’ staked influence in the ecosystem).
-                * Y-axis → SPSP (Staked SPS) (How much SPS is staked by each user).
-                * Bubble Size → Posting Rewards (Total author rewards received).
-
-                #### How to Read This Graph
-                * Larger bubbles indicate users who have earned higher posting rewards.
-                * The higher a point is on the graph, the more SPSP a user has staked.
-                * The further right a point is, the more HP the user has.
-
-                #### Key Insights
-                * Does higher HP correlate with higher SPSP staking?
-                * Are users with high posting rewards also staking SPSP?
-                *Are there outliers—users with high SPSP but low HP?
-
-                This graph helps understand whether strong HP holders are also staking SPSP and """
-                            """how posting rewards relate to staking behavior.
-                """, unsafe_allow_html=True)
-            hp_spsp_graph.add(result)
-
-        with tab4:
-            with st.expander("SPSP Distribution Graph Explanation"):
-                st.markdown("""
-                ### SPSP Distribution
-                This graph visualizes the distribution of Staked SPS (SPSP) among holders, """
-                            """showing how SPSP is concentrated among the top accounts.
-
-                #### Graph Components:
-                * X-axis → Account Names (Ordered by SPSP holdings, from highest to lowest).
-                * Y-axis → Amount of SPSP (Staked SPS balance for each account).
-
-                #### How to Read This Graph
-                * The left side of the graph represents the top SPSP holders.
-                * The right side represents users with lower SPSP stakes.
-                * Higher bars indicate accounts with larger SPSP stakes.
-                * The gradual decline (or sharp drop-off) shows how SPSP is distributed among the ranked list.
-
-                #### Key Insights
-                * Is SPSP concentrated among a few large holders, or is it more evenly distributed?
-                * How steep is the drop-off from the highest to the lowest SPSP holders?
-                * Are there many mid-sized holders, or is there a large gap between top and bottom accounts?
-
-                This graph helps in understanding the concentration of staking power and """
-                            """whether SPSP is widely distributed or dominated by a few top holders.
-                """)
-            spsp_graph.add(result)
+        add_graphs(result)
         st.dataframe(result, hide_index=True)
 
 
+def add_time_budget(number_of_accounts, time_budget):
+    elapsed = streaming.get_elapsed(STREAM_KEY)
+    st.caption(f"Analysed {number_of_accounts} accounts in {elapsed:.1f}s (budget {time_budget}s)")
+    if elapsed > time_budget and not streaming.is_running(STREAM_KEY):
+        log.warning(f"Analysing {number_of_accounts} accounts took {elapsed:.1f}s, budget is {time_budget}s")
+
+
+def add_partial_result(result):
+    """
+    Preview of the accounts analysed so far (no widgets, this is redrawn for every chunk).
+    The preview graph is thinned to a small point budget to keep the redraws cheap.
+    """
+    preview = result.assign(SPSP=result["SPSP"].astype(float).fillna(0.0))
+    preview, _ = decimation.reduce_points(preview, "hp", "ke_ratio", "Scatter", PREVIEW_POINT_BUDGET,
+                                          log_x=True, log_y=True)
+    st.plotly_chart(ke_ratio_graph.create_figure(preview, log_x=True, log_y=True, webgl=True), theme="streamlit")
+    st.dataframe(result, hide_index=True)
+
+
+def add_graphs(result):
+    """
+    Show the graphs in tabs. In lazy mode only the selected graph is built,
+    the others are built (and cached) when they are selected.
+    """
+    # title -> (function adding the tab content, widget suffix of the graph settings)
+    graph_tabs = {
+        "KE Ratio": (add_ke_ratio_tab, "ke_ratio"),
+        "KE vs HP": (add_ke_hp_tab, "ke_hp"),
+        "SPSP vs HP": (add_hp_spsp_tab, "hp_spsp"),
+        "SPSP Distribution": (add_spsp_tab, "spsp"),
+    }
+
+    lazy = st.toggle("Only build the selected graph", value=True, key="top_holders_lazy_graphs")
+    if lazy:
+        selected = st.segmented_control("Graph", list(graph_tabs), default="KE Ratio", key="top_holders_graph",
+                                        label_visibility="collapsed") or "KE Ratio"
+        keep_widget_state([suffix for title, (_, suffix) in graph_tabs.items() if title != selected])
+        add_tab, _ = graph_tabs[selected]
+        add_tab(result)
+    else:
+        for tab, (add_tab, _) in zip(st.tabs(list(graph_tabs)), graph_tabs.values()):
+            with tab:
+                add_tab(result)
+
+
+def keep_widget_state(widget_suffixes):
+    """
+    Streamlit drops the state of widgets that are not rendered in a run,
+    re-assigning it keeps the settings of the graphs that are not shown.
+    """
+    for key in [prefix + suffix for prefix in GRAPH_WIDGET_KEY_PREFIXES for suffix in widget_suffixes]:
+        if key in st.session_state:
+            st.session_state[key] = st.session_state[key]
+
+
+def add_ke_ratio_tab(result):
+    with st.expander("KE Ratio Analysis Graph Explanation"):
+        st.markdown("""
+            ### KE Ratio Analysis
+            This graph visualizes the relationship between KE Ratio and HP, helping """
+                    """to analyze how efficiently users generate rewards relative to their staked HP.
+
+            #### Graph Components:
+            * X-axis → HP (Hive Power) (Staked influence in the ecosystem).
+            * Y-axis → KE Ratio (Indicator of reward efficiency).
+            * Bubble Size → Staked SPS (SPSP) (Users’ staked SPS holdings).
+
+            #### How to Read This Graph
+            * Larger bubbles indicate users who have staked more SPSP.
+            * Higher KE Ratio means the user receives more rewards relative to their HP.
+            * Users with low HP but high KE Ratio are generating higher returns on their staked HP.
+            * Users with high HP but lower KE Ratio may have lower reward efficiency despite their large stake.
+
+            #### Key Insights
+            * Are higher HP holders also have higher KE Ratios, or is it independent of HP?
+            * Does staking SPSP impact KE efficiency?
+            * Are there outliers with exceptionally high KE Ratios (extractors)?
+
+            """, unsafe_allow_html=True)
+    ke_ratio_graph.add(result)
+
+
+def add_ke_hp_tab(result):
+    with st.expander("KE vs HP Graph Explanation"):
+        st.markdown(
+            """
+            ### KE vs HP
+            This graph visualizes the relationship between KE Ratio, Total Rewards, """
+            """and HP, plotted against Ranked HP.
+
+            #### Graph Components:
+            * 🟠 Orange Markers → KE Ratio (Efficiency indicator).
+            * 🔵 Blue Markers → Total Rewards (Sum of Author & Curation Rewards).
+            * 🔴 Red Line → HP Values (Distribution of Staked HP).
+
+            #### What is Ranked HP?
+            * Ranked HP is a way of organizing HP values from highest to lowest.
+            * The highest HP holder is assigned rank 0, the second highest rank 1, and so on.
+            * This allows for better visualization of how KE Ratio and """
+            """rewards are distributed across HP holders.
+
+            #### How to Read This Graph
+            * The X-axis represents Ranked HP (lower ranks = more HP).
+            * The Y-axis (left) shows KE Ratio and Total Rewards.
+            * The Y-axis (right) shows the actual HP values.
+            * Comparing the markers helps identify whether higher HP leads to better KE efficiency and rewards.
+
+            This graph provides insights into how different HP levels impact staking efficiency and """
+            """rewards earned.
+
+            """, unsafe_allow_html=True)
+    ke_hp_graph.add(result)
+
+
+def add_hp_spsp_tab(result):
+    with st.expander("SPSP vs HP Graph Explanation"):
+        st.markdown("""
+        ### SPSP vs HP
+        This graph visualizes how Staked SPS (SPSP) is distributed relative to HP holdings, """
+                    """providing insights into the staking behavior of users.
+
+        #### Graph Components:
+        * X-axis → HP (Hive Power) (Users’ staked influence in the ecosystem).
+        * Y-axis → SPSP (Staked SPS) (How much SPS is staked by each user).
+        * Bubble Size → Posting Rewards (Total author rewards received).
+
+        #### How to Read This Graph
+        * Larger bubbles indicate users who have earned higher posting rewards.
+        * The higher a point is on the graph, the more SPSP a user has staked.
+        * The further right a point is, the more HP the user has.
+
+        #### Key Insights
+        * Does higher HP correlate with higher SPSP staking?
+        * Are users with high posting rewards also staking SPSP?
+        *Are there outliers—users with high SPSP but low HP?
+
+        This graph helps understand whether strong HP holders are also staking SPSP and """
+                    """how posting rewards relate to staking behavior.
+        """, unsafe_allow_html=True)
+    hp_spsp_graph.add(result)
+
+
+def add_spsp_tab(result):
+    with st.expander("SPSP Distribution Graph Explanation"):
+        st.markdown("""
+        ### SPSP Distribution
+        This graph visualizes the distribution of Staked SPS (SPSP) among holders, """
+                    """showing how SPSP is concentrated among the top accounts.
+
+        #### Graph Components:
+        * X-axis → Account Names (Ordered by SPSP holdings, from highest to lowest).
+        * Y-axis → Amount of SPSP (Staked SPS balance for each account).
+
+        #### How to Read This Graph
+        * The left side of the graph represents the top SPSP holders.
+        * The right side represents users with lower SPSP stakes.
+        * Higher bars indicate accounts with larger SPSP stakes.
+        * The gradual decline (or sharp drop-off) shows how SPSP is distributed among the ranked list.
+
+        #### Key Insights
+        * Is SPSP concentrated among a few large holders, or is it more evenly distributed?
+        * How steep is the drop-off from the highest to the lowest SPSP holders?
+        * Are there many mid-sized holders, or is there a large gap between top and bottom accounts?
+
+        This graph helps in understanding the concentration of staking power and """
+                    """whether SPSP is widely distributed or dominated by a few top holders.
+        """)
+    spsp_graph.add(result)
+
+
 def handle_top_active_authors(posting_reward, comments, months):
     """Fetch and display the top active authors."""
     active_authors = hive_sql.get_active_hiver_users(posting_reward, comments, months)
@@ -168,8 +264,8 @@ def handle_top_active_authors(posting_reward, comments, months):
     active_authors = active_authors.sort_values(by="posting_rewards", ascending=False)
     st.dataframe(active_authors, hide_index=True)
 
-    st.warning("TODO: Scaled down to 1000 for now")
-    create_page(active_authors.head(1000).name.to_list())
+    create_page(active_authors.name.to_list(), chunk_size=LARGE_CHUNK_SIZE, spl_workers=SPL_WORKERS,
+                time_budget=TIME_BUDGET_SECONDS)
 
 
 def get_page():
@@ -21,7 +21,8 @@ def group_bcx(df):
     :param df: dataframe with card collection of a player
     :return: dataframe with grouped bxc or bcx_unbound with a count
     """
-    return (df.groupby(['player', 'card_detail_id', 'xp', 'gold', 'edition', 'level', 'bcx', 'bcx_unbound']).size()
+    return (df.groupby(['player', 'card_detail_id', 'xp', 'gold', 'edition', 'level', 'bcx', 'bcx_unbound'],
+                       observed=True).size()
             .reset_index(name='count'))
 
 
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.util import tracing
+
+REPLACE = "replace"  # overlapping columns are replaced by the fetched values
+ADD = "add"  # fetched numeric values are added to overlapping numeric columns
+
+
+def collect_records(names, fetch_record, on_row=None, max_workers=1):
+    """
+    Fetch one record (dict of column -> value) per account and collect them column wise.
+    Accounts without a record get None in all columns.
+
+    :param max_workers: number of accounts fetched concurrently, records are still collected in the order
+                        of names and on_row is called on the calling thread.
+    :return: dict of column -> list of values, aligned with names.
+    """
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="enrichment") as executor:
+            return add_records(names, executor.map(tracing.wrap(fetch_record), names), on_row)
+    return add_records(names, map(fetch_record, names), on_row)
+
+
+def add_records(names, records, on_row=None):
+    columns = {}
+    for i, (name, record) in enumerate(zip(names, records)):
+        if on_row:
+            on_row(name)
+        for column, value in record.items():
+            columns.setdefault(column, [None] * i).append(value)
+        for values in columns.values():
+            if len(values) == i:
+                values.append(None)
+    return columns
+
+
+def enrich(df, fetch_record, on_row=None, overlap=REPLACE, max_workers=1):
+    """
+    Add the data of fetch_record(name) to every account in df.
+    Records are collected in plain lists and joined once on "name" instead of building and concatenating
+    a DataFrame per row.
+
+    :param fetch_record: function(name) -> dict of column -> value, empty dict when there is no data.
+    :param on_row: optional callback called with each account name (progress feedback).
+    :param overlap: REPLACE or ADD, how to combine fetched columns that already exist in df.
+    :param max_workers: number of accounts fetched concurrently.
+    :return: new DataFrame with the original columns first, followed by the new columns.
+    """
+    names = list(dict.fromkeys(df["name"]))  # fetch every account once, keep the order
+    columns = collect_records(names, fetch_record, on_row, max_workers)
+    records_df = pd.DataFrame({"name": names, **columns})
+
+    overlapping = [column for column in records_df.columns if column != "name" and column in df.columns]
+    result = df.reset_index(drop=True).merge(records_df, on="name", how="left", suffixes=("", "_fetched"))
+
+    for column in overlapping:
+        fetched = result.pop(f"{column}_fetched")
+        if overlap == ADD:
+            if pd.api.types.is_numeric_dtype(result[column]) and pd.api.types.is_numeric_dtype(fetched):
+                result[column] = result[column].add(fetched, fill_value=0)
+        else:
+            result[column] = fetched.where(fetched.notna(), result[column])
+    return result
@@ -0,0 +1,205 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+import streamlit as st
+
+from src.util import enrichment, tracing
+
+log = logging.getLogger("Pipeline")
+
+MAX_WORKERS = 4
+
+
+class Stage:
+    """
+    A data source of the account enrichment pipeline.
+    The stage runs as soon as all its input columns are available, stages without dependencies between them
+    run in parallel.
+
+    :param name: name shown in the progress and timing report.
+    :param inputs: columns the stage needs.
+    :param outputs: columns the stage adds.
+    :param fetch_record: function(account name) -> dict of column -> value, called per account.
+    :param fetch_frame: function(DataFrame with the input columns) -> DataFrame with a "name" column,
+                        for sources that fetch all accounts at once. A stage with "name" in its outputs defines
+                        the rows of the result.
+    :param overlap: enrichment.REPLACE or enrichment.ADD, how to combine outputs with existing columns.
+    :param caches: memory_cache decorated functions used by the stage, their hits and misses are reported.
+    """
+
+    def __init__(self, name, inputs, outputs, fetch_record=None, fetch_frame=None, overlap=enrichment.REPLACE,
+                 caches=()):
+        if (fetch_record is None) == (fetch_frame is None):
+            raise ValueError(f"Stage {name} needs either fetch_record or fetch_frame")
+        self.name = name
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.fetch_record = fetch_record
+        self.fetch_frame = fetch_frame
+        self.overlap = overlap
+        self.caches = tuple(caches)
+
+
+def cache_counters(stage):
+    hits = misses = 0
+    for func in stage.caches:
+        cache = func.get_cache()
+        hits += cache.hits + cache.stale_hits
+        misses += cache.misses
+    return hits, misses
+
+
+def execute(stage, inputs, progress):
+    """
+    Run a single stage on a snapshot of its input columns (executed on a worker thread).
+    Within a trace the stage and every account fetched by it are timed as spans.
+
+    :return: DataFrame with "name" and the fetched columns.
+    """
+    with tracing.span(stage.name, kind=tracing.STAGE, accounts=len(inputs)):
+        if stage.fetch_frame is not None:
+            progress["total"] = len(inputs)
+            result = stage.fetch_frame(inputs)
+            progress["done"] = len(inputs)
+            return result
+
+        names = list(dict.fromkeys(inputs["name"]))
+        progress["total"] = len(names)
+
+        def fetch(name):
+            with tracing.span(name, kind=tracing.ACCOUNT):
+                record = stage.fetch_record(name)
+            progress["done"] += 1
+            return record
+
+        columns = enrichment.collect_records(names, fetch)
+        return pd.DataFrame({"name": names, **columns})
+
+
+def join(df, stage, result):
+    if "name" not in df.columns:
+        return result
+    if result.empty:
+        return df
+    return enrichment.enrich(df, dict(zip(result["name"], result.drop(columns="name").to_dict("records"))).get,
+                             overlap=stage.overlap)
+
+
+def order_columns(df, initial_columns, stages):
+    ordered = [column for column in initial_columns if column in df.columns]
+    for stage in stages:
+        ordered += [column for column in stage.outputs if column in df.columns and column not in ordered]
+    return df[ordered + [column for column in df.columns if column not in ordered]]
+
+
+def get_breakdown_columns(stage_span):
+    breakdown = tracing.get_breakdown(stage_span)
+    columns = {f"{kind.replace('_', ' ')} (s)": round(breakdown.get(kind, 0.0), 3)
+               for kind in (tracing.NETWORK, tracing.RETRY_SLEEP, tracing.RENDER, tracing.PROCESSING)}
+    columns["trace"] = stage_span.trace.trace_id if stage_span else None
+    return columns
+
+
+def run(stages, df, max_workers=MAX_WORKERS, on_progress=None):
+    """
+    Run the stages as a DAG: a stage starts when the columns it needs are available,
+    independent stages run in parallel on a thread pool. Results are joined on "name" on the calling thread.
+
+    :param df: start DataFrame, e.g. with the account names.
+    :param on_progress: optional function(progress) called on the calling thread while stages run,
+                        progress is a dict of stage name -> {"done", "total", "status"}.
+    :return: tuple (enriched DataFrame, report DataFrame with timing and cache statistics per stage).
+             The stage time is broken down in network, retry sleep and processing (pandas and Python) time,
+             the render column is used for the rendering row of add_render_timing.
+    """
+    initial_columns = df.columns.tolist()
+    available = set(initial_columns)
+    pending = list(stages)
+    running = {}
+    progress = {stage.name: {"done": 0, "total": 0, "status": "waiting"} for stage in stages}
+    report = []
+
+    with tracing.trace("pipeline", stages=len(stages)) as root:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline") as executor:
+            while pending or running:
+                for stage in [stage for stage in pending if set(stage.inputs) <= available]:
+                    pending.remove(stage)
+                    progress[stage.name]["status"] = "running"
+                    inputs = df.reindex(columns=list(stage.inputs))
+                    start = (stage, time.perf_counter(), cache_counters(stage))
+                    running[executor.submit(tracing.wrap(execute), stage, inputs, progress[stage.name])] = start
+
+                if not running:
+                    missing = {stage.name: sorted(set(stage.inputs) - available) for stage in pending}
+                    raise ValueError(f"Pipeline stages with unavailable inputs: {missing}")
+
+                done, _ = wait(running, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, start, (hits, misses) = running.pop(future)
+                    df = join(df, stage, future.result())
+                    available |= set(stage.outputs)
+                    progress[stage.name]["status"] = "complete"
+
+                    end_hits, end_misses = cache_counters(stage)
+                    report.append({
+                        "stage": stage.name,
+                        "accounts": progress[stage.name]["total"],
+                        "seconds": round(time.perf_counter() - start, 3),
+                        "cache_hits": end_hits - hits,
+                        "cache_misses": end_misses - misses,
+                        **get_breakdown_columns(tracing.find_span(root, stage.name, tracing.STAGE)),
+                    })
+                    log.info(f"Stage {stage.name} completed in {report[-1]['seconds']}s")
+
+                if on_progress:
+                    on_progress(progress)
+
+    return order_columns(df, initial_columns, stages), pd.DataFrame(report)
+
+
+def add_render_timing(report, render_span, accounts):
+    """
+    Add the rendering of the result (the script run after st.rerun, traced with the same trace id)
+    as a row to the report of the pipeline run.
+    """
+    row = {
+        "stage": render_span.name,
+        "accounts": accounts,
+        "seconds": round(render_span.seconds, 3),
+        "cache_hits": 0,
+        "cache_misses": 0,
+        **get_breakdown_columns(render_span),
+    }
+    return pd.concat([report, pd.DataFrame([row])], ignore_index=True)
+
+
+def run_with_status(stages, df, label):
+    """
+    Run the pipeline with a Streamlit status that shows the progress of every stage.
+    The run is traced as a whole (see tracing), including the status updates.
+    """
+    empty_space = st.empty()
+    with empty_space.container(), tracing.trace(label):
+        with st.status(label, expanded=True) as status:
+            lines = {stage.name: st.empty() for stage in stages}
+
+            def show_progress(progress):
+                for name, state in progress.items():
+                    lines[name].write(f"{name}: {state['status']} ({state['done']}/{state['total']})")
+
+            result, report = run(stages, df, on_progress=show_progress)
+            status.update(label=f"{label} completed", state="complete")
+    empty_space.empty()
+    return result, report
+
+
+def add_report(report):
+    """
+    Show the timing and cache statistics of the pipeline stages.
+    Stages running in parallel can share caches, their cache counters then overlap.
+    """
+    if report is not None and not report.empty:
+        with st.expander("Data loading timings", expanded=False):
+            st.dataframe(report, hide_index=True)
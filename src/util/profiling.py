@@ -0,0 +1,204 @@
+import cProfile
+import logging
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+log = logging.getLogger("Profiling")
+
+OFF = "Off"
+CPROFILE = "cProfile"
+SAMPLING = "Sampling"
+
+# cProfile is only offered when enabled in secrets.toml, for single-user debugging:
+# [profiling]
+# cprofile = true
+# From Python 3.12 cProfile is built on sys.monitoring, which is process wide: it instruments (and slows down)
+# the script and worker threads of every session. The Sampler only records the threads of the profiled run.
+CPROFILE_WARNING = ("cProfile instruments the whole server process, all sessions are slowed down and included "
+                    "in the profile. Use it for single-user debugging only.")
+
+MODE_KEY = "profiling_mode"
+RESULTS_KEY = "profiling_results"
+MAX_RESULTS = 5  # profiles of the last runs kept per session, a click followed by st.rerun is two runs
+TOP_FUNCTIONS = 30
+SAMPLE_INTERVAL = 0.005
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Sampler:
+    """
+    Sampling profiler with the enable/disable interface of cProfile.Profile. A background thread records the
+    stack of the profiled thread, and of the threads started while sampling (e.g. the pipeline workers), every
+    interval. Stacks are kept in folded format ("outer;inner;leaf" -> samples), the input format of flame graph
+    tools (flamegraph.pl, speedscope).
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._existing = set()
+
+    def enable(self):
+        # Threads of other sessions that already run are not sampled, the profiled (calling) thread is
+        self._existing = {thread.ident for thread in threading.enumerate()} - {threading.get_ident()}
+        self._thread = threading.Thread(target=self._run, daemon=True, name="profiling-sampler")
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        sampler = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == sampler or ident in self._existing:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def get_folded(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def get_top_functions(self, limit=TOP_FUNCTIONS):
+        """Functions by samples in the function itself (self) and including its callees (total)."""
+        own = Counter()
+        total = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for function in set(frames):
+                total[function] += count
+        samples = sum(self.stacks.values())
+        df = pd.DataFrame({
+            "function": list(total),
+            "self samples": [own[function] for function in total],
+            "total samples": list(total.values()),
+        })
+        if df.empty:
+            return df
+        df["total %"] = (df["total samples"] / samples * 100).round(1)
+        return df.sort_values(by=["self samples", "total samples"], ascending=False).head(limit)
+
+
+def get_cprofile_top_functions(stats, limit=TOP_FUNCTIONS):
+    rows = [{
+        "function": f"{function} ({os.path.basename(filename)}:{line})",
+        "calls": calls,
+        "own (s)": round(own_time, 4),
+        "cumulative (s)": round(cumulative_time, 4),
+    } for (filename, line, function), (_, calls, own_time, cumulative_time, _) in stats.stats.items()]
+    return pd.DataFrame(rows).sort_values(by="cumulative (s)", ascending=False).head(limit)
+
+
+def is_cprofile_allowed():
+    try:
+        return bool(st.secrets.get("profiling", {}).get("cprofile", False))
+    except FileNotFoundError:
+        return False
+
+
+def get_modes():
+    return [OFF, SAMPLING, CPROFILE] if is_cprofile_allowed() else [OFF, SAMPLING]
+
+
+def is_enabled():
+    return st.session_state.get("authenticated") and st.session_state.get(MODE_KEY, OFF) != OFF
+
+
+@contextmanager
+def profile_run(page_title):
+    """
+    Profile the page run when the profiling mode of this (authorized) session is on.
+    The sampler records the script thread and the worker threads started by the run. cProfile (only when
+    allowed) records every thread of the process from Python 3.12 on, including those of other sessions.
+    The result is kept in the session, also when the run ends with st.rerun.
+    """
+    if not is_enabled():
+        yield
+        return
+
+    mode = st.session_state[MODE_KEY]
+    if mode == CPROFILE and not is_cprofile_allowed():
+        yield
+        return
+    profiler = cProfile.Profile() if mode == CPROFILE else Sampler()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Only one cProfile profiler can be active at the same time (e.g. another session is profiling)
+        log.warning(f"Profiling not started: {e}")
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        result = {
+            "page": page_title,
+            "mode": mode,
+            "time": datetime.now().strftime("%H:%M:%S"),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        if mode == CPROFILE:
+            stats = pstats.Stats(profiler)
+            result["top"] = get_cprofile_top_functions(stats)
+            result["export"] = ("profile.prof", marshal.dumps(stats.stats))  # pstats / snakeviz format
+        else:
+            result["top"] = profiler.get_top_functions()
+            result["export"] = ("profile.folded", profiler.get_folded())  # flame graph (folded stacks)
+        results = st.session_state.setdefault(RESULTS_KEY, [])
+        results.append(result)
+        del results[:-MAX_RESULTS]
+
+
+def add_toggle():
+    """Profiling mode selection in the sidebar, only for authorized sessions."""
+    if st.session_state.get("authenticated"):
+        modes = get_modes()
+        if st.session_state.get(MODE_KEY) not in modes:
+            st.session_state[MODE_KEY] = OFF
+        st.sidebar.selectbox("Profile page runs", modes, key=MODE_KEY,
+                             help="Sampling only records this session, cProfile the whole server process")
+        if st.session_state[MODE_KEY] == CPROFILE:
+            st.sidebar.warning(CPROFILE_WARNING)
+
+
+def add_report():
+    """Show the profiles of the last runs of this session."""
+    results = st.session_state.get(RESULTS_KEY)
+    if not is_enabled() or not results:
+        return
+
+    with st.expander("Profile of the last runs", expanded=False):
+        labels = [f"{result['time']} {result['page']} ({result['mode']}, {result['seconds']}s)"
+                  for result in results]
+        index = st.selectbox("Run", range(len(results)), index=len(results) - 1,
+                             format_func=lambda i: labels[i], key="profiling_run")
+        result = results[index]
+        st.dataframe(result["top"], hide_index=True)
+        file_name, data = result["export"]
+        st.download_button(f"Download {file_name}", data, file_name=file_name, key="profiling_download")
@@ -0,0 +1,113 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+CHUNK_SIZE = 50
+
+
+def start(key, items, chunk_size=CHUNK_SIZE):
+    """
+    Start a streamed run over items (list or DataFrame), the items are processed by consume.
+    The progress is kept in session state so a run that is interrupted by a rerun continues where it stopped.
+    """
+    st.session_state[key] = {
+        "items": items,
+        "position": 0,
+        "chunk_size": chunk_size,
+        "parts": [],
+        "cancelled": False,
+        "elapsed": 0.0,
+    }
+
+
+def is_running(key):
+    state = st.session_state.get(key)
+    return state is not None and not state["cancelled"] and state["position"] < len(state["items"])
+
+
+def is_cancelled(key):
+    state = st.session_state.get(key)
+    return state is not None and state["cancelled"]
+
+
+def cancel(key):
+    st.session_state[key]["cancelled"] = True
+
+
+def get_result(key):
+    """
+    Return all results that arrived so far as one DataFrame.
+    """
+    state = st.session_state.get(key)
+    if not state or not state["parts"]:
+        return pd.DataFrame()
+    return pd.concat(state["parts"], ignore_index=True)
+
+
+def get_elapsed(key):
+    """
+    Seconds spent processing the items of the run, excluding the time between reruns.
+    """
+    state = st.session_state.get(key)
+    return state["elapsed"] if state else 0.0
+
+
+def get_chunk(items, start_index, stop_index):
+    if isinstance(items, pd.DataFrame):
+        return items.iloc[start_index:stop_index]
+    return items[start_index:stop_index]
+
+
+def consume(key, process, render=None, label="Loading"):
+    """
+    Process the remaining items of the run chunk by chunk.
+    After every chunk the partial result is stored in session state and shown with render, so the page
+    updates while fetching. A cancel button stops the run, the results that arrived so far are kept.
+
+    :param process: function(chunk) -> DataFrame, fetches the data of one chunk of items.
+    :param render: optional function(partial DataFrame) that shows the partial result,
+                   it is called once per chunk so it must not create widgets.
+    :return: the (partial) result.
+    """
+    state = st.session_state[key]
+    if not is_running(key):
+        return get_result(key)
+
+    cancel_space = st.empty()
+    if cancel_space.button("Cancel", key=f"{key}_cancel"):
+        cancel(key)
+        cancel_space.empty()
+        return get_result(key)
+
+    total = len(state["items"])
+    progress = st.progress(state["position"] / total, text=f"{label}: {state['position']}/{total}")
+    partial_space = st.empty()
+
+    while state["position"] < total:
+        stop_index = min(state["position"] + state["chunk_size"], total)
+        start_time = time.perf_counter()
+        part = process(get_chunk(state["items"], state["position"], stop_index))
+        state["elapsed"] += time.perf_counter() - start_time
+        if not part.empty:
+            state["parts"].append(part)
+        state["position"] = stop_index
+
+        progress.progress(stop_index / total, text=f"{label}: {stop_index}/{total}")
+        if render and stop_index < total:
+            with partial_space.container():
+                render(get_result(key))
+
+    cancel_space.empty()
+    progress.empty()
+    partial_space.empty()
+    return get_result(key)
+
+
+def add_cancelled_note(key):
+    """
+    Show how much of a cancelled run was processed.
+    """
+    if is_cancelled(key):
+        state = st.session_state[key]
+        st.info(f"Cancelled, showing the results of {state['position']} of {len(state['items'])} items.")
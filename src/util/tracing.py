@@ -0,0 +1,232 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+import streamlit as st
+
+log = logging.getLogger("Tracing")
+
+# Span kinds, the time of a span that is not covered by its children counts for its kind in the breakdown
+STAGE = "stage"
+ACCOUNT = "account"
+NETWORK = "network"
+RETRY_SLEEP = "retry_sleep"
+RENDER = "render"
+# Breakdown category of the own time of all other kinds (pandas and Python work)
+PROCESSING = "processing"
+BREAKDOWN_KINDS = (NETWORK, RETRY_SLEEP, RENDER)
+
+OTLP_TIMEOUT = 2
+SERVICE_NAME = "bee-balance"
+
+_current = contextvars.ContextVar("tracing_span", default=None)
+
+
+class Span:
+    def __init__(self, trace, name, kind, parent_id, attributes):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    @property
+    def seconds(self):
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "attributes": self.attributes,
+        }
+
+
+class Trace:
+    """
+    The spans of one traced operation, spans are added from the worker threads of that operation as well.
+    An operation that spans several script runs (e.g. a click followed by st.rerun) continues the trace id.
+    """
+
+    def __init__(self, trace_id=None):
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def get_spans(self):
+        with self._lock:
+            return list(self.spans)
+
+
+def get_settings():
+    """
+    Export settings from secrets.toml, both are optional:
+    [tracing]
+    json_path = "traces.jsonl"             # append every finished trace as a JSON line
+    otlp_endpoint = "http://localhost:4318"  # OpenTelemetry collector (OTLP/HTTP JSON)
+    """
+    try:
+        return dict(st.secrets.get("tracing", {}))
+    except FileNotFoundError:
+        return {}
+
+
+@contextmanager
+def span(name, kind=PROCESSING, **attributes):
+    """
+    Time a block as a child of the current span. Outside a trace this does nothing and yields None.
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    current = Span(parent.trace, name, kind, parent.span_id, attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        current.end_ns = time.time_ns()
+        _current.reset(token)
+        parent.trace.add(current)
+
+
+def get_context(current):
+    """(trace id, span id) of a span, to continue its trace in a later script run (see trace)."""
+    return current.trace.trace_id, current.span_id
+
+
+@contextmanager
+def trace(name, kind=PROCESSING, parent=None, **attributes):
+    """
+    Time a block as the root of a new trace, or as a child span when a trace is already active.
+    A finished root trace is exported according to the [tracing] settings.
+
+    :param parent: optional get_context of a span of an earlier script run, e.g. the click that ended with
+                   st.rerun. The block is then a child of that span, with the same trace id.
+    """
+    if _current.get() is not None:
+        with span(name, kind, **attributes) as current:
+            yield current
+        return
+    trace_id, parent_id = parent or (None, None)
+    root = Span(Trace(trace_id), name, kind, parent_id, attributes)
+    token = _current.set(root)
+    try:
+        yield root
+    finally:
+        root.end_ns = time.time_ns()
+        _current.reset(token)
+        root.trace.add(root)
+        export(root.trace)
+
+
+def wrap(func):
+    """
+    Run func within the current span of the caller, for functions submitted to a thread pool
+    (worker threads do not inherit it). Only the span is passed on, not the caller's Streamlit script context.
+    """
+    parent = _current.get()
+
+    def run_in_span(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run_in_span
+
+
+def find_span(root, name, kind):
+    """The first finished span with this name and kind in the trace of root, None when there is none."""
+    if root is None:
+        return None
+    return next((current for current in root.trace.get_spans() if current.name == name and current.kind == kind),
+                None)
+
+
+def get_breakdown(root):
+    """
+    Seconds per category (network, retry sleep, rendering, processing) of the span and its descendants.
+    Each span counts with its own time, the part not covered by its children. Children that run in
+    parallel can cover more than their parent, the own time is then 0.
+    """
+    if root is None:
+        return {}
+    spans = root.trace.get_spans()
+    children = {}
+    for child in spans:
+        children.setdefault(child.parent_id, []).append(child)
+
+    breakdown = dict.fromkeys(BREAKDOWN_KINDS + (PROCESSING,), 0.0)
+    pending = [root]
+    while pending:
+        current = pending.pop()
+        own = max(current.seconds - sum(child.seconds for child in children.get(current.span_id, [])), 0.0)
+        breakdown[current.kind if current.kind in BREAKDOWN_KINDS else PROCESSING] += own
+        pending += children.get(current.span_id, [])
+    return breakdown
+
+
+def to_otlp(finished_trace):
+    """The trace as an OTLP/HTTP JSON ExportTraceServiceRequest."""
+    def attribute(key, value):
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    spans = []
+    for current in finished_trace.get_spans():
+        attributes = {"kind": current.kind, **current.attributes}
+        spans.append({
+            "traceId": finished_trace.trace_id,
+            "spanId": current.span_id,
+            "parentSpanId": current.parent_id or "",
+            "name": current.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(current.start_ns),
+            "endTimeUnixNano": str(current.end_ns),
+            "attributes": [attribute(key, value) for key, value in attributes.items()],
+        })
+    return {"resourceSpans": [{
+        "resource": {"attributes": [attribute("service.name", SERVICE_NAME)]},
+        "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+    }]}
+
+
+def export(finished_trace):
+    settings = get_settings()
+    if settings.get("json_path"):
+        try:
+            with open(settings["json_path"], "a") as file:
+                file.write(json.dumps([current.to_dict() for current in finished_trace.get_spans()], default=str))
+                file.write("\n")
+        except OSError as e:
+            log.error(f"Could not write trace to {settings['json_path']}: {e}")
+    if settings.get("otlp_endpoint"):
+        try:
+            requests.post(f"{settings['otlp_endpoint'].rstrip('/')}/v1/traces", json=to_otlp(finished_trace),
+                          timeout=OTLP_TIMEOUT).raise_for_status()
+        except requests.exceptions.RequestException as e:
+            log.error(f"Could not export trace to {settings['otlp_endpoint']}: {e}")
@@ -0,0 +1,88 @@
+import datetime
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from src.api import activity_store
+
+NOW = datetime.datetime(2025, 6, 15, 12, 0, 0)
+
+
+def activity(*rows):
+    return pd.DataFrame(rows, columns=["author", "month", "comments", "posts", "replies"])
+
+
+def test_add_activity_sums_counts_per_month(tmp_path):
+    path = str(tmp_path / "activity.sqlite")
+    activity_store.add_activity(activity(("alice", "2025-06", 3, 1, 1)), NOW, path)
+    activity_store.add_activity(activity(("alice", "2025-06", 2, 1, 0), ("bob", "2025-05", 1, 0, 1)), NOW, path)
+
+    result = activity_store.get_active_accounts(1, 0, -1, now=NOW, path=path)
+
+    assert result.sort_values("name").to_dict("records") == [
+        {"name": "alice", "comment_count": 5, "post_count": 2, "replies": 1},
+        {"name": "bob", "comment_count": 1, "post_count": 0, "replies": 1},
+    ]
+    assert activity_store.get_watermark(path) == NOW
+
+
+def test_get_active_accounts_filters_months_and_counts(tmp_path):
+    path = str(tmp_path / "activity.sqlite")
+    activity_store.add_activity(activity(("alice", "2025-06", 5, 2, 0), ("alice", "2025-01", 20, 5, 0),
+                                         ("bob", "2025-06", 1, 1, 0)), NOW, path)
+
+    assert activity_store.get_active_accounts(2, 2, 1, now=NOW, path=path)["name"].tolist() == ["alice"]
+    assert activity_store.get_active_accounts(6, 10, 1, now=NOW, path=path)["comment_count"].tolist() == [25]
+
+
+def test_refresh_is_incremental(tmp_path):
+    path = str(tmp_path / "activity.sqlite")
+    windows = []
+
+    def fetch_activity(start, end):
+        windows.append((start, end))
+        return activity(("alice", start.strftime("%Y-%m"), 1, 0, 0))
+
+    assert activity_store.refresh(fetch_activity, now=NOW, path=path, history_months=2) == 3
+    assert windows[0][0] == datetime.datetime(2025, 4, 1)
+    # Comments that HiveSQL may still ingest are not part of the store yet
+    assert windows[-1][1] == NOW - activity_store.INGEST_LAG
+
+    # Recently refreshed, nothing to fetch
+    assert activity_store.refresh(fetch_activity, now=NOW + datetime.timedelta(minutes=5), path=path,
+                                  history_months=2) == 0
+
+    later = NOW + datetime.timedelta(hours=1)
+    assert activity_store.refresh(fetch_activity, now=later, path=path, history_months=2) == 1
+    assert windows[-1] == (NOW - activity_store.INGEST_LAG, later - activity_store.INGEST_LAG)
+
+
+def test_refresh_stops_on_failed_fetch_and_prunes_old_months(tmp_path):
+    path = str(tmp_path / "activity.sqlite")
+    activity_store.add_activity(activity(("alice", "2024-01", 1, 0, 0)), datetime.datetime(2025, 5, 1), path)
+
+    assert activity_store.refresh(lambda start, end: None, now=NOW, path=path, history_months=2) == 0
+
+    assert activity_store.get_watermark(path) == datetime.datetime(2025, 5, 1)
+    assert activity_store.get_active_accounts(24, 0, -1, now=NOW, path=path).empty
+
+
+def test_is_ready_after_build(tmp_path):
+    path = str(tmp_path / "activity.sqlite")
+    assert not activity_store.is_ready(now=NOW, path=path)
+
+    # Partly built (interrupted or still running)
+    activity_store.add_activity(activity(("alice", "2025-01", 1, 0, 0)), datetime.datetime(2025, 2, 1), path)
+    assert not activity_store.is_ready(now=NOW, path=path)
+
+    activity_store.add_activity(activity(("alice", "2025-06", 1, 0, 0)), NOW - activity_store.INGEST_LAG, path)
+    assert activity_store.is_ready(now=NOW, path=path)
+
+
+def test_refresh_in_background_skips_running_refresh():
+    fetch_activity = MagicMock()
+    lock = activity_store.get_refresh_lock()
+    with lock:
+        assert activity_store.is_refreshing()
+        assert not activity_store.refresh_in_background(fetch_activity)
+    fetch_activity.assert_not_called()
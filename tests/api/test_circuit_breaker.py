@@ -0,0 +1,100 @@
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+import streamlit as st
+
+from src.api import circuit_breaker, memory_cache, spl
+from src.api.memory_cache import memory_cache as cached
+from tests.stand_ins.http_server import ReplayServer, patch_endpoints
+
+URL = "https://api2.splinterlands.com/players/balances"
+
+
+@pytest.fixture(autouse=True)
+def clear_state():
+    st.cache_resource.clear()
+    memory_cache.clear_all()
+    settings = {"failure_threshold": 2, "open_seconds": 30}
+    with patch("src.api.circuit_breaker.get_settings", return_value=settings):
+        yield
+    st.cache_resource.clear()
+    memory_cache.clear_all()
+
+
+def test_opens_after_consecutive_failures():
+    circuit_breaker.record_failure(URL)
+    circuit_breaker.record_success(URL)
+    circuit_breaker.record_failure(URL)
+    circuit_breaker.check(URL)
+
+    circuit_breaker.record_failure(URL)
+    with pytest.raises(circuit_breaker.CircuitOpenError) as error:
+        circuit_breaker.check(URL)
+
+    assert error.value.host == "api2.splinterlands.com"
+    assert 29 < error.value.retry_in <= 30
+    stats = circuit_breaker.get_stats().iloc[0]
+    assert (stats["state"], stats["rejected requests"]) == (circuit_breaker.OPEN, 1)
+
+
+def test_half_open_lets_one_probe_through(monkeypatch):
+    monkeypatch.setattr("src.api.circuit_breaker.time.time", lambda: 1000)
+    circuit_breaker.record_failure(URL)
+    circuit_breaker.record_failure(URL)
+
+    monkeypatch.setattr("src.api.circuit_breaker.time.time", lambda: 1031)
+    circuit_breaker.check(URL)
+    with pytest.raises(circuit_breaker.CircuitOpenError):
+        circuit_breaker.check(URL)
+
+    # A failed probe reopens the circuit, a successful one closes it
+    circuit_breaker.record_failure(URL)
+    with pytest.raises(circuit_breaker.CircuitOpenError):
+        circuit_breaker.check(URL)
+    monkeypatch.setattr("src.api.circuit_breaker.time.time", lambda: 1062)
+    circuit_breaker.check(URL)
+    circuit_breaker.record_success(URL)
+    circuit_breaker.check(URL)
+    assert circuit_breaker.get_stats().iloc[0]["state"] == circuit_breaker.CLOSED
+
+
+def test_outage_stops_retries_and_fails_fast():
+    with ReplayServer(error_rate=1.0) as server, patch_endpoints(server):
+        with pytest.raises(circuit_breaker.CircuitOpenError):
+            spl.get_balances("alice")
+        requests_made = server.stats["requests"]
+        with pytest.raises(circuit_breaker.CircuitOpenError):
+            spl.get_balances("bob")
+
+        assert requests_made == 2
+        assert server.stats["requests"] == requests_made
+
+
+def test_success_closes_circuit_through_adapter():
+    with ReplayServer() as server, patch_endpoints(server):
+        circuit_breaker.record_failure(server.url)
+        spl.get_balances("alice")
+
+    assert circuit_breaker.get_stats().iloc[0]["consecutive failures"] == 0
+
+
+def test_memory_cache_serves_stale_result_while_open(monkeypatch):
+    responses = [pd.DataFrame({"value": [1]}), circuit_breaker.CircuitOpenError("host", 30)]
+
+    @cached(ttl=10)
+    def load():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr("src.api.memory_cache.time.time", lambda: 1000)
+    load()
+    monkeypatch.setattr("src.api.memory_cache.time.time", lambda: 1011)
+
+    assert load()["value"].tolist() == [1]
+    with pytest.raises(circuit_breaker.CircuitOpenError):
+        load.clear()
+        responses.append(circuit_breaker.CircuitOpenError("host", 30))
+        load()
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from src.api.hafsql import fetch_balance_history
+from tests.stand_ins.hive_db import create_database, patch_hafsql
+
+
+@pytest.fixture(scope="module")
+def haf_db(tmp_path_factory):
+    directory = create_database(tmp_path_factory.mktemp("haf"), accounts=50, history_per_account=40)
+    with patch_hafsql(directory):
+        yield directory
+
+
+def test_fetch_balance_history_keeps_first_last_and_monthly_rows(haf_db):
+    df = fetch_balance_history(["account1", "account2"])
+
+    assert set(df["account_name"]) == {"account1", "account2"}
+    for _, account_df in df.groupby("account_name"):
+        assert account_df["rn_first"].min() == 1
+        assert account_df["rn_last"].min() == 1
+        # One row per month (plus the first and last row)
+        assert len(account_df) <= account_df["month_start"].nunique() + 2
+    assert pd.api.types.is_datetime64_any_dtype(df["block_timestamp"])
+
+
+def test_fetch_balance_history_without_accounts(haf_db):
+    assert fetch_balance_history([]).empty
+    assert fetch_balance_history(["unknown"]).empty
@@ -4,6 +4,7 @@ import pandas as pd
 import pytest
 import streamlit as st
 
+from src.api import memory_cache
 from src.api.hive_engine import (
     get_liquidity_positions,
     get_quantity,
@@ -26,6 +27,7 @@ MOCK_BALANCES = [{"account": "user", "symbol": "TOKEN", "balance": "50"}]
 def mock_api():
     st.cache_data.clear()
     st.cache_resource.clear()
+    memory_cache.clear_all()
 
     """Reset global state before every test."""
     with patch("src.api.hive_engine.Api") as mock_api_class:
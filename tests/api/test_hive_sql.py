@@ -17,10 +17,12 @@ from src.api.hive_sql import (
     reputation_to_score,
     score_to_reputation,
     get_hive_balances_params,
+    get_activity,
     get_commentators,
     get_top_posting_rewards,
     get_active_hiver_users, get_db_credentials,
 )
+from tests.stand_ins.hive_db import create_database, patch_hive_sql, account_names, HIVE_PER_MVEST
 
 TEST_SERVER = "mockserver.local"
 TEST_DB = "TestDB"
@@ -267,8 +269,10 @@ def test_score_to_reputation_series():
     assert result_series[1] == pytest.approx(181245992354454, rel=1)
 
 
+@patch("src.api.hive_sql.activity_store.get_active_accounts")
+@patch("src.api.hive_sql.refresh_activity_in_background")
 @patch("src.api.hive_sql.execute_query_df")
-def test_get_hive_balances_params(mock_execute_query_df):
+def test_get_hive_balances_params(mock_execute_query_df, mock_refresh_activity, mock_get_active_accounts):
     """Test fetching hive balances with filters"""
 
     mock_execute_query_df1 = pd.DataFrame(
@@ -277,18 +281,20 @@ def test_get_hive_balances_params(mock_execute_query_df):
 
     mock_execute_query_df2 = pd.DataFrame(
         {
-            "name": ["Alice"],
-            "comment_count": [5],
-            "vesting_shares": [1000000],
-            "reputation": [1000],
-            "delegated_vesting_shares": [0],
-            "received_vesting_shares": [0],
-            "posting_rewards": [10],
-            "curation_rewards": [20],
+            "name": ["Alice", "Carol"],
+            "vesting_shares": [1000000, 2000000],
+            "reputation": [1000, 1000],
+            "delegated_vesting_shares": [0, 0],
+            "received_vesting_shares": [0, 0],
+            "posting_rewards": [10, 10],
+            "curation_rewards": [20, 20],
         }
     )
 
     mock_execute_query_df.side_effect = [mock_execute_query_df1, mock_execute_query_df2]
+    mock_get_active_accounts.return_value = pd.DataFrame(
+        {"name": ["Alice", "Bob"], "comment_count": [5, 7], "post_count": [2, 3], "replies": [1, 1]}
+    )
 
     params = {
         "hp_min": 0,
@@ -303,7 +309,27 @@ def test_get_hive_balances_params(mock_execute_query_df):
     }
 
     result = get_hive_balances_params(params)
-    assert not result.empty
+    assert result["name"].tolist() == ["Alice"]
+    assert result["comment_count"].tolist() == [5]
+    mock_refresh_activity.assert_called_once()
+    mock_get_active_accounts.assert_called_once_with(3, 2, 1)
+    # One Accounts query with the range predicates, the active authors are joined locally
+    assert mock_execute_query_df.call_count == 2
+    assert len(mock_execute_query_df.call_args.args[1]) == 6
+
+
+@patch("src.api.hive_sql.execute_query_df")
+def test_get_activity(mock_execute_query_df):
+    """Test month keys of the aggregated activity and failed queries"""
+    mock_execute_query_df.return_value = pd.DataFrame(
+        {"author": ["alice"], "year": [2025], "month": [3], "comments": [4], "posts": [1], "replies": [2]}
+    )
+    result = get_activity(datetime.datetime(2025, 3, 1), datetime.datetime(2025, 4, 1))
+    assert result.to_dict("records") == [{"author": "alice", "month": "2025-03", "comments": 4, "posts": 1,
+                                          "replies": 2}]
+
+    mock_execute_query_df.return_value = pd.DataFrame()
+    assert get_activity(datetime.datetime(2025, 3, 1), datetime.datetime(2025, 4, 1)) is None
 
 
 @patch("src.api.hive_sql.execute_query_df")
@@ -403,3 +429,33 @@ def test_execute_query_df_no_connection_string():
     # Assertions
     assert isinstance(result_df, pd.DataFrame)
     assert result_df.empty  # Should return an empty Da
+
+
+@pytest.fixture(scope="module")
+def hive_db(tmp_path_factory):
+    return create_database(tmp_path_factory.mktemp("hive"), accounts=200, comments_per_account=5)
+
+
+def test_get_hive_balances_stand_in(hive_db):
+    """Test the balance query and decoding against the offline HiveSQL stand-in"""
+    get_hive_per_mvest.clear()
+    with patch_hive_sql(hive_db):
+        result = get_hive_balances(account_names(3) + ["unknown"])
+        top = get_top_posting_rewards(5, 0)
+    get_hive_per_mvest.clear()
+
+    assert sorted(result["name"]) == account_names(3)
+    assert result["hp"].iloc[0] == pytest.approx(result["vesting_shares"].iloc[0] * HIVE_PER_MVEST / 1e6)
+    assert pd.api.types.is_datetime64_any_dtype(result["created"])
+    assert len(top) == 5 and top["posting_rewards"].is_monotonic_decreasing
+
+
+def test_get_activity_stand_in(hive_db):
+    """Test the monthly activity aggregation against the offline HiveSQL stand-in"""
+    with patch_hive_sql(hive_db):
+        activity = get_activity(datetime.datetime(2025, 1, 1), datetime.datetime(2025, 3, 1))
+        active = get_active_hiver_users(0, 0, 3)
+
+    assert set(activity["month"]) == {"2025-01", "2025-02"}
+    assert (activity["comments"] >= activity["posts"] + activity["replies"]).all()
+    assert not active.empty
@@ -0,0 +1,68 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.api import market_prefetcher
+
+
+@pytest.fixture
+def datasets():
+    funcs = {name: MagicMock(name=name) for name in market_prefetcher.DEFAULT_INTERVALS}
+    for func in funcs.values():
+        func.get_snapshot_age.return_value = 0
+    with patch("src.api.market_prefetcher.get_datasets", return_value=funcs):
+        yield funcs
+
+
+def test_get_prefetch_settings_defaults():
+    with patch("src.api.market_prefetcher.st.secrets") as secrets:
+        secrets.get.side_effect = FileNotFoundError
+        settings = market_prefetcher.get_prefetch_settings()
+
+    assert settings["enabled"] is True
+    assert settings["intervals"] == market_prefetcher.DEFAULT_INTERVALS
+
+
+def test_get_prefetch_settings_override():
+    with patch("src.api.market_prefetcher.st.secrets") as secrets:
+        secrets.get.return_value = {"jitter_seconds": 5, "intervals": {"prices": 30}}
+        settings = market_prefetcher.get_prefetch_settings()
+
+    assert settings["jitter_seconds"] == 5
+    assert settings["intervals"]["prices"] == 30
+    assert settings["intervals"]["card_details"] == market_prefetcher.DEFAULT_INTERVALS["card_details"]
+
+
+def test_next_due_applies_jitter():
+    with patch("src.api.market_prefetcher.time.time", return_value=1000):
+        values = {market_prefetcher.next_due(100, 10) for _ in range(50)}
+    assert all(1090 <= value <= 1110 for value in values)
+    assert len(values) > 1
+
+
+def test_run_refreshes_all_datasets_once_and_stops(datasets):
+    stop_event = threading.Event()
+    status = {name: {} for name in datasets}
+    settings = {"intervals": market_prefetcher.DEFAULT_INTERVALS, "jitter_seconds": 0}
+
+    # Stop the loop as soon as it waits for the next due time
+    stop_event.wait = MagicMock(side_effect=lambda timeout: stop_event.set())
+    market_prefetcher.run(settings, status, stop_event)
+
+    for name, func in datasets.items():
+        func.refresh.assert_called_once_with()
+        assert status[name]["last_refresh"] is not None
+        assert status[name]["next_refresh"] is not None
+
+
+def test_run_continues_when_a_dataset_fails(datasets):
+    datasets["card_details"].refresh.side_effect = RuntimeError("down")
+    stop_event = threading.Event()
+    stop_event.wait = MagicMock(side_effect=lambda timeout: stop_event.set())
+    status = {name: {} for name in datasets}
+
+    market_prefetcher.run({"intervals": market_prefetcher.DEFAULT_INTERVALS, "jitter_seconds": 0}, status,
+                          stop_event)
+
+    datasets["prices"].refresh.assert_called_once_with()
@@ -0,0 +1,203 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from src.api import memory_cache as memory_cache_module
+from src.api.memory_cache import (BudgetCache, estimate_size, memory_cache, parse_ttl, make_key, get_cache_stats,
+                                  LFU, refresh_entry)
+
+
+@pytest.mark.parametrize("ttl, expected", [
+    (None, None),
+    (60, 60.0),
+    ("1h", 3600.0),
+    ("24h", 86400.0),
+    ("1d", 86400.0),
+])
+def test_parse_ttl(ttl, expected):
+    assert parse_ttl(ttl) == expected
+
+
+def test_make_key_handles_unhashable_arguments():
+    key = make_key(("user", ["DEC", "SPS"]), {"query": {"b": 1, "a": 2}})
+    assert hash(key) == hash(make_key(("user", ["DEC", "SPS"]), {"query": {"a": 2, "b": 1}}))
+
+
+def test_estimate_size_dataframe():
+    df = pd.DataFrame({"a": range(100)})
+    assert estimate_size(df) == df.memory_usage(deep=True).sum()
+
+
+def test_budget_cache_evicts_least_recently_used():
+    df = pd.DataFrame({"a": range(100)})
+    size = estimate_size(df)
+    cache = BudgetCache("test", max_bytes=size * 2)
+
+    cache.set("one", df)
+    cache.set("two", df)
+    cache.get("one")  # "one" is now the most recently used
+    cache.set("three", df)
+
+    assert cache.get("two") == (False, None)
+    assert cache.get("one")[0]
+    assert cache.get("three")[0]
+    assert cache.total_bytes == size * 2
+
+
+def test_budget_cache_skips_values_larger_than_budget():
+    cache = BudgetCache("test", max_bytes=10)
+    cache.set("big", pd.DataFrame({"a": range(100)}))
+    assert len(cache) == 0
+    assert cache.total_bytes == 0
+
+
+def test_budget_cache_expires_entries(monkeypatch):
+    cache = BudgetCache("test", ttl=10)
+    monkeypatch.setattr("src.api.memory_cache.time.time", lambda: 1000)
+    cache.set("key", 1)
+    monkeypatch.setattr("src.api.memory_cache.time.time", lambda: 1011)
+    assert cache.get("key") == (False, None)
+
+
+def test_memory_cache_decorator_returns_copies():
+    calls = []
+
+    @memory_cache(ttl="1h")
+    def load(name):
+        calls.append(name)
+        return pd.DataFrame({"name": [name]})
+
+    first = load("alice")
+    first["name"] = "changed"
+    second = load("alice")
+
+    assert calls == ["alice"]
+    assert second.iloc[0]["name"] == "alice"
+
+    load.clear()
+    load("alice")
+    assert calls == ["alice", "alice"]
+
+
+def test_memory_cache_decorator_deep_copies_other_values():
+    @memory_cache(ttl="1h")
+    def load():
+        return {"prices": [{"token": "SPS", "usd": 0.01}]}
+
+    first = load()
+    first["prices"][0]["usd"] = 100
+    first["extra"] = True
+
+    assert load() == {"prices": [{"token": "SPS", "usd": 0.01}]}
+
+
+def test_budget_cache_max_entries_lfu_keeps_frequently_used():
+    cache = BudgetCache("test", max_entries=2, policy=LFU)
+    cache.set("popular", 1)
+    cache.set("rare", 2)
+    cache.get("popular")
+    cache.get("popular")
+    cache.set("new", 3)
+
+    assert cache.get("rare") == (False, None)
+    assert cache.get("popular") == (True, 1)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_budget_cache_lfu_keeps_new_entry_when_all_entries_were_used():
+    cache = BudgetCache("test", max_entries=2, policy=LFU)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.get("b")
+    cache.set("new", 3)
+
+    assert cache.get("new") == (True, 3)
+    assert cache.get("a") == (False, None)
+    assert cache.get("b") == (True, 2)
+
+
+def test_budget_cache_lfu_replaced_entry_keeps_use_count():
+    cache = BudgetCache("test", max_entries=2, policy=LFU)
+    cache.set("hot", 1)
+    cache.set("cold", 2)
+    cache.get("hot")
+    cache.get("hot")
+    cache.set("hot", 10)
+    cache.set("new", 3)
+
+    assert cache.get("hot") == (True, 10)
+    assert cache.get("cold") == (False, None)
+
+
+def test_budget_cache_counters():
+    cache = BudgetCache("test", max_entries=10)
+    cache.get("missing")
+    cache.set("key", "value")
+    cache.get("key")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["entries"] == 1
+
+
+def test_budget_cache_unknown_policy():
+    with pytest.raises(ValueError, match="Unknown eviction policy"):
+        BudgetCache("test", policy="fifo")
+
+
+def test_get_cache_stats_and_clear_all():
+    @memory_cache(ttl="1h", max_entries=5)
+    def square(x):
+        return x * x
+
+    memory_cache_module.clear_all()
+    square(2)
+    square(2)
+
+    stats = get_cache_stats()
+    row = stats[stats["function"].str.endswith("square")].iloc[0]
+    assert row["hits"] >= 1
+    assert row["max_entries"] == 5
+
+    memory_cache_module.clear_all()
+    assert len(square.get_cache()) == 0
+
+
+def test_stale_while_revalidate_serves_snapshot_and_refreshes(monkeypatch):
+    now = [1000]
+    monkeypatch.setattr("src.api.memory_cache.time.time", lambda: now[0])
+    versions = iter(["v1", "v2"])
+
+    @memory_cache(ttl=10, stale_while_revalidate=True)
+    def market():
+        return pd.DataFrame({"version": [next(versions)]})
+
+    market.clear()
+    assert market().iloc[0]["version"] == "v1"
+    assert market.get_snapshot_age() == 0
+
+    now[0] = 1020
+    # Expired: the stale snapshot is returned immediately and refreshed in the background
+    assert market().iloc[0]["version"] == "v1"
+    assert market.get_snapshot_age() in (0, 20)  # 0 when the background refresh already finished
+
+    for thread in threading.enumerate():
+        if thread.name.startswith("refresh-"):
+            thread.join(5)
+    assert market().iloc[0]["version"] == "v2"
+    assert market.get_cache().stats()["stale_hits"] == 1
+
+
+def test_stale_while_revalidate_keeps_snapshot_on_failed_refresh():
+    cache = BudgetCache("test", ttl=10)
+    cache.set("key", pd.DataFrame({"a": [1]}))
+    cache.start_refresh("key")
+
+    refresh_entry(cache, "key", lambda: pd.DataFrame(), (), {})
+
+    assert not cache.get("key")[1].empty
+    assert cache.start_refresh("key")  # refresh flag was released
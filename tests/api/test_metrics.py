@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+import streamlit as st
+
+from src.api import metrics, spl, hive_engine
+from src.api.logRetry import get_request_url
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    st.cache_resource.clear()
+    yield
+
+
+def test_endpoint_from_url():
+    assert metrics.endpoint_from_url("https://api2.splinterlands.com/cards/collection/player1?x=1") \
+           == "api2.splinterlands.com/cards/collection"
+    assert metrics.endpoint_from_url("https://prices.splinterlands.com/prices") == "prices.splinterlands.com/prices"
+
+
+def test_get_request_url():
+    pool = MagicMock(scheme="https", host="api2.splinterlands.com", port=443)
+    assert get_request_url("/players/balances", pool) == "https://api2.splinterlands.com/players/balances"
+    pool.port = 8080
+    assert get_request_url("/prices", pool) == "https://api2.splinterlands.com:8080/prices"
+    assert get_request_url("/prices", None) == "/prices"
+
+
+def test_track_records_calls_errors_and_bytes():
+    with metrics.track("endpoint") as call:
+        call.bytes = 100
+    with pytest.raises(ValueError):
+        with metrics.track("endpoint"):
+            raise ValueError("failed")
+    with metrics.track("endpoint") as call:
+        call.error = True
+
+    stats = metrics.get_stats().iloc[0]
+    assert (stats["calls"], stats["errors"], stats["bytes"]) == (3, 2, 100)
+    assert sum(metrics.get_registry()["endpoints"]["endpoint"].buckets) == 3
+
+
+def test_request_api_data_is_tracked():
+    response = MagicMock(content=b'[{"a": 1}]')
+    response.json.return_value = [{"a": 1}]
+    with patch("src.api.spl.http.get", side_effect=[response, requests.exceptions.ConnectionError("down")]):
+        spl.request_api_data("https://api2.splinterlands.com/players/balances")
+        spl.request_api_data("https://api2.splinterlands.com/players/balances")
+
+    stats = metrics.get_stats().set_index("endpoint").loc["api2.splinterlands.com/players/balances"]
+    assert (stats["calls"], stats["errors"], stats["bytes"]) == (2, 1, 10)
+
+
+def test_retry_api_call_records_retries_and_failovers():
+    call_func = MagicMock(side_effect=[RuntimeError("node down")] * 3 + ["result"])
+    with patch("src.api.hive_engine.hive_engine_nodes", ["node1", "node2"]), \
+         patch("src.api.hive_engine.get_cached_preferred_node", return_value={"preferred_node": "node1"}), \
+         patch("src.api.hive_engine.set_preferred_node"), \
+         patch("src.api.hive_engine.sleep"), \
+         patch("src.api.hive_engine.Api"):
+        assert hive_engine.retry_api_call(call_func, "tokens", "balances", {}) == "result"
+
+    stats = metrics.get_stats().iloc[0]
+    assert stats["endpoint"] == "hive-engine/tokens/balances"
+    assert (stats["calls"], stats["errors"], stats["retries"], stats["failovers"]) == (1, 0, 3, 1)
+
+
+def test_to_prometheus():
+    metrics.update("endpoint", lambda endpoint_metrics: endpoint_metrics.observe(0.2, False, 50))
+    metrics.record_retry("endpoint")
+
+    text = metrics.to_prometheus()
+
+    assert "# TYPE beebalance_api_latency_seconds histogram" in text
+    assert 'beebalance_api_calls_total{endpoint="endpoint"} 1' in text
+    assert 'beebalance_api_retries_total{endpoint="endpoint"} 1' in text
+    assert 'beebalance_api_latency_seconds_bucket{endpoint="endpoint",le="0.1"} 0' in text
+    assert 'beebalance_api_latency_seconds_bucket{endpoint="endpoint",le="0.25"} 1' in text
+    assert 'beebalance_api_latency_seconds_bucket{endpoint="endpoint",le="+Inf"} 1' in text
+    assert metrics.escape_label('a"b') == 'a\\"b'
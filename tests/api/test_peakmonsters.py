@@ -4,12 +4,14 @@ import pandas as pd
 import pytest
 import requests
 
+from src.api import memory_cache
 from src.api.peakmonsters import get_market_prices_df
 
 
 @pytest.fixture
 def mock_http_get():
     """Fixture to mock HTTP GET requests."""
+    memory_cache.clear_all()
     with patch("src.api.peakmonsters.http.get") as mock_get:
         yield mock_get
 
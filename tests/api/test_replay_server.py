@@ -0,0 +1,55 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.api import memory_cache, spl, hive_engine, peakmonsters
+from tests.stand_ins.http_server import ReplayServer, patch_endpoints, recording_key
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    memory_cache.clear_all()
+    yield
+    memory_cache.clear_all()
+
+
+def test_spl_requests_are_retried_after_rate_limit():
+    with ReplayServer(fail_first=1) as server, patch_endpoints(server):
+        balances = spl.get_balances("alice", filter_tokens=["SPS", "DEC"])
+        collection = spl.get_player_collection_df("alice")
+
+    assert balances["token"].tolist() == ["SPS", "DEC"]
+    assert len(collection) == 200
+    assert server.stats["rate_limited"] == 2
+    assert server.stats["requests"] == 4
+
+
+def test_hive_engine_and_peakmonsters_responses():
+    with ReplayServer() as server, patch_endpoints(server):
+        balances = hive_engine.get_account_balances("alice")
+        market = hive_engine.get_market_with_retry("DEC")
+        prices = peakmonsters.get_market_prices_df()
+
+    assert set(balances["account"]) == {"alice"}
+    assert market["symbol"] == "DEC"
+    assert {"card_detail_id", "gold", "edition", "last_bcx_price"} <= set(prices.columns)
+
+
+def test_latency_and_concurrency_are_measured():
+    names = [f"account{i}" for i in range(8)]
+    with ReplayServer(latency=0.2) as server, patch_endpoints(server):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(spl.get_balances, names))
+
+    assert [df["player"].iloc[0] for df in results] == names
+    assert server.stats["max_in_flight"] > 1
+
+
+def test_recordings_replace_synthetic_responses(tmp_path):
+    path = "/prices/prices"
+    recording = {"method": "GET", "path": path, "status": 200, "body": {"hive": 0.5, "dec": 0.002}}
+    (tmp_path / f"{recording_key('GET', path)}.json").write_text(json.dumps(recording))
+
+    with ReplayServer(recordings_dir=str(tmp_path)) as server, patch_endpoints(server):
+        assert spl.get_prices() == {"hive": 0.5, "dec": 0.002}
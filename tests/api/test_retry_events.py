@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+
+import pytest
+import streamlit as st
+
+from src.api import memory_cache, metrics, retry_events, spl
+from tests.stand_ins.http_server import ReplayServer, patch_endpoints
+
+
+@pytest.fixture(autouse=True)
+def clear_state():
+    st.cache_resource.clear()
+    memory_cache.clear_all()
+    yield
+    st.cache_resource.clear()
+    memory_cache.clear_all()
+
+
+def test_publish_counts_per_host():
+    url = "https://api.example.com/players/balances?username=alice"
+    retry_events.publish(retry_events.RetryEvent(retry_events.RETRY, url, 1, status=429, backoff=0.0))
+    retry_events.publish(retry_events.RetryEvent(retry_events.BACKOFF, url, 1, backoff=0.5))
+    retry_events.publish(retry_events.RetryEvent(retry_events.RETRY, url, 2, error=ConnectionError("reset")))
+    retry_events.publish(retry_events.RetryEvent(retry_events.BACKOFF, url, 2, backoff=1.0))
+
+    stats = retry_events.get_stats().iloc[0]
+
+    assert stats["host"] == "api.example.com"
+    assert (stats["retries"], stats["connection errors"], stats["backoff (s)"]) == (2, 1, 1.5)
+    assert stats["status codes"] == "429: 1"
+    assert metrics.get_stats().set_index("endpoint").loc["api.example.com/players/balances", "retries"] == 2
+
+
+def test_subscribers_are_called_and_isolated():
+    received = []
+    retry_events.subscribe("failing", MagicMock(side_effect=RuntimeError("broken")))
+    retry_events.subscribe("collect", received.append)
+    retry_events.subscribe("collect", lambda event: received.append(event.attempt))
+
+    retry_events.publish(retry_events.RetryEvent(retry_events.RETRY, "https://host/path", 3))
+    retry_events.unsubscribe("collect")
+    retry_events.publish(retry_events.RetryEvent(retry_events.RETRY, "https://host/path", 4))
+
+    assert received == [3]
+
+
+def test_log_retry_publishes_real_backoff_from_worker_threads():
+    events = []
+    retry_events.subscribe("collect", events.append)
+    with ReplayServer(fail_first=1) as server, patch_endpoints(server):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(spl.get_balances, ["alice", "bob"]))
+
+    retries = [event for event in events if event.kind == retry_events.RETRY]
+    backoffs = [event for event in events if event.kind == retry_events.BACKOFF]
+    # fail_first counts per path, only the first of the two requests is rate limited
+    assert len(retries) == len(backoffs) == 1
+    # Retry-After: 0 is not a wait, the first retry has no backoff in urllib3
+    assert (retries[0].status, retries[0].attempt, retries[0].backoff) == (429, 1, 0)
+    assert retries[0].host == backoffs[0].host == server.url.split("//")[1]
+    assert backoffs[0].backoff < 0.1
+    assert retry_events.get_stats().iloc[0]["status codes"] == "429: 1"
+
+
+def test_show_toast_only_on_script_threads():
+    event = retry_events.RetryEvent(retry_events.RETRY, "https://host/path", 1, status=503, backoff=2.0)
+    with patch("src.api.retry_events.st.toast") as mock_toast:
+        with patch("src.api.retry_events.get_script_run_ctx", return_value=None):
+            retry_events.show_toast(event)
+        mock_toast.assert_not_called()
+
+        with patch("src.api.retry_events.get_script_run_ctx", return_value=MagicMock()):
+            retry_events.show_toast(event)
+        mock_toast.assert_called_once()
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+import streamlit as st
+
+from src.api import singleflight
+
+
+@pytest.fixture(autouse=True)
+def clear_in_flight():
+    st.cache_resource.clear()
+    yield
+
+
+def test_do_single_caller():
+    assert singleflight.do("key", lambda: 42) == (42, False)
+    assert singleflight.get_in_flight_calls()["calls"] == {}
+
+
+def test_do_coalesces_concurrent_callers():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_request():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+
+    def caller():
+        results.append(singleflight.do("same", slow_request))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait(5)
+
+    followers = [threading.Thread(target=caller) for _ in range(5)]
+    for follower in followers:
+        follower.start()
+
+    # Wait until all followers joined the in-flight call before releasing the leader
+    call = singleflight.get_in_flight_calls()["calls"]["same"]
+    for _ in range(500):
+        if call.followers == 5:
+            break
+        threading.Event().wait(0.01)
+    release.set()
+
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("result", False)] + [("result", True)] * 5
+
+
+def test_do_shares_errors_and_cleans_up():
+    with pytest.raises(ValueError, match="boom"):
+        singleflight.do("failing", lambda: (_ for _ in ()).throw(ValueError("boom")))
+
+    assert "failing" not in singleflight.get_in_flight_calls()["calls"]
+    assert singleflight.do("failing", lambda: "ok") == ("ok", False)
+
+
+def test_make_key_is_order_independent_for_params():
+    assert (singleflight.make_key("url", {"a": 1, "b": 2}) == singleflight.make_key("url", {"b": 2, "a": 1}))
+    assert singleflight.make_key("url", {"a": 1}) != singleflight.make_key("url", {"a": 2})
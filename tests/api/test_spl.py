@@ -3,6 +3,7 @@ import requests
 import requests_mock
 import streamlit as st
 
+from src.api import memory_cache
 from src.api.spl import (
     fetch_api_data,
     get_player_collection_df,
@@ -23,6 +24,7 @@ def mock_session():
     """Fixture to mock HTTP requests."""
     with requests_mock.Mocker() as m:
         st.cache_data.clear()
+        memory_cache.clear_all()
         yield m
 
 
@@ -92,6 +94,11 @@ def test_get_player_collection_df(mock_session):
     assert not df.empty
     assert df.iloc[0]["player"] == "testuser"
     assert df.iloc[0]["card_detail_id"] == 10
+    assert df["player"].dtype == "category"
+    assert df["edition"].dtype == "int8"
+    assert df["level"].dtype == "int8"
+    assert df["card_detail_id"].dtype == "int16"
+    assert df["gold"].dtype == "bool"
 
 
 def test_get_card_details(mock_session):
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+from src.graphs import ke_hp_graph, spsp_graph, graph_util
+from src.graphs.decimation import lttb_indices, grid_thin_indices, top_n_with_others, reduce_points, LTTB, GRID, \
+    TOP_N, DEFAULT_POINT_BUDGET
+
+
+def test_lttb_keeps_first_last_and_peak():
+    x = np.arange(10_000, dtype=float)
+    y = np.zeros(10_000)
+    y[4321] = 100.0
+
+    indices = lttb_indices(x, y, 100)
+
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 9_999
+    assert 4321 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_below_threshold_returns_all():
+    assert lttb_indices(np.arange(5.0), np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_grid_thinning_keeps_outliers_within_budget():
+    rng = np.random.default_rng(1)
+    x = np.concatenate([rng.normal(0, 0.01, 50_000), [10.0]])
+    y = np.concatenate([rng.normal(0, 0.01, 50_000), [10.0]])
+
+    indices = grid_thin_indices(x, y, 1_000)
+
+    assert 0 < len(indices) <= 1_000
+    assert 50_000 in indices  # the outlier survives
+
+
+def test_top_n_with_others_sums_remaining_rows():
+    df = pd.DataFrame({"name": [f"acc{i}" for i in range(10)], "hp": range(10), "hover_text": "x"})
+
+    result = top_n_with_others(df, "name", "hp", 4)
+
+    assert len(result) == 4
+    assert result["name"].tolist()[:3] == ["acc7", "acc8", "acc9"]
+    assert result["name"].iloc[-1] == "others (7)"
+    assert result["hp"].iloc[-1] == sum(range(7))
+    assert result["hp"].sum() == df["hp"].sum()
+
+
+def test_top_n_with_others_keeps_caller_order():
+    df = pd.DataFrame({"name": [f"acc{i}" for i in range(10)], "hp": [5, 90, 1, 70, 3, 80, 2, 60, 4, 0]})
+    df = df.sort_values(by="hp", ascending=False)
+
+    result = top_n_with_others(df, "name", "hp", 4)
+
+    assert result["name"].tolist() == ["acc1", "acc5", "acc3", "others (7)"]
+
+
+def test_reduce_points_selects_method_per_plot_type():
+    df = pd.DataFrame({"name": [f"acc{i}" for i in range(2_000)], "x": np.arange(2_000), "y": np.arange(2_000)})
+
+    assert reduce_points(df, "x", "y", "Line", 5_000) == (df, None)
+    line, method = reduce_points(df, "x", "y", "Line", 500)
+    assert method == LTTB and len(line) == 500
+    scatter, method = reduce_points(df, "x", "y", "Scatter", 500)
+    assert method == GRID and len(scatter) <= 500
+    bar, method = reduce_points(df, "name", "y", "Bar", 500)
+    assert method == TOP_N and len(bar) == 500
+
+
+def test_top_holder_graphs_stay_within_point_budget():
+    n = DEFAULT_POINT_BUDGET * 2
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({
+        "name": [f"account{i}" for i in range(n)],
+        "hp": rng.lognormal(5, 2, n),
+        "ke_ratio": rng.lognormal(0, 1, n),
+        "curation_rewards": rng.lognormal(3, 1, n),
+        "posting_rewards": rng.lognormal(3, 1, n),
+        "SPSP": rng.lognormal(4, 2, n),
+    })
+
+    ke_hp_figure = ke_hp_graph.create_figure(df, log_x=True, log_y=True, webgl=True)
+    spsp_figure = spsp_graph.create_figure(df, log_y=True)
+
+    assert all(len(trace.x) <= DEFAULT_POINT_BUDGET for trace in ke_hp_figure.data)
+    assert len(spsp_figure.data[0].x) == DEFAULT_POINT_BUDGET
+    bars = list(spsp_figure.data[0].y[:-1])
+    assert bars == sorted(bars, reverse=True)
+
+    # The reduction is noted with the figure, also after the JSON round trip of the figure cache
+    notes = graph_util.get_reduction_notes(pio.from_json(ke_hp_figure.to_json()))
+    assert [note.split(":")[0] for note in notes] == ["ke_ratio", "total_rewards", "hp"]
+    assert graph_util.get_reduction_notes(spsp_figure) == [f"SPSP: {DEFAULT_POINT_BUDGET:,} of {n:,} points ({TOP_N})"]
@@ -0,0 +1,69 @@
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.api import memory_cache
+from src.graphs.graph_util import build_hover_text, get_webgl_setting, scatter_trace, WEBGL_POINT_THRESHOLD, \
+    fingerprint, get_figure
+
+
+def test_build_hover_text_formats_all_rows():
+    df = pd.DataFrame({"name": ["alice", "bob"], "hp": [1234.567, 1.0], "rank": [0, 1]})
+
+    text = build_hover_text(df, [("Name", "name", None), ("HP", "hp", "%.2f"), ("Rank", "rank", None)])
+
+    assert text.tolist() == [
+        "Name: alice<br>HP: 1234.57<br>Rank: 0",
+        "Name: bob<br>HP: 1.00<br>Rank: 1",
+    ]
+
+
+def test_build_hover_text_with_series_and_separator():
+    df = pd.DataFrame({"a": [1.0, 2.0], "b": [0.5, np.nan]}, index=[10, 20])
+
+    text = build_hover_text(df, [("A", "a", "%.1f"), ("Sum", df["a"] + df["b"], "%.2f")], separator=", ")
+
+    assert text.loc[10] == "A: 1.0, Sum: 1.50"
+    assert text.loc[20] == "A: 2.0, Sum: nan"
+
+
+def test_build_hover_text_empty_dataframe():
+    df = pd.DataFrame({"name": pd.Series(dtype=str)})
+    assert build_hover_text(df, [("Name", "name", None)]).empty
+
+
+def test_scatter_trace_selects_webgl():
+    assert scatter_trace(True) is go.Scattergl
+    assert scatter_trace(False) is go.Scatter
+
+
+def test_get_webgl_setting_defaults_on_point_count():
+    with patch("src.graphs.graph_util.st.checkbox", side_effect=lambda label, value, key: value) as checkbox:
+        assert get_webgl_setting(WEBGL_POINT_THRESHOLD, widget_suffix="test") is True
+        assert get_webgl_setting(WEBGL_POINT_THRESHOLD - 1, widget_suffix="test") is False
+    assert checkbox.call_args.kwargs["key"] == "webgl_test"
+
+
+def test_fingerprint_changes_with_content_only():
+    df = pd.DataFrame({"name": ["alice", "bob"], "hp": [1.0, 2.0]})
+
+    assert fingerprint(df) == fingerprint(df.copy())
+    assert fingerprint(df) != fingerprint(df.assign(hp=[1.0, 3.0]))
+    assert fingerprint(df) != fingerprint(df.rename(columns={"hp": "HP"}))
+    assert fingerprint(pd.DataFrame({"tags": [["a"], ["b"]]})) != fingerprint(pd.DataFrame({"tags": [["a"], ["c"]]}))
+
+
+def test_get_figure_reuses_cached_figure_for_same_data_and_settings():
+    memory_cache.clear_all()
+    df = pd.DataFrame({"x": [1, 2, 3], "y": [3, 2, 1]})
+    create_figure = MagicMock(side_effect=lambda data, log_y: go.Figure(go.Bar(x=data["x"], y=data["y"])))
+
+    first = get_figure("test", df, {"log_y": True}, create_figure)
+    second = get_figure("test", df.copy(), {"log_y": True}, create_figure)
+    get_figure("test", df, {"log_y": False}, create_figure)
+
+    assert create_figure.call_count == 2
+    assert first.to_json() == second.to_json()
+    assert list(second.data[0].y) == [3, 2, 1]
@@ -0,0 +1,69 @@
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+import streamlit as st
+
+from src.pages.custom_queries_subpages.query_cache import covers, widen, filter_result, get_result
+
+params = {
+    "hp_min": 100,
+    "hp_max": 5000,
+    "reputation_min": 25,
+    "reputation_max": 75,
+    "posting_rewards_min": 500,
+    "posting_rewards_max": 100000,
+    "months": 6,
+    "posts": 1,
+    "comments": 5
+}
+
+result = pd.DataFrame({
+    "name": ["alice", "bob", "carol"],
+    "hp": [200.0, 4000.0, 150.0],
+    "reputation": [1e12, 1e13, 1e11],
+    "reputation_score": [52.0, 61.0, 43.0],
+    "posting_rewards": [1.0, 50.0, 2.0],
+    "post_count": [2, 10, 3],
+    "comment_count": [6, 50, 20],
+})
+
+
+@pytest.fixture(autouse=True)
+def mock_session_state(monkeypatch):
+    monkeypatch.setattr(st, "session_state", {})
+
+
+def test_covers_narrower_bounds_only():
+    assert covers(params, {**params, "hp_min": 1000, "comments": 10})
+    assert not covers(params, {**params, "hp_max": 10000})
+    assert not covers(params, {**params, "posts": 0})
+    assert not covers(params, {**params, "months": 3})
+    assert not covers(None, params)
+
+
+def test_widen_combines_bounds():
+    widened = widen(params, {**params, "hp_min": 1000, "hp_max": 10000, "comments": 2})
+
+    assert (widened["hp_min"], widened["hp_max"], widened["comments"]) == (100, 10000, 2)
+    assert widen(params, {**params, "months": 3}) == {**params, "months": 3}
+
+
+def test_filter_result_matches_remote_bounds():
+    assert filter_result(result, params)["name"].tolist() == ["alice", "bob", "carol"]
+    assert filter_result(result, {**params, "hp_max": 1000, "comments": 10})["name"].tolist() == ["carol"]
+    assert filter_result(result, {**params, "posting_rewards_min": 1500})["name"].tolist() == ["bob", "carol"]
+    assert filter_result(result, {**params, "reputation_min": 50})["name"].tolist() == ["alice", "bob"]
+
+
+def test_get_result_fetches_only_when_bounds_widen():
+    fetch = MagicMock(return_value=result)
+
+    get_result(params, fetch)
+    narrowed = get_result({**params, "hp_min": 1000}, fetch)
+    assert fetch.call_count == 1
+    assert narrowed["name"].tolist() == ["bob"]
+
+    get_result({**params, "hp_max": 10000}, fetch)
+    assert fetch.call_count == 2
+    fetch.assert_called_with({**params, "hp_max": 10000})
@@ -46,5 +46,7 @@ def test_add_section(mock_streamlit):
             - Posting Rewards - Between  {params["posting_rewards_min"]} and {params["posting_rewards_max"]}
             - Have made more than {params["posts"]} posts in the last {params["months"]} months
             - Have been active in the last {params["months"]} months with minimal {params["comments"]} comments
+
+            Activity is counted per calendar month, the current month plus the {params["months"]} months before it.
         """
     st.markdown.assert_called_once_with(expected_markdown)
@@ -0,0 +1,307 @@
+"""
+Offline stand-in for HiveSQL (MS SQL Server via pypyodbc) and HAFSQL (Postgres via psycopg2).
+
+Synthetic accounts, comments, DynamicGlobalProperties, hafsql.balances_history and hafsql.haf_blocks tables
+are generated in local SQLite files. The connection stand-ins translate the dialect differences used by
+src.api.hive_sql and src.api.hafsql, so the real query, fetch and decode code runs without the network:
+
+    path = create_database(tmp_path, accounts=100_000, comments_per_account=20)
+    with patch_hive_sql(path), patch_hafsql(path):
+        hive_sql.get_hive_balances(account_names(100))
+"""
+import datetime
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import numpy as np
+
+BATCH_SIZE = 100_000
+START = datetime.datetime(2024, 1, 1)
+NOW = datetime.datetime(2025, 6, 15, 12, 0, 0)
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+HIVE_DB = "hive.sqlite"
+HAF_DB = "haf.sqlite"
+
+HIVE_SCHEMA = """
+CREATE TABLE accounts (
+    name TEXT PRIMARY KEY,
+    created TIMESTAMP,
+    balance REAL,
+    savings_balance REAL,
+    hbd_balance REAL,
+    savings_hbd_balance REAL,
+    reputation INTEGER,
+    vesting_shares REAL,
+    delegated_vesting_shares REAL,
+    received_vesting_shares REAL,
+    curation_rewards INTEGER,
+    posting_rewards INTEGER
+);
+CREATE TABLE comments (
+    author TEXT,
+    permlink TEXT,
+    parent_author TEXT,
+    parent_permlink TEXT,
+    created TIMESTAMP,
+    depth INTEGER
+);
+CREATE INDEX comments_created ON comments (created);
+CREATE INDEX comments_author ON comments (author);
+CREATE TABLE DynamicGlobalProperties (
+    total_vesting_fund_hive REAL,
+    total_vesting_shares REAL
+);
+"""
+
+HAF_SCHEMA = """
+CREATE TABLE balances_history (
+    account_name TEXT,
+    block_num INTEGER,
+    hive REAL,
+    hbd REAL,
+    vests REAL,
+    hp_equivalent REAL,
+    hive_savings REAL,
+    hbd_savings REAL
+);
+CREATE INDEX balances_history_account ON balances_history (account_name);
+CREATE TABLE haf_blocks (
+    block_num INTEGER PRIMARY KEY,
+    timestamp TIMESTAMP
+);
+"""
+
+HIVE_PER_MVEST = 600.0
+SECONDS_PER_BLOCK = 3
+
+
+def account_names(count):
+    return [f"account{i}" for i in range(count)]
+
+
+def to_timestamps(start, seconds):
+    moments = np.datetime64(start, "s") + seconds.astype("timedelta64[s]")
+    return np.char.replace(np.datetime_as_string(moments), "T", " ")
+
+
+def random_timestamps(rng, count, start=START, end=NOW):
+    return to_timestamps(start, rng.integers(0, int((end - start).total_seconds()), count))
+
+
+def insert(connection, table, columns, count):
+    """Insert count rows of generated columns (dict of name -> array) in batches."""
+    placeholders = ", ".join(["?"] * len(columns))
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    for start in range(0, count, BATCH_SIZE):
+        stop = min(start + BATCH_SIZE, count)
+        rows = zip(*[values[start:stop].tolist() for values in columns.values()])
+        connection.executemany(query, rows)
+
+
+def add_accounts(connection, rng, accounts):
+    names = np.array(account_names(accounts))
+    vesting_shares = rng.lognormal(15, 3, accounts)
+    insert(connection, "accounts", {
+        "name": names,
+        "created": random_timestamps(rng, accounts, START - datetime.timedelta(days=3000), START),
+        "balance": rng.lognormal(3, 2, accounts),
+        "savings_balance": rng.lognormal(1, 2, accounts),
+        "hbd_balance": rng.lognormal(2, 2, accounts),
+        "savings_hbd_balance": rng.lognormal(1, 2, accounts),
+        "reputation": rng.lognormal(25, 3, accounts).astype(np.int64),
+        "vesting_shares": vesting_shares,
+        "delegated_vesting_shares": vesting_shares * rng.uniform(0, 0.3, accounts),
+        "received_vesting_shares": rng.lognormal(10, 3, accounts),
+        "curation_rewards": rng.lognormal(8, 3, accounts).astype(np.int64),
+        "posting_rewards": rng.lognormal(9, 3, accounts).astype(np.int64),
+    }, accounts)
+    total_vesting_shares = 4e17
+    connection.execute("INSERT INTO DynamicGlobalProperties VALUES (?, ?)",
+                       (HIVE_PER_MVEST * total_vesting_shares / 1e6, total_vesting_shares))
+    return names
+
+
+def add_comments(connection, rng, names, count):
+    authors = names[rng.integers(0, len(names), count)]
+    # A third are posts, the others reply to a random account (sometimes themselves)
+    parents = np.where(rng.random(count) < 1 / 3, "", names[rng.integers(0, len(names), count)])
+    insert(connection, "comments", {
+        "author": authors,
+        "permlink": np.char.add("post-", np.arange(count).astype(str)),
+        "parent_author": parents,
+        "parent_permlink": np.char.add("post-", rng.integers(0, max(count, 1), count).astype(str)),
+        "created": random_timestamps(rng, count),
+        "depth": np.where(parents == "", 0, 1),
+    }, count)
+
+
+def add_balance_history(connection, rng, names, count):
+    blocks = max(count // 4, 1)
+    block_nums = np.arange(1, blocks + 1)
+    # Blocks are spread over the whole period, so the history covers several months
+    seconds_per_block = max(int((NOW - START).total_seconds()) // blocks, SECONDS_PER_BLOCK)
+    insert(connection, "haf_blocks", {
+        "block_num": block_nums,
+        "timestamp": to_timestamps(START, block_nums * seconds_per_block),
+    }, blocks)
+    vests = rng.lognormal(15, 3, count)
+    insert(connection, "balances_history", {
+        "account_name": names[rng.integers(0, len(names), count)],
+        "block_num": rng.integers(1, blocks + 1, count),
+        "hive": rng.lognormal(3, 2, count),
+        "hbd": rng.lognormal(2, 2, count),
+        "vests": vests,
+        "hp_equivalent": vests * HIVE_PER_MVEST / 1e6,
+        "hive_savings": rng.lognormal(1, 2, count),
+        "hbd_savings": rng.lognormal(1, 2, count),
+    }, count)
+
+
+def create_database(directory, accounts=1000, comments_per_account=10, history_per_account=20, seed=0):
+    """
+    Generate the synthetic HiveSQL and HAFSQL databases in directory (row counts up to millions are fine,
+    rows are generated with numpy and inserted in batches).
+
+    :return: the directory, pass it to patch_hive_sql and patch_hafsql.
+    """
+    directory = str(directory)
+    rng = np.random.default_rng(seed)
+    with sqlite3.connect(os.path.join(directory, HIVE_DB)) as connection:
+        connection.executescript(HIVE_SCHEMA)
+        names = add_accounts(connection, rng, accounts)
+        add_comments(connection, rng, names, accounts * comments_per_account)
+    with sqlite3.connect(os.path.join(directory, HAF_DB)) as connection:
+        connection.executescript(HAF_SCHEMA)
+        add_balance_history(connection, rng, names, accounts * history_per_account)
+    return directory
+
+
+def date_add(part, number, date):
+    moment = datetime.datetime.strptime(date[:19], TIMESTAMP_FORMAT)
+    if part.upper() == "MONTH":
+        month_index = moment.year * 12 + moment.month - 1 + int(number)
+        moment = moment.replace(year=month_index // 12, month=month_index % 12 + 1, day=min(moment.day, 28))
+    else:
+        moment += datetime.timedelta(days=int(number))
+    return moment.strftime(TIMESTAMP_FORMAT)
+
+
+def date_trunc(part, date):
+    if part != "month":
+        raise ValueError(f"date_trunc({part}) is not supported by the stand-in")
+    return date[:7] + "-01 00:00:00"
+
+
+def parse_timestamp(value):
+    return datetime.datetime.strptime(value.decode()[:19], TIMESTAMP_FORMAT)
+
+
+def connect(directory, now=NOW):
+    # Columns declared as TIMESTAMP are returned as datetime, like pypyodbc and psycopg2 do
+    sqlite3.register_converter("TIMESTAMP", parse_timestamp)
+    connection = sqlite3.connect(os.path.join(directory, HIVE_DB), detect_types=sqlite3.PARSE_DECLTYPES,
+                                 check_same_thread=False)
+    connection.execute("ATTACH DATABASE ? AS hafsql", (os.path.join(directory, HAF_DB),))
+    connection.create_function("GETDATE", 0, lambda: now.strftime(TIMESTAMP_FORMAT), deterministic=True)
+    connection.create_function("DATEADD", 3, date_add, deterministic=True)
+    connection.create_function("YEAR", 1, lambda date: int(date[:4]), deterministic=True)
+    connection.create_function("MONTH", 1, lambda date: int(date[5:7]), deterministic=True)
+    connection.create_function("date_trunc", 2, date_trunc, deterministic=True)
+    return connection
+
+
+def to_parameter(value):
+    if isinstance(value, datetime.datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def translate_tsql(query):
+    """T-SQL constructs used by hive_sql to SQLite: TOP n -> LIMIT n, DATEADD(MONTH, ...) -> DATEADD('MONTH', ...)."""
+    query = re.sub(r"DATEADD\(\s*(\w+)\s*,", r"DATEADD('\1',", query, flags=re.IGNORECASE)
+    top = re.search(r"SELECT\s+TOP\s+(\d+)\s", query, flags=re.IGNORECASE)
+    if top:
+        query = query[:top.start()] + "SELECT " + query[top.end():].rstrip().rstrip(";") + f" LIMIT {top.group(1)}"
+    return query
+
+
+def translate_postgres(query):
+    """psycopg2 %s placeholders to SQLite ? placeholders."""
+    return query.replace("%s", "?")
+
+
+class Cursor:
+    """DB-API cursor (pypyodbc and psycopg2 style) that translates the query dialect."""
+
+    def __init__(self, connection, translate):
+        self.cursor = connection.cursor()
+        self.translate = translate
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    def execute(self, query, params=()):
+        self.cursor.execute(self.translate(query), [to_parameter(value) for value in params])
+        return self
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        self.cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class Connection:
+    def __init__(self, directory, translate):
+        self.connection = connect(directory)
+        self.translate = translate
+
+    def cursor(self):
+        return Cursor(self.connection, self.translate)
+
+    def close(self):
+        self.connection.close()
+
+
+class ConnectionPool:
+    """psycopg2.pool.SimpleConnectionPool stand-in."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def getconn(self):
+        return Connection(self.directory, translate_postgres)
+
+    def putconn(self, connection):
+        connection.close()
+
+    def closeall(self):
+        pass
+
+
+@contextmanager
+def patch_hive_sql(directory):
+    """Run src.api.hive_sql against the stand-in database."""
+    with patch("src.api.hive_sql.get_cached_connection_string", return_value=directory), \
+         patch("src.api.hive_sql.pypyodbc.connect", side_effect=lambda conn_str: Connection(conn_str, translate_tsql)):
+        yield
+
+
+@contextmanager
+def patch_hafsql(directory):
+    """Run src.api.hafsql against the stand-in database."""
+    with patch("src.api.hafsql._db_pool", ConnectionPool(directory)):
+        yield
@@ -0,0 +1,294 @@
+"""
+Local record/replay HTTP server standing in for the Splinterlands, Hive Engine and Peakmonsters APIs.
+
+Responses come from recordings (JSON files captured with record) or are generated synthetically per account,
+with configurable latency, 429 and error injection, so request concurrency and retry behaviour can be measured
+without the network:
+
+    with ReplayServer(latency=0.05, rate_limit_rate=0.1) as server, patch_endpoints(server):
+        spl.get_balances("account1")
+    print(server.stats)
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+
+TOKENS = ["SPS", "SPSP", "DEC", "DEC-B", "LICENSE", "ACTIVATED_LICENSE", "PLOT", "TRACT", "REGION", "VOUCHER",
+          "CREDITS"]
+HE_TOKENS = ["SPS", "DEC", "SWAP.HIVE", "BEE", "LEO"]
+EDITIONS = [0, 1, 2, 3, 4, 7, 8, 10, 12, 13, 14]
+RARITIES = ["common", "rare", "epic", "legendary"]
+DEED_TYPES = ["bog", "lake", "plains", "river", "mountain", "tundra", "jungle", "swamp", "badlands", "caldera"]
+
+# URL prefixes of the APIs on the replay server, see patch_endpoints
+SPL_PREFIX = "/spl/"
+LAND_PREFIX = "/land/"
+PRICES_PREFIX = "/prices/"
+HIVE_ENGINE_PREFIX = "/he/"
+PEAKMONSTERS_PREFIX = "/peakmonsters/"
+
+
+def account_rng(*key):
+    """Random generator seeded by the request, the same account always gets the same data."""
+    return random.Random(hashlib.sha1(repr(key).encode()).hexdigest())
+
+
+class SyntheticData:
+    """Generated API responses, sized by the number of cards, deeds and market entries."""
+
+    def __init__(self, cards_per_account=200, deeds_per_account=5, card_details=500, market_entries=5000):
+        self.cards_per_account = cards_per_account
+        self.deeds_per_account = deeds_per_account
+        self.card_details = card_details
+        self.market_entries = market_entries
+
+    def balances(self, player):
+        rng = account_rng("balances", player)
+        return [{"player": player, "token": token, "balance": round(rng.lognormvariate(5, 3), 3)} for token in TOKENS]
+
+    def collection(self, player):
+        rng = account_rng("collection", player)
+        cards = []
+        for i in range(self.cards_per_account):
+            bcx = rng.randint(1, 50)
+            cards.append({
+                "player": player, "uid": f"C{i}-{player}", "card_detail_id": rng.randint(1, self.card_details),
+                "collection_power": bcx * 10, "xp": bcx, "gold": rng.random() < 0.1, "edition": rng.choice(EDITIONS),
+                "level": rng.randint(1, 10), "bcx": bcx, "bcx_unbound": bcx,
+            })
+        return {"player": player, "cards": cards}
+
+    def card_details_list(self):
+        rng = account_rng("details")
+        return [{"id": i, "name": f"Card {i}", "rarity": rng.randint(1, 4), "editions": str(rng.choice(EDITIONS))}
+                for i in range(1, self.card_details + 1)]
+
+    def cards_for_sale(self):
+        rng = account_rng("for_sale")
+        return [{"card_detail_id": rng.randint(1, self.card_details), "gold": rng.random() < 0.1,
+                 "edition": rng.choice(EDITIONS), "qty": rng.randint(1, 100), "low_price": rng.uniform(0.01, 50),
+                 "low_price_bcx": rng.uniform(0.01, 50), "high_price": rng.uniform(50, 500)}
+                for _ in range(self.market_entries)]
+
+    def market_prices(self):
+        rng = account_rng("peakmonsters")
+        return {"prices": [{"card_detail_id": rng.randint(1, self.card_details), "gold": rng.random() < 0.1,
+                            "edition": rng.choice(EDITIONS), "last_sell_price": rng.uniform(0.01, 50),
+                            "last_bcx_price": rng.uniform(0.01, 50)}
+                           for _ in range(self.market_entries)]}
+
+    def deeds(self, player=None):
+        rng = account_rng("deeds", player)
+        count = self.deeds_per_account if player else self.market_entries // 10
+        return {"data": {"deeds": [{
+            "deed_uid": f"D{i}-{player}", "player": player, "rarity": rng.choice(RARITIES),
+            "plot_status": rng.choice(["natural", "magical", "occupied"]), "magic_type": rng.choice(["", "fire"]),
+            "deed_type": rng.choice(DEED_TYPES), "listing_price": None if player else rng.uniform(10, 5000),
+        } for i in range(count)]}}
+
+    def prices(self):
+        return {"hive": 0.25, "hbd": 1.0, "sps": 0.01, "dec": 0.001, "voucher": 0.05}
+
+    def hive_engine(self, method, params):
+        """Result of a Hive Engine contracts find/findOne call."""
+        contract, table, query = params.get("contract"), params.get("table"), params.get("query", {})
+        rng = account_rng("he", contract, table, json.dumps(query, sort_keys=True))
+        if (contract, table) == ("tokens", "balances"):
+            return [{"account": query.get("account"), "symbol": symbol, "balance": f"{rng.lognormvariate(3, 2):.8f}",
+                     "stake": f"{rng.lognormvariate(2, 2):.8f}"} for symbol in HE_TOKENS]
+        if (contract, table) == ("market", "metrics"):
+            return {"symbol": query.get("symbol"), "lastPrice": "0.01", "highestBid": "0.009", "lowestAsk": "0.011"}
+        if (contract, table) == ("marketpools", "pools"):
+            return {"tokenPair": query.get("tokenPair"), "baseQuantity": "1000000", "quoteQuantity": "25000",
+                    "totalShares": "150000"}
+        if (contract, table) == ("marketpools", "liquidityPositions"):
+            return {"account": query.get("account"), "shares": f"{rng.uniform(0, 1000):.8f}"}
+        return [] if method == "find" else None
+
+
+def recording_key(method, path, body=b""):
+    key = f"{method} {path}"
+    if body:
+        key += " " + hashlib.sha1(body).hexdigest()
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def record(url, directory, replay_path, method="GET", body=None):
+    """
+    Store a real API response as a recording (needs network), replay_path is the path on the replay server,
+    e.g. record("https://api2.splinterlands.com/cards/get_details", "recordings", "/spl/cards/get_details").
+    """
+    response = requests.request(method, url, data=body, timeout=30)
+    recording = {"method": method, "path": replay_path, "status": response.status_code, "body": response.json()}
+    key = recording_key(method, replay_path, body.encode() if isinstance(body, str) else body or b"")
+    with open(os.path.join(directory, f"{key}.json"), "w") as f:
+        json.dump(recording, f)
+
+
+def load_recordings(directory):
+    recordings = {}
+    for file_name in os.listdir(directory):
+        if file_name.endswith(".json"):
+            with open(os.path.join(directory, file_name)) as f:
+                recordings[file_name[:-len(".json")]] = json.load(f)
+    return recordings
+
+
+class ReplayServer:
+    """
+    Threaded local HTTP server, serves recordings when available and synthetic data otherwise.
+
+    :param latency: seconds added to every response, plus a random jitter of up to jitter seconds.
+    :param rate_limit_rate: fraction of requests answered with 429 Too Many Requests.
+    :param error_rate: fraction of requests answered with 503 Service Unavailable.
+    :param fail_first: number of requests per path that fail with 429 before the path responds normally
+                       (deterministic retry tests).
+    :param recordings_dir: directory with recordings made with record.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit_rate=0.0, error_rate=0.0, fail_first=0,
+                 recordings_dir=None, data=None, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.recordings = load_recordings(recordings_dir) if recordings_dir else {}
+        self.data = data or SyntheticData()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "rate_limited": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+        self.path_counts = {}
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self, "GET", b"")
+
+            def do_POST(self):
+                server.handle(self, "POST", self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="replay-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def injected_status(self, path):
+        """Status of an injected failure for this request, None to respond normally."""
+        with self.lock:
+            self.stats["requests"] += 1
+            count = self.path_counts[path] = self.path_counts.get(path, 0) + 1
+            if count <= self.fail_first or self.random.random() < self.rate_limit_rate:
+                self.stats["rate_limited"] += 1
+                return 429
+            if self.random.random() < self.error_rate:
+                self.stats["errors"] += 1
+                return 503
+            return None
+
+    def handle(self, handler, method, body):
+        with self.lock:
+            self.stats["in_flight"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], self.stats["in_flight"])
+        try:
+            if self.latency or self.jitter:
+                time.sleep(self.latency + self.random.uniform(0, self.jitter))
+
+            status = self.injected_status(urlsplit(handler.path).path)
+            if status:
+                # Plain text like the real gateways, the Hive Engine client recognizes these and retries
+                content_type = "text/plain"
+                content = (b"Too Many Requests" if status == 429 else b"Service Unavailable")
+            else:
+                status, payload = self.respond(method, handler.path, body)
+                content_type = "application/json"
+                content = json.dumps(payload).encode()
+
+            handler.send_response(status)
+            handler.send_header("Content-Type", content_type)
+            handler.send_header("Content-Length", str(len(content)))
+            if status == 429:
+                handler.send_header("Retry-After", "0")
+            handler.end_headers()
+            handler.wfile.write(content)
+        finally:
+            with self.lock:
+                self.stats["in_flight"] -= 1
+
+    def respond(self, method, path, body):
+        recording = self.recordings.get(recording_key(method, path, body))
+        if recording:
+            return recording["status"], recording["body"]
+
+        url = urlsplit(path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        route = url.path
+        if route.startswith(HIVE_ENGINE_PREFIX) and method == "POST":
+            calls = json.loads(body)  # the hiveengine client sends a JSON-RPC batch
+            return 200, [{"jsonrpc": "2.0", "id": call["id"],
+                          "result": self.data.hive_engine(call["method"], call["params"])} for call in calls]
+        if route == f"{SPL_PREFIX}players/balances":
+            return 200, self.data.balances(query.get("username") or query.get("players"))
+        if route.startswith(f"{SPL_PREFIX}cards/collection/"):
+            return 200, self.data.collection(route.rsplit("/", 1)[-1])
+        if route == f"{SPL_PREFIX}cards/get_details":
+            return 200, self.data.card_details_list()
+        if route == f"{SPL_PREFIX}market/for_sale_grouped":
+            return 200, self.data.cards_for_sale()
+        if route == f"{LAND_PREFIX}land/deeds":
+            return 200, self.data.deeds(query.get("player") if query.get("status") == "collection" else None)
+        if route == f"{PRICES_PREFIX}prices":
+            return 200, self.data.prices()
+        if route == f"{PEAKMONSTERS_PREFIX}api/market/cards/prices":
+            return 200, self.data.market_prices()
+        return 404, {"error": f"No replay data for {method} {path}"}
+
+
+@contextmanager
+def patch_endpoints(server):
+    """Point the SPL, Hive Engine and Peakmonsters clients of src.api to the replay server."""
+    api_urls = {
+        "base": f"{server.url}{SPL_PREFIX}",
+        "land": f"{server.url}{LAND_PREFIX}",
+        "prices": f"{server.url}{PRICES_PREFIX}",
+    }
+    with patch.dict("src.api.spl.API_URLS", api_urls), \
+         patch("src.api.hive_engine.hive_engine_nodes", [f"{server.url}{HIVE_ENGINE_PREFIX}"]), \
+         patch("src.api.hive_engine.get_cached_preferred_node",
+               return_value={"preferred_node": f"{server.url}{HIVE_ENGINE_PREFIX}"}), \
+         patch("src.api.peakmonsters.peak_monsters_url",
+               f"{server.url}{PEAKMONSTERS_PREFIX}api/market/cards/prices"):
+        yield
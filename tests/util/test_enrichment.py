@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.util.enrichment import collect_records, enrich, ADD
+
+
+def test_collect_records_aligns_missing_values():
+    records = {"alice": {"DEC": 1}, "bob": {}, "carol": {"DEC": 3, "SPS": 4}}
+
+    columns = collect_records(["alice", "bob", "carol"], records.get)
+
+    assert columns == {"DEC": [1, None, 3], "SPS": [None, None, 4]}
+
+
+def test_enrich_joins_records_once_per_account():
+    df = pd.DataFrame({"name": ["alice", "bob", "alice"], "hp": [1.0, 2.0, 3.0]}, index=[5, 6, 7])
+    calls = []
+
+    def fetch(name):
+        calls.append(name)
+        return {"DEC": 10} if name == "alice" else {}
+
+    result = enrich(df, fetch)
+
+    assert calls == ["alice", "bob"]
+    assert result.columns.tolist() == ["name", "hp", "DEC"]
+    assert result["hp"].tolist() == [1.0, 2.0, 3.0]
+    assert result["DEC"].tolist()[0] == 10 and np.isnan(result["DEC"].iloc[1])
+
+
+def test_enrich_replaces_overlapping_columns():
+    df = pd.DataFrame({"name": ["alice", "bob"], "deeds": [1, 2]})
+
+    result = enrich(df, lambda name: {"deeds": 5} if name == "alice" else {})
+
+    assert result["deeds"].tolist() == [5, 2]
+
+
+def test_enrich_adds_overlapping_numeric_columns():
+    df = pd.DataFrame({"name": ["alice", "bob"], "date": ["2025-01-01 10:00:00"] * 2, "sps_value": [1.0, 2.0]})
+
+    result = enrich(df, lambda name: {"date": "2025-01-01", "sps_value": 10.0, "dec_value": 3.0}, overlap=ADD)
+
+    assert result["sps_value"].tolist() == [11.0, 12.0]
+    assert result["date"].tolist() == ["2025-01-01 10:00:00"] * 2
+    assert result["dec_value"].tolist() == [3.0, 3.0]
+
+
+def test_collect_records_fetches_concurrently_in_order():
+    # Both accounts wait for each other, this only finishes when they are fetched at the same time
+    barrier = threading.Barrier(2, timeout=5)
+    seen = []
+
+    def fetch(name):
+        barrier.wait()
+        return {"DEC": len(name)}
+
+    columns = collect_records(["alice", "bob"], fetch, on_row=seen.append, max_workers=2)
+
+    assert columns == {"DEC": [5, 3]}
+    assert seen == ["alice", "bob"]
@@ -0,0 +1,79 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from src.api import memory_cache
+from src.util import enrichment
+from src.util.pipeline import Stage, run
+
+
+def test_run_schedules_stages_by_inputs_and_outputs():
+    order = []
+
+    def load_accounts(inputs):
+        order.append("root")
+        return pd.DataFrame({"name": [a for a in inputs["account"] if a != "unknown"], "hp": [10.0, 20.0]})
+
+    stages = [
+        Stage("ratio", inputs=["name", "SPS"], outputs=["ratio"],
+              fetch_record=lambda name: order.append("ratio") or {"ratio": 0.5}),
+        Stage("tokens", inputs=["name"], outputs=["SPS"],
+              fetch_record=lambda name: order.append("tokens") or {"SPS": 1.0}),
+        Stage("hive", inputs=["account"], outputs=["name", "hp"], fetch_frame=load_accounts),
+    ]
+
+    result, report = run(stages, pd.DataFrame({"account": ["alice", "unknown", "bob"]}))
+
+    assert order == ["root", "tokens", "tokens", "ratio", "ratio"]
+    assert result.columns.tolist() == ["ratio", "SPS", "name", "hp"]
+    assert result["name"].tolist() == ["alice", "bob"]
+    assert report["stage"].tolist() == ["hive", "tokens", "ratio"]
+    assert report["accounts"].tolist() == [3, 2, 2]
+
+
+def test_independent_stages_run_in_parallel():
+    # Both stages wait for each other, this only finishes when they run at the same time
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fetch(column):
+        def fetch_record(name):
+            barrier.wait()
+            return {column: 1}
+        return fetch_record
+
+    stages = [Stage("a", inputs=["name"], outputs=["a"], fetch_record=fetch("a")),
+              Stage("b", inputs=["name"], outputs=["b"], fetch_record=fetch("b"))]
+
+    result, _ = run(stages, pd.DataFrame({"name": ["alice"]}))
+
+    assert result.columns.tolist() == ["name", "a", "b"]
+
+
+def test_report_contains_cache_statistics():
+    memory_cache.clear_all()
+
+    @memory_cache.memory_cache(max_entries=10)
+    def get_balance(name):
+        return 1.0
+
+    get_balance("alice")
+    stage = Stage("balances", inputs=["name"], outputs=["balance"],
+                  fetch_record=lambda name: {"balance": get_balance(name)}, caches=[get_balance])
+
+    _, report = run([stage], pd.DataFrame({"name": ["alice", "bob"]}))
+
+    assert report.loc[0, "cache_hits"] == 1
+    assert report.loc[0, "cache_misses"] == 1
+
+
+def test_add_overlap_and_missing_inputs():
+    df = pd.DataFrame({"name": ["alice"], "value": [1.0]})
+    stage = Stage("estimates", inputs=["name"], outputs=[], fetch_record=lambda name: {"value": 2.0},
+                  overlap=enrichment.ADD)
+
+    result, _ = run([stage], df)
+    assert result["value"].tolist() == [3.0]
+
+    with pytest.raises(ValueError, match="unavailable inputs"):
+        run([Stage("x", inputs=["missing"], outputs=[], fetch_record=dict)], df)
@@ -0,0 +1,83 @@
+import marshal
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+import streamlit as st
+
+from src.util import profiling
+
+
+@pytest.fixture
+def session_state(monkeypatch):
+    state = {"authenticated": True}
+    monkeypatch.setattr(st, "session_state", state)
+    return state
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampler_folded_stacks_include_new_threads():
+    sampler = profiling.Sampler(interval=0.001)
+    sampler.enable()
+    worker = threading.Thread(target=busy_wait, args=(0.1,))
+    worker.start()
+    busy_wait(0.1)
+    worker.join()
+    sampler.disable()
+
+    folded = sampler.get_folded()
+    top = sampler.get_top_functions()
+
+    assert "test_sampler_folded_stacks_include_new_threads" in folded
+    assert "run (threading.py" in folded
+    line = folded.splitlines()[0]
+    assert int(line.rsplit(" ", 1)[1]) > 0
+    assert top.iloc[0]["function"].startswith("busy_wait")
+
+
+def test_profile_run_off(session_state):
+    session_state[profiling.MODE_KEY] = profiling.OFF
+    with profiling.profile_run("page"):
+        pass
+    assert profiling.RESULTS_KEY not in session_state
+
+
+def test_profile_run_requires_authentication(session_state):
+    session_state.update({"authenticated": False, profiling.MODE_KEY: profiling.CPROFILE})
+    with profiling.profile_run("page"):
+        pass
+    assert profiling.RESULTS_KEY not in session_state
+
+
+def test_cprofile_requires_setting(session_state):
+    session_state[profiling.MODE_KEY] = profiling.CPROFILE
+    with patch("src.util.profiling.is_cprofile_allowed", return_value=False):
+        assert profiling.get_modes() == [profiling.OFF, profiling.SAMPLING]
+        with profiling.profile_run("page"):
+            pass
+    assert profiling.RESULTS_KEY not in session_state
+
+
+@pytest.mark.parametrize("mode, file_name", [(profiling.CPROFILE, "profile.prof"),
+                                             (profiling.SAMPLING, "profile.folded")])
+def test_profile_run_keeps_results_on_rerun(session_state, mode, file_name):
+    session_state[profiling.MODE_KEY] = mode
+    with patch("src.util.profiling.is_cprofile_allowed", return_value=True):
+        for _ in range(profiling.MAX_RESULTS + 1):
+            with pytest.raises(RuntimeError):
+                with profiling.profile_run("page"):
+                    busy_wait(0.02)
+                    raise RuntimeError("st.rerun")
+
+    results = session_state[profiling.RESULTS_KEY]
+    assert len(results) == profiling.MAX_RESULTS
+    assert results[-1]["export"][0] == file_name
+    assert results[-1]["top"]["function"].str.startswith("busy_wait").any()
+    if mode == profiling.CPROFILE:
+        assert isinstance(marshal.loads(results[-1]["export"][1]), dict)
@@ -0,0 +1,55 @@
+from streamlit.testing.v1 import AppTest
+
+
+def streamed_page():
+    import pandas as pd
+    import streamlit as st
+
+    from src.util import streaming
+
+    def process(chunk):
+        st.session_state.processed = st.session_state.get("processed", []) + list(chunk)
+        if st.session_state.get("fail_at") in chunk:
+            st.session_state.fail_at = None
+            raise RuntimeError("connection lost")
+        return pd.DataFrame({"name": chunk})
+
+    if "test_stream" not in st.session_state:
+        streaming.start("test_stream", ["a", "b", "c", "d", "e"], chunk_size=2)
+
+    result = streaming.consume("test_stream", process, render=lambda partial: st.caption(f"{len(partial)} rows"))
+    streaming.add_cancelled_note("test_stream")
+    st.write(",".join(result["name"]) if not result.empty else "no data")
+
+
+def test_consume_processes_all_chunks():
+    at = AppTest.from_function(streamed_page).run()
+
+    assert not at.exception
+    assert at.markdown[-1].value == "a,b,c,d,e"
+    assert at.session_state.processed == ["a", "b", "c", "d", "e"]
+
+
+def test_interrupted_run_continues_with_remaining_chunks():
+    at = AppTest.from_function(streamed_page)
+    at.session_state.fail_at = "c"
+    at.run()
+    assert at.exception
+
+    at.run()
+
+    assert at.markdown[-1].value == "a,b,c,d,e"
+    # Only the interrupted chunk is fetched again
+    assert at.session_state.processed == ["a", "b", "c", "d", "c", "d", "e"]
+
+
+def test_cancel_keeps_partial_result():
+    at = AppTest.from_function(streamed_page)
+    at.session_state.fail_at = "c"
+    at.run()
+
+    at.button(key="test_stream_cancel").click().run()
+
+    assert not at.exception
+    assert at.markdown[-1].value == "a,b"
+    assert "2 of 5" in at.info[0].value
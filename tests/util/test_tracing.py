@@ -0,0 +1,107 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pandas as pd
+
+from src.util import tracing, pipeline
+
+
+def test_span_outside_trace_does_nothing():
+    with tracing.span("work") as span:
+        assert span is None
+
+
+def get_parent_id(name):
+    with tracing.span(name, kind=tracing.ACCOUNT) as span:
+        return span.parent_id
+
+
+def test_nested_spans_across_threads():
+    with patch("src.util.tracing.export") as mock_export:
+        with tracing.trace("root") as root:
+            with tracing.span("stage", kind=tracing.STAGE) as stage:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    parent_ids = list(executor.map(tracing.wrap(get_parent_id), ["a", "b"]))
+
+    assert parent_ids == [stage.span_id, stage.span_id]
+    assert stage.parent_id == root.span_id
+    mock_export.assert_called_once_with(root.trace)
+
+
+def test_trace_within_trace_is_a_span():
+    with patch("src.util.tracing.export") as mock_export:
+        with tracing.trace("root") as root:
+            with tracing.trace("nested") as nested:
+                pass
+
+    assert nested.parent_id == root.span_id
+    assert [span.name for span in root.trace.get_spans()] == ["nested", "root"]
+    mock_export.assert_called_once()
+
+
+def test_get_breakdown():
+    with patch("src.util.tracing.export"):
+        with tracing.trace("root") as root:
+            with tracing.span("request", kind=tracing.NETWORK):
+                with tracing.span("retry sleep", kind=tracing.RETRY_SLEEP):
+                    time.sleep(0.05)
+                time.sleep(0.02)
+
+    breakdown = tracing.get_breakdown(root)
+
+    assert breakdown[tracing.RETRY_SLEEP] >= 0.05
+    assert 0.02 <= breakdown[tracing.NETWORK] < 0.05
+    assert abs(sum(breakdown.values()) - root.seconds) < 1e-6
+
+
+def test_export_json_and_otlp(tmp_path):
+    json_path = tmp_path / "traces.jsonl"
+    settings = {"json_path": str(json_path), "otlp_endpoint": "http://localhost:4318/"}
+    with patch("src.util.tracing.get_settings", return_value=settings), \
+         patch("src.util.tracing.requests.post") as mock_post:
+        with tracing.trace("root", accounts=2):
+            with tracing.span("request", kind=tracing.NETWORK):
+                pass
+
+    spans = json.loads(json_path.read_text().splitlines()[0])
+    assert [(span["name"], span["kind"]) for span in spans] == [("request", "network"), ("root", "processing")]
+    url = mock_post.call_args.args[0]
+    otlp_spans = mock_post.call_args.kwargs["json"]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert url == "http://localhost:4318/v1/traces"
+    assert otlp_spans[0]["parentSpanId"] == otlp_spans[1]["spanId"]
+    assert {"key": "accounts", "value": {"intValue": "2"}} in otlp_spans[1]["attributes"]
+
+
+def test_pipeline_report_breakdown():
+    def fetch_record(name):
+        with tracing.span("request", kind=tracing.NETWORK):
+            time.sleep(0.02)
+        return {"value": 1}
+
+    stage = pipeline.Stage("values", inputs=["name"], outputs=["value"], fetch_record=fetch_record)
+    with patch("src.util.tracing.export"):
+        _, report = pipeline.run([stage], pd.DataFrame({"name": ["alice", "bob"]}))
+
+    assert report.loc[0, "network (s)"] >= 0.04
+    assert report.loc[0, "retry sleep (s)"] == 0
+    assert report.loc[0, "network (s)"] + report.loc[0, "processing (s)"] <= report.loc[0, "seconds"] + 0.01
+
+
+def test_trace_continues_after_rerun():
+    with patch("src.util.tracing.export") as mock_export:
+        with tracing.trace("click") as click:
+            time.sleep(0.01)
+        with tracing.trace("render", kind=tracing.RENDER, parent=tracing.get_context(click)) as render:
+            time.sleep(0.02)
+
+    assert render.trace.trace_id == click.trace.trace_id
+    assert render.parent_id == click.span_id
+    assert mock_export.call_count == 2
+
+    report = pipeline.add_render_timing(pd.DataFrame([{"stage": "values", "trace": click.trace.trace_id}]),
+                                        render, accounts=2)
+    assert report["stage"].tolist() == ["values", "render"]
+    assert report["trace"].nunique() == 1
+    assert report.loc[1, "render (s)"] >= 0.02